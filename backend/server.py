@@ -1,5 +1,6 @@
-from fastapi import FastAPI, APIRouter, HTTPException
-from fastapi.responses import JSONResponse, Response, FileResponse
+from fastapi import FastAPI, APIRouter, HTTPException, Request, Query
+from fastapi.responses import JSONResponse, Response, FileResponse, StreamingResponse
+from fastapi.encoders import jsonable_encoder
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
 from motor.motor_asyncio import AsyncIOMotorClient
@@ -7,13 +8,22 @@ import os
 import logging
 from pathlib import Path
 from pydantic import BaseModel, Field
-from typing import List, Optional, Dict, Any, Tuple, Literal
+from typing import List, Optional, Dict, Any, Tuple, Literal, Callable, NamedTuple, Awaitable, get_args
 import uuid
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+import hashlib
+import math
 import random
+import re
+import time
+import asyncio
+import contextlib
 import base64
+import io
 import mimetypes
 from functools import lru_cache
+from collections import OrderedDict, deque
 
 load_dotenv()
 
@@ -29,6 +39,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 # Database
@@ -61,8 +72,9 @@ class TarotReading(BaseModel):
     reading_type: str
     cards: List[Dict[str, Any]]
     interpretation: str
-    mode: str = Field(default="rule")  # 'ai' | 'rule' | 'fallback'
+    mode: str = Field(default="rule")  # 'ai' | 'rule' | 'fallback' | 'pending'
     timestamp: datetime = Field(default_factory=datetime.utcnow)
+    prompt_version: Optional[str] = None  # prompt template version behind an 'ai' interpretation
 
 class QuizQuestion(BaseModel):
     id: int
@@ -73,8 +85,8 @@ class QuizQuestion(BaseModel):
     card_id: int
     explanation: str
 
-# Utility to load and base64 encode local image files once and cache
-@lru_cache(maxsize=None)
+# Utility to load and base64 encode a local image file as a data: URI.
+# Callers cache the encoded result (see CardCatalog.inline_card_json).
 def load_image_b64(rel_path: str) -> str:
     try:
         abs_path = (ROOT_DIR / rel_path).resolve()
@@ -124,15 +136,44 @@ READING_TYPES: List[Dict[str, Any]] = [
     {"id": "yes_no", "name": "Yes or No", "description": "", "card_count": 1, "positions": ["Answer"]},
 ]
 
-# Deduplicate to exactly 22 unique cards by id
+# Card sources indexed by DeckIndex; future decks (e.g. Minor Arcana) are appended here
+DECKS: List[List[Dict[str, Any]]] = [MAJOR_ARCANA]
+
+class DeckIndex:
+    """Constant-time lookups over every deck: id -> card, localized name -> id, reading type id -> config."""
+
+    def __init__(self, decks: List[List[Dict[str, Any]]], reading_types: List[Dict[str, Any]]):
+        # Deduplicate by id; the first occurrence wins
+        self.cards_by_id: Dict[int, Dict[str, Any]] = {}
+        for deck in decks:
+            for c in deck:
+                cid = c.get('id')
+                if cid is not None and cid not in self.cards_by_id:
+                    self.cards_by_id[cid] = c
+        self.cards: List[Dict[str, Any]] = [self.cards_by_id[i] for i in sorted(self.cards_by_id)]
+        self.card_id_by_name: Dict[str, int] = {}
+        for c in self.cards:
+            for key in ("name", "name_tr"):
+                if c.get(key):
+                    self.card_id_by_name.setdefault(c[key].casefold(), c["id"])
+        self.reading_types_by_id: Dict[str, Dict[str, Any]] = {rt["id"]: rt for rt in reading_types}
+
+    def card(self, card_id: int) -> Optional[Dict[str, Any]]:
+        return self.cards_by_id.get(card_id)
+
+    def card_id_for_name(self, name: str) -> Optional[int]:
+        return self.card_id_by_name.get(name.strip().casefold())
+
+    def reading_type(self, reading_type_id: str) -> Optional[Dict[str, Any]]:
+        return self.reading_types_by_id.get(reading_type_id)
+
 @lru_cache(maxsize=None)
+def get_deck_index() -> DeckIndex:
+    return DeckIndex(DECKS, READING_TYPES)
+
+# Deduplicated cards (22 for the Major Arcana), sorted by id
 def get_unique_major_arcana() -> List[Dict[str, Any]]:
-    seen: Dict[int, Dict[str, Any]] = {}
-    for c in MAJOR_ARCANA:
-        cid = c.get('id')
-        if cid is not None and cid not in seen:
-            seen[cid] = c
-    return [seen[i] for i in sorted(seen.keys())]
+    return get_deck_index().cards
 
 # Map ID -> local image path
 IMAGES_BY_ID: Dict[int, str] = {
@@ -167,59 +208,453 @@ for _card in MAJOR_ARCANA:
     if local_path:
         _card['image_url'] = local_path
 
-@api_router.get("/cards/{card_id}", response_model=TarotCard)
-async def get_card(card_id: int, language: str = "en"):
-    for card_data in get_unique_major_arcana():
-        if card_data["id"] == card_id:
-            if language == "tr":
-                card = {
-                    "id": card_data["id"],
-                    "name": card_data.get("name_tr", card_data["name"]),
-                    "image_url": card_data["image_url"],
-                    "keywords": card_data.get("keywords_tr", card_data["keywords"]),
-                    "meaning_upright": card_data.get("meaning_upright_tr", card_data["meaning_upright"]),
-                    "meaning_reversed": card_data.get("meaning_reversed_tr", card_data["meaning_reversed"]),
-                    "description": card_data.get("description_tr", card_data["description"]),
-                    "symbolism": card_data.get("symbolism_tr", card_data["symbolism"]),
-                    "yes_no_meaning": card_data.get("yes_no_meaning_tr", card_data["yes_no_meaning"])
-                }
-            else:
-                card = {
-                    "id": card_data["id"],
-                    "name": card_data["name"],
-                    "image_url": card_data["image_url"],
-                    "keywords": card_data["keywords"],
-                    "meaning_upright": card_data["meaning_upright"],
-                    "meaning_reversed": card_data["meaning_reversed"],
-                    "description": card_data["description"],
-                    "symbolism": card_data["symbolism"],
-                    "yes_no_meaning": card_data["yes_no_meaning"]
-                }
-            local_path = IMAGES_BY_ID.get(card_id)
-            card["image_base64"] = load_image_b64(local_path) if local_path else None
-            return TarotCard(**card)
-    raise HTTPException(status_code=404, detail="Card not found")
+# HTTP caching: content-hash ETags, Last-Modified and 304 handling
+CACHE_CONTROL_METADATA = os.getenv("CACHE_CONTROL_METADATA", "public, max-age=86400, stale-while-revalidate=604800")
+CACHE_CONTROL_IMAGES = os.getenv("CACHE_CONTROL_IMAGES", "public, max-age=31536000, immutable")
+# Image URLs without a matching ?v= can change content under the same URL, so they revalidate
+CACHE_CONTROL_IMAGES_UNVERSIONED = os.getenv("CACHE_CONTROL_IMAGES_UNVERSIONED", "public, max-age=86400, stale-while-revalidate=604800")
 
-@api_router.get("/cards/{card_id}/image")
-async def get_card_image(card_id: int):
-    local_path = IMAGES_BY_ID.get(card_id)
-    if not local_path:
-        raise HTTPException(status_code=404, detail="Image not found")
+def make_etag(data: bytes) -> str:
+    return '"' + hashlib.sha256(data).hexdigest()[:32] + '"'
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    # Weak comparison, as required for If-None-Match
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+
+def not_modified_since(if_modified_since: Optional[str], last_modified: datetime) -> bool:
+    if not if_modified_since:
+        return False
     try:
-        abs_path = (ROOT_DIR / local_path).resolve()
-        if not abs_path.exists():
-            raise HTTPException(status_code=404, detail="Image file missing")
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    return last_modified.replace(microsecond=0) <= since
+
+def cached_response(request: Request, body: bytes, media_type: str, etag: str,
+                    last_modified: datetime, cache_control: str) -> Response:
+    """Response with validators; 304 when the client copy is still current."""
+    headers = {
+        "ETag": etag,
+        "Last-Modified": format_datetime(last_modified, usegmt=True),
+        "Cache-Control": cache_control,
+    }
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        fresh = etag_matches(if_none_match, etag)
+    else:
+        fresh = not_modified_since(request.headers.get("if-modified-since"), last_modified)
+    if fresh:
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type=media_type, headers=headers)
+
+SUPPORTED_LANGUAGES: Tuple[str, ...] = ("en", "tr")
+LOCALIZED_CARD_FIELDS: Tuple[str, ...] = (
+    "name", "keywords", "meaning_upright", "meaning_reversed", "description", "symbolism", "yes_no_meaning"
+)
+
+def normalize_language(language: Optional[str]) -> str:
+    # Anything other than Turkish is served in English, as before
+    return "tr" if language == "tr" else "en"
+
+def localize_card(card_data: Dict[str, Any], language: str) -> Dict[str, Any]:
+    """Card fields in TarotCard order; Turkish falls back to English per field."""
+    card: Dict[str, Any] = {"id": card_data["id"]}
+    for field in LOCALIZED_CARD_FIELDS:
+        value = card_data[field]
+        if language == "tr":
+            value = card_data.get(f"{field}_tr", value)
+        card[field] = value
+        if field == "name":
+            card["image_url"] = card_data["image_url"]
+    return card
+
+def dump_json_bytes(data: Any) -> bytes:
+    # Same encoding FastAPI's JSONResponse uses
+    return json.dumps(data, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+class CardCatalog:
+    """Immutable per-language view of the deck, built once with pre-serialized responses."""
+
+    def __init__(self, language: str):
+        self.language = language
+        self.last_modified = datetime.now(timezone.utc).replace(microsecond=0)
+        cards = [localize_card(c, language) for c in get_unique_major_arcana()]
+        for c in cards:
+            c["image_url"] = card_image_url(c["id"]) or c["image_url"]
+        self.cards_by_id: Dict[int, Dict[str, Any]] = {c["id"]: c for c in cards}
+        # Validate once against the response model instead of on every request
+        self.list_json: bytes = dump_json_bytes(
+            [TarotCard(**c).model_dump() for c in cards]
+        )
+        self.card_json: Dict[int, bytes] = {
+            c["id"]: dump_json_bytes(TarotCard(**c).model_dump()) for c in cards
+        }
+        self.list_etag = make_etag(self.list_json)
+        self.card_etags: Dict[int, str] = {cid: make_etag(body) for cid, body in self.card_json.items()}
+        # Encoded-bytes cache for the opt-in inline image mode, filled on first use
+        self._inline_json: Dict[int, Tuple[bytes, str]] = {}
+
+    def inline_card_json(self, card_id: int) -> Optional[Tuple[bytes, str]]:
+        """Card JSON with image_base64 filled in, and its ETag."""
+        cached = self._inline_json.get(card_id)
+        if cached is None:
+            card = self.cards_by_id.get(card_id)
+            if card is None:
+                return None
+            local_path = IMAGES_BY_ID.get(card_id)
+            image_b64 = load_image_b64(local_path) if local_path else None
+            body = dump_json_bytes(TarotCard(**card, image_base64=image_b64).model_dump())
+            cached = self._inline_json[card_id] = (body, make_etag(body))
+        return cached
+
+def image_version(etag: str) -> str:
+    return etag.strip('"')[:12]
+
+def card_image_url(card_id: int) -> Optional[str]:
+    """Relative, content-versioned image URL; safe to cache as immutable."""
+    entry = get_image_store().entries.get(card_id)
+    if entry is None:
+        return None
+    return f"/api/cards/{card_id}/image?v={image_version(entry.etag)}"
+
+_CARD_CATALOGS: Dict[str, CardCatalog] = {}
+
+def get_card_catalog(language: Optional[str]) -> CardCatalog:
+    language = normalize_language(language)
+    catalog = _CARD_CATALOGS.get(language)
+    if catalog is None:
+        catalog = _CARD_CATALOGS[language] = CardCatalog(language)
+    return catalog
+
+@api_router.get("/cards/{card_id}", response_model=TarotCard)
+async def get_card(card_id: int, request: Request, language: str = "en", image: Literal["url", "inline"] = "url"):
+    """Card detail; image_url points at the image endpoint, image=inline also embeds a data: URI."""
+    catalog = get_card_catalog(language)
+    if image == "inline":
+        inline = catalog.inline_card_json(card_id)
+        if inline is None:
+            raise HTTPException(status_code=404, detail="Card not found")
+        body, etag = inline
+    else:
+        body = catalog.card_json.get(card_id)
+        if body is None:
+            raise HTTPException(status_code=404, detail="Card not found")
+        etag = catalog.card_etags[card_id]
+    return cached_response(request, body, "application/json", etag, catalog.last_modified, CACHE_CONTROL_METADATA)
+
+class StoredImage:
+    __slots__ = ("path", "mime", "size", "etag", "last_modified")
+
+    def __init__(self, path: Path, mime: str, size: int, etag: str, last_modified: datetime):
+        self.path = path
+        self.mime = mime
+        self.size = size
+        self.etag = etag
+        self.last_modified = last_modified
+
+class ImageStore:
+    """Image bytes loaded once and served from memory.
+
+    Metadata (MIME type, ETag, mtime) stays resident for every image; bytes are
+    kept in an LRU bounded by max_bytes and reread from disk only after eviction.
+    """
+
+    def __init__(self, root: Path, max_bytes: int):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.entries: Dict[Any, StoredImage] = {}
+        self._resident: "OrderedDict[Any, bytes]" = OrderedDict()
+        self.resident_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def add(self, key: Any, rel_path: str) -> Optional[StoredImage]:
+        abs_path = (self.root / rel_path).resolve()
+        try:
+            with open(abs_path, "rb") as f:
+                data = f.read()
+                mtime = os.fstat(f.fileno()).st_mtime
+        except OSError as e:
+            logging.warning(f"Failed to load image {rel_path}: {e}")
+            return None
         mime, _ = mimetypes.guess_type(str(abs_path))
-        if not mime:
-            mime = "image/jpeg"
-        with open(abs_path, "rb") as f:
+        entry = StoredImage(
+            path=abs_path,
+            mime=mime or "image/jpeg",
+            size=len(data),
+            etag=make_etag(data),
+            last_modified=datetime.fromtimestamp(int(mtime), tz=timezone.utc),
+        )
+        self.entries[key] = entry
+        self._keep(key, data)
+        return entry
+
+    def get(self, key: Any) -> Optional[Tuple[StoredImage, bytes]]:
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        data = self._resident.get(key)
+        if data is not None:
+            self.hits += 1
+            self._resident.move_to_end(key)
+            return entry, data
+        self.misses += 1
+        with open(entry.path, "rb") as f:
             data = f.read()
-        return Response(content=data, media_type=mime)
-    except HTTPException:
-        raise
-    except Exception as e:
-        logging.warning(f"Failed to serve image for card {card_id}: {e}")
-        raise HTTPException(status_code=500, detail="Failed to load image")
+        self._keep(key, data)
+        return entry, data
+
+    def _keep(self, key: Any, data: bytes) -> None:
+        old = self._resident.pop(key, None)
+        if old is not None:
+            self.resident_bytes -= len(old)
+        if len(data) > self.max_bytes:
+            return
+        self._resident[key] = data
+        self.resident_bytes += len(data)
+        while self.resident_bytes > self.max_bytes:
+            _, evicted = self._resident.popitem(last=False)
+            self.resident_bytes -= len(evicted)
+            self.evictions += 1
+
+def build_image_store() -> ImageStore:
+    store = ImageStore(ROOT_DIR, int(os.getenv("IMAGE_CACHE_MAX_BYTES", str(64 * 1024 * 1024))))
+    for cid, rel_path in IMAGES_BY_ID.items():
+        store.add(cid, rel_path)
+    return store
+
+_image_store: Optional[ImageStore] = None
+
+def get_image_store() -> ImageStore:
+    global _image_store
+    if _image_store is None:
+        _image_store = build_image_store()
+    return _image_store
+
+# Responsive image variants: downscaled widths in JPEG and WebP, encoded once and
+# cached on disk next to the originals. Pillow is optional; without it only the
+# original images are served.
+try:
+    from PIL import Image as PILImage
+except ImportError:  # pragma: no cover - depends on deployment
+    PILImage = None
+
+IMAGE_VARIANT_WIDTHS: Tuple[int, ...] = tuple(sorted(
+    int(w) for w in os.getenv("IMAGE_VARIANT_WIDTHS", "160,320,640").split(",") if w.strip()
+))
+IMAGE_VARIANT_FORMATS: Dict[str, Tuple[str, str, str]] = {
+    # format -> (MIME type, Pillow format, file extension)
+    "webp": ("image/webp", "WEBP", ".webp"),
+    "jpeg": ("image/jpeg", "JPEG", ".jpg"),
+}
+IMAGE_VARIANT_DIR = "card_images/.variants"
+# The bundled originals are compressed harder than q80; re-encoding above their
+# quality only adds bytes
+IMAGE_VARIANT_QUALITY = int(os.getenv("IMAGE_VARIANT_QUALITY", "70"))
+
+def _encode_variant(source: Any, width: int, pil_format: str) -> bytes:
+    height = max(1, round(source.height * width / source.width))
+    resized = source.convert("RGB").resize((width, height), PILImage.LANCZOS)
+    buf = io.BytesIO()
+    if pil_format == "WEBP":
+        resized.save(buf, format=pil_format, quality=IMAGE_VARIANT_QUALITY, method=6)
+    else:
+        resized.save(buf, format=pil_format, quality=IMAGE_VARIANT_QUALITY, optimize=True)
+    return buf.getvalue()
+
+def build_image_variants(store: ImageStore) -> int:
+    """Register every width/format variant in the store, encoding only those not on disk yet.
+
+    Formats other than the original's also get a full-width variant, keyed
+    (card_id, None, format). A variant is only registered when it is smaller
+    than the next wider option (the wider variant of its format, else the
+    original); otherwise that option is served in its place. Variant file names
+    carry the source ETag, so a changed original gets fresh variants. Returns the
+    number of variants registered.
+    """
+    if PILImage is None:
+        logging.warning("Pillow is not installed; image variants disabled")
+        return 0
+    out_dir = store.root / IMAGE_VARIANT_DIR
+    out_dir.mkdir(parents=True, exist_ok=True)
+    registered = 0
+    for cid, rel_path in IMAGES_BY_ID.items():
+        entry = store.entries.get(cid)
+        if entry is None:
+            continue
+        _, data = store.get(cid)
+        version = entry.etag.strip('"')[:12]
+        with PILImage.open(io.BytesIO(data)) as source:
+            for fmt, (mime, pil_format, ext) in IMAGE_VARIANT_FORMATS.items():
+                # never upscale; the original (or its full-width re-encoding) serves wider requests
+                widths: List[Optional[int]] = [w for w in reversed(IMAGE_VARIANT_WIDTHS) if w < source.width]
+                if mime != entry.mime:
+                    widths.insert(0, None)
+                wider_size = entry.size  # widest first, so this is what would be served instead
+                for width in widths:
+                    label = f"{width}w" if width else "full"
+                    rel_variant = f"{IMAGE_VARIANT_DIR}/{Path(rel_path).stem}-{label}-{version}{ext}"
+                    abs_variant = store.root / rel_variant
+                    if not abs_variant.exists():
+                        tmp = abs_variant.with_name(f"{abs_variant.name}.{uuid.uuid4().hex}.tmp")
+                        tmp.write_bytes(_encode_variant(source, width or source.width, pil_format))
+                        os.replace(tmp, abs_variant)  # atomic for concurrent workers
+                    # The file stays on disk either way, so the size check is not re-encoded
+                    size = abs_variant.stat().st_size
+                    if size >= wider_size:
+                        continue
+                    if store.add((cid, width, fmt), rel_variant) is not None:
+                        registered += 1
+                        wider_size = size
+    return registered
+
+def select_image_variant(store: ImageStore, card_id: int, width: Optional[int], fmt: Optional[str]) -> Any:
+    """Store key of the smallest variant at least `width` wide, else full width.
+
+    Full width is the original, or its full-width re-encoding when another
+    format was asked for; a format alone never downscales the image.
+    """
+    fmt = fmt or "jpeg"
+    if width is not None:
+        for candidate in IMAGE_VARIANT_WIDTHS:
+            if candidate >= width and (card_id, candidate, fmt) in store.entries:
+                return (card_id, candidate, fmt)
+    if (card_id, None, fmt) in store.entries:
+        return (card_id, None, fmt)
+    return card_id
+
+@api_router.get("/cards/{card_id}/image")
+async def get_card_image(
+    card_id: int,
+    request: Request,
+    w: Optional[int] = Query(None, ge=1, description="Desired width in pixels; the next larger variant is served"),
+    format: Optional[Literal["webp", "jpeg", "auto"]] = None,
+    v: Optional[str] = Query(None, description="Content version from image_url; enables immutable caching"),
+):
+    if card_id not in IMAGES_BY_ID:
+        raise HTTPException(status_code=404, detail="Image not found")
+    store = get_image_store()
+    if card_id not in store.entries:
+        raise HTTPException(status_code=404, detail="Image file missing")
+    negotiated = format == "auto" or (format is None and w is not None)
+    if negotiated:
+        format = "webp" if "image/webp" in request.headers.get("accept", "") else "jpeg"
+    key = select_image_variant(store, card_id, w, format)
+    entry = store.entries[key]
+    # Variants are derived from the original, so its version pins every variant too
+    versioned = v is not None and v == image_version(store.entries[card_id].etag)
+    cache_control = CACHE_CONTROL_IMAGES if versioned else CACHE_CONTROL_IMAGES_UNVERSIONED
+    if etag_matches(request.headers.get("if-none-match"), entry.etag):
+        response = cached_response(request, b"", entry.mime, entry.etag, entry.last_modified, cache_control)
+    else:
+        try:
+            _, data = store.get(key)
+        except OSError as e:
+            logging.warning(f"Failed to serve image for card {card_id}: {e}")
+            raise HTTPException(status_code=500, detail="Failed to load image")
+        response = cached_response(request, data, entry.mime, entry.etag, entry.last_modified, cache_control)
+    if negotiated:
+        response.headers["Vary"] = "Accept"
+    return response
+
+# Thumbnail sprite sheet: every card thumbnail in one image plus an offset manifest,
+# so the gallery needs two requests instead of one per card.
+SPRITE_COLUMNS = int(os.getenv("SPRITE_COLUMNS", "8"))
+
+class ThumbnailSprite:
+    """Pre-encoded sprite sheet (one per format) and its JSON manifest."""
+
+    def __init__(self, version: str, images: Dict[str, Tuple[str, bytes, str]], manifest_json: bytes):
+        self.version = version
+        self.images = images  # format -> (MIME type, bytes, ETag)
+        self.manifest_json = manifest_json
+        self.manifest_etag = make_etag(manifest_json)
+        self.last_modified = datetime.now(timezone.utc).replace(microsecond=0)
+
+def build_thumbnail_sprite(store: ImageStore) -> Optional[ThumbnailSprite]:
+    if PILImage is None or not IMAGE_VARIANT_WIDTHS:
+        return None
+    cell_width = IMAGE_VARIANT_WIDTHS[0]
+    thumbs = []
+    for cid in sorted(IMAGES_BY_ID):
+        key = select_image_variant(store, cid, cell_width, "jpeg")
+        if key not in store.entries:
+            continue
+        entry, data = store.get(key)
+        with PILImage.open(io.BytesIO(data)) as img:
+            thumb = img.convert("RGB")
+        if thumb.width != cell_width:
+            thumb = thumb.resize((cell_width, max(1, round(thumb.height * cell_width / thumb.width))), PILImage.LANCZOS)
+        thumbs.append((cid, entry.etag, thumb))
+    if not thumbs:
+        return None
+
+    cell_height = max(t.height for _, _, t in thumbs)
+    columns = min(SPRITE_COLUMNS, len(thumbs))
+    rows = -(-len(thumbs) // columns)
+    sheet = PILImage.new("RGB", (columns * cell_width, rows * cell_height))
+    cards = []
+    for i, (cid, _, thumb) in enumerate(thumbs):
+        x, y = (i % columns) * cell_width, (i // columns) * cell_height
+        sheet.paste(thumb, (x, y))
+        cards.append({"id": cid, "x": x, "y": y, "w": thumb.width, "h": thumb.height})
+
+    # Version depends only on the layout and source images, not on the encoder
+    version = hashlib.sha256(dump_json_bytes([cards, [etag for _, etag, _ in thumbs]])).hexdigest()[:12]
+    images: Dict[str, Tuple[str, bytes, str]] = {}
+    for fmt, (mime, pil_format, _) in IMAGE_VARIANT_FORMATS.items():
+        buf = io.BytesIO()
+        sheet.save(buf, format=pil_format, quality=IMAGE_VARIANT_QUALITY, optimize=True)
+        images[fmt] = (mime, buf.getvalue(), make_etag(buf.getvalue()))
+    manifest = {
+        "version": version,
+        "sprite_url": f"/api/thumbnails/sprite?v={version}",
+        "formats": list(images),
+        "width": sheet.width,
+        "height": sheet.height,
+        "cards": cards,
+    }
+    return ThumbnailSprite(version, images, dump_json_bytes(manifest))
+
+_thumbnail_sprite: Optional[ThumbnailSprite] = None
+
+def get_thumbnail_sprite() -> Optional[ThumbnailSprite]:
+    global _thumbnail_sprite
+    if _thumbnail_sprite is None:
+        _thumbnail_sprite = build_thumbnail_sprite(get_image_store())
+    return _thumbnail_sprite
+
+@api_router.get("/thumbnails")
+async def get_thumbnail_manifest(request: Request):
+    """Sprite sheet manifest: sprite URL plus the x/y/w/h rectangle of each card."""
+    sprite = get_thumbnail_sprite()
+    if sprite is None:
+        raise HTTPException(status_code=503, detail="Thumbnails unavailable")
+    return cached_response(request, sprite.manifest_json, "application/json", sprite.manifest_etag,
+                           sprite.last_modified, CACHE_CONTROL_METADATA)
+
+@api_router.get("/thumbnails/sprite")
+async def get_thumbnail_sprite_image(request: Request, format: Optional[Literal["webp", "jpeg"]] = None,
+                                     v: Optional[str] = None):
+    sprite = get_thumbnail_sprite()
+    if sprite is None:
+        raise HTTPException(status_code=503, detail="Thumbnails unavailable")
+    negotiated = format is None
+    if negotiated:
+        format = "webp" if "image/webp" in request.headers.get("accept", "") else "jpeg"
+    mime, data, etag = sprite.images[format]
+    cache_control = CACHE_CONTROL_IMAGES if v == sprite.version else CACHE_CONTROL_IMAGES_UNVERSIONED
+    response = cached_response(request, data, mime, etag, sprite.last_modified, cache_control)
+    if negotiated:
+        response.headers["Vary"] = "Accept"
+    return response
 
 # Telemetry logging
 TelemetryEventName = Literal[
@@ -254,299 +689,2043 @@ class TelemetryEvent(BaseModel):
 class LogPayload(BaseModel):
     events: List[TelemetryEvent] = Field(default_factory=list)
 
-from fastapi import BackgroundTasks, Request
 import json
 
-@api_router.post("/log", status_code=204)
-async def log_events(payload: LogPayload, request: Request, bg: BackgroundTasks):
-    def _persist_events(p: LogPayload, client_meta: Dict[str, Any]):
+async def drain_batch(queue: asyncio.Queue, first: Any, max_items: int, window: float,
+                      is_boundary: Callable[[Any], bool]) -> Tuple[List[Any], Any]:
+    """Batch starting with first: whatever is queued, then more until max_items or
+    window seconds have passed. Stops at the first item for which is_boundary is
+    true and returns it as the second element (None otherwise); that item is not
+    part of the batch."""
+    loop = asyncio.get_running_loop()
+    batch = [first]
+    deadline = loop.time() + window
+    while len(batch) < max_items:
         try:
-            logs_dir = ROOT_DIR / "logs"
-            logs_dir.mkdir(exist_ok=True)
-            fname = datetime.utcnow().strftime("telemetry-%Y%m%d.jsonl")
-            path = logs_dir / fname
-            with open(path, "a", encoding="utf-8") as f:
-                for ev in p.events:
-                    data = ev.dict()
-                    data["ts"] = data.get("ts") or datetime.utcnow().isoformat()
-                    data["id"] = str(uuid.uuid4())
-                    data["client"] = client_meta
-                    keep = (data.get("event") == "reading_result") or (hash(data["id"]) % 2 == 0)
-                    if keep:
-                        f.write(json.dumps(data, ensure_ascii=False) + "\n")
+            item = queue.get_nowait()
+        except asyncio.QueueEmpty:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                item = await asyncio.wait_for(queue.get(), timeout=remaining)
+            except asyncio.TimeoutError:
+                break
+        if is_boundary(item):
+            return batch, item
+        batch.append(item)
+    return batch, None
+
+class TelemetrySink:
+    """Long-lived telemetry writer.
+
+    log_events enqueues records without touching the filesystem; one writer task
+    drains the queue in batches (by size or time), appends each batch with a single
+    write to a file handle that stays open, and reopens it when the UTC day changes.
+    The queue is bounded: when it is full, new events are dropped and counted.
+    """
+
+    _STOP = object()
+
+    def __init__(self, logs_dir: Path, max_queue: int = 10000, batch_size: int = 500, flush_interval: float = 1.0):
+        self.logs_dir = logs_dir
+        self.max_queue = max_queue
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.enqueued = 0
+        self.written = 0
+        self.dropped = 0
+        self.batches = 0
+        self.write_errors = 0
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._file = None
+        self._file_day: Optional[str] = None
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "queue_depth": self.queue_depth,
+            "enqueued": self.enqueued,
+            "written": self.written,
+            "dropped": self.dropped,
+            "batches": self.batches,
+            "write_errors": self.write_errors,
+        }
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            # A restarted writer keeps the records a dead one left queued
+            if self._queue is None or self._queue.empty():
+                self._queue = asyncio.Queue(maxsize=self.max_queue)
+            self._task = asyncio.create_task(self._run())
+
+    def submit(self, record: Dict[str, Any]) -> bool:
+        """Enqueue one record for the current UTC day; False if it was dropped."""
+        self.start()
+        try:
+            self._queue.put_nowait((datetime.utcnow().strftime("%Y%m%d"), record))
+        except asyncio.QueueFull:
+            self.dropped += 1
+            return False
+        self.enqueued += 1
+        return True
+
+    async def stop(self) -> None:
+        """Flush everything still queued and close the file."""
+        if self._task is not None and not self._task.done():
+            await self._queue.put(self._STOP)
+            await self._task
+        self._task = None
+        await asyncio.to_thread(self._close)
+
+    async def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            item = await self._queue.get()
+            if item is self._STOP:
+                break
+            batch, boundary = await drain_batch(self._queue, item, self.batch_size, self.flush_interval,
+                                                lambda i: i is self._STOP)
+            stopping = boundary is not None
+            await asyncio.to_thread(self._write_batch, batch)
+
+    def _write_batch(self, batch: List[Tuple[str, Dict[str, Any]]]) -> None:
+        lines_by_day: Dict[str, List[str]] = {}
+        for day, record in batch:
+            lines_by_day.setdefault(day, []).append(json.dumps(record, ensure_ascii=False) + "\n")
+        for day, lines in sorted(lines_by_day.items()):
+            try:
+                if self._file_day != day:
+                    self._close()
+                    self.logs_dir.mkdir(parents=True, exist_ok=True)
+                    self._file = open(self.logs_dir / f"telemetry-{day}.jsonl", "a", encoding="utf-8")
+                    self._file_day = day
+                # One O_APPEND write per batch keeps lines from different workers intact
+                self._file.write("".join(lines))
+                self._file.flush()
+                self.written += len(lines)
+                self.batches += 1
+            except Exception as e:
+                self.write_errors += 1
+                logging.warning(f"Failed to persist telemetry: {e}")
+                self._close()
+
+    def _close(self) -> None:
+        if self._file is not None:
+            try:
+                self._file.close()
+            finally:
+                self._file = None
+                self._file_day = None
+
+# Monetization funnel events are never sampled away
+MONETIZATION_EVENTS = frozenset({"paywall_view", "purchase_start", "purchase_success", "purchase_fail", "restore_success"})
+# Per-event-type keep rates; "*" applies to types not listed
+DEFAULT_TELEMETRY_SAMPLE_RATES: Dict[str, float] = {"*": 0.5, "reading_result": 1.0}
+
+def load_telemetry_sample_rates() -> Dict[str, float]:
+    """Rates from TELEMETRY_SAMPLE_RATES: inline JSON or a path to a JSON file."""
+    raw = os.getenv("TELEMETRY_SAMPLE_RATES", "").strip()
+    if not raw:
+        return dict(DEFAULT_TELEMETRY_SAMPLE_RATES)
+    try:
+        if not raw.startswith("{"):
+            raw = Path(raw).read_text(encoding="utf-8")
+        rates = {str(k): float(v) for k, v in json.loads(raw).items()}
+        if any(not 0.0 <= v <= 1.0 for v in rates.values()):
+            raise ValueError("rates must be between 0 and 1")
+    except Exception as e:
+        logging.warning(f"Invalid TELEMETRY_SAMPLE_RATES, using defaults: {e}")
+        return dict(DEFAULT_TELEMETRY_SAMPLE_RATES)
+    return {**{"*": DEFAULT_TELEMETRY_SAMPLE_RATES["*"]}, **rates}
+
+class TelemetrySampler:
+    """Deterministic sampling keyed on the session.
+
+    sessionId (else userIdHash) hashes to a fixed point in [0, 1), and an event is
+    kept when that point is below its type's rate. A session is therefore kept or
+    dropped as a whole, and lower-rate types keep a subset of the sessions kept by
+    higher-rate ones, so funnels can be reconstructed. Events with neither key are
+    sampled on their own id. Kept records carry sampleRate so aggregates can be
+    re-weighted by 1 / sampleRate.
+    """
+
+    def __init__(self, rates: Dict[str, float], salt: str = ""):
+        self.rates = dict(rates)
+        self.default_rate = self.rates.pop("*", 1.0)
+        self.salt = salt
+        self.seen: Dict[str, int] = {}
+        self.kept: Dict[str, int] = {}
+
+    def rate_for(self, event: str) -> float:
+        if event in MONETIZATION_EVENTS:
+            return 1.0
+        return self.rates.get(event, self.default_rate)
+
+    def bucket(self, key: str) -> float:
+        digest = hashlib.blake2b(f"{self.salt}{key}".encode("utf-8"), digest_size=8).digest()
+        return int.from_bytes(digest, "big") / 2 ** 64
+
+    def sample(self, data: Dict[str, Any]) -> Optional[float]:
+        """Applied rate when the event is kept, None when it is dropped."""
+        event = data.get("event") or ""
+        self.seen[event] = self.seen.get(event, 0) + 1
+        rate = self.rate_for(event)
+        if rate < 1.0:
+            key = data.get("sessionId") or data.get("userIdHash") or data.get("id") or ""
+            if self.bucket(key) >= rate:
+                return None
+        self.kept[event] = self.kept.get(event, 0) + 1
+        return rate
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "rates": {"*": self.default_rate, **self.rates},
+            "seen": dict(self.seen),
+            "kept": dict(self.kept),
+        }
+
+telemetry_sampler = TelemetrySampler(load_telemetry_sample_rates(), os.getenv("TELEMETRY_SAMPLE_SALT", ""))
+
+telemetry_sink = TelemetrySink(
+    ROOT_DIR / "logs",
+    max_queue=int(os.getenv("TELEMETRY_MAX_QUEUE", "10000")),
+    batch_size=int(os.getenv("TELEMETRY_BATCH_SIZE", "500")),
+    flush_interval=float(os.getenv("TELEMETRY_FLUSH_INTERVAL", "1.0")),
+)
+
+# Live metrics exposed at /api/metrics in Prometheus text format.
+# Subsystems register a collector returning exposition lines.
+METRICS_COLLECTORS: List[Callable[[], List[str]]] = []
+
+def _prom_labels(labels: Dict[str, Any]) -> str:
+    if not labels:
+        return ""
+    body = ",".join(
+        '{}="{}"'.format(k, str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for k, v in labels.items()
+    )
+    return "{" + body + "}"
+
+def prom_metric(name: str, kind: str, help_text: str, samples: List[Tuple[Dict[str, Any], float]]) -> List[str]:
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+    for labels, value in samples:
+        lines.append(f"{name}{_prom_labels(labels)} {value:g}")
+    return lines
+
+class RollingCounters:
+    """Counts per label over all time and over trailing windows.
+
+    Labels map to fixed slots and time maps to a fixed ring of buckets, so memory
+    never grows and an update is a few list increments. Updates happen on the
+    event loop thread only, so no locking is needed.
+    """
+
+    def __init__(self, labels: List[str], bucket_seconds: float = 10.0, buckets: int = 90):
+        self.labels = list(labels)
+        self.slots = {label: i for i, label in enumerate(self.labels)}
+        self.bucket_seconds = bucket_seconds
+        self.totals = [0] * len(self.labels)
+        self._ring = [[0] * len(self.labels) for _ in range(buckets)]
+        self._ring_epoch = [-1] * buckets
+
+    def _bucket(self, now: float) -> List[int]:
+        epoch = int(now // self.bucket_seconds)
+        i = epoch % len(self._ring)
+        if self._ring_epoch[i] != epoch:
+            self._ring_epoch[i] = epoch
+            row = self._ring[i]
+            for j in range(len(row)):
+                row[j] = 0
+        return self._ring[i]
+
+    def inc(self, label: str, amount: int = 1, now: Optional[float] = None) -> None:
+        slot = self.slots.get(label)
+        if slot is None:
+            return
+        self.totals[slot] += amount
+        self._bucket(time.monotonic() if now is None else now)[slot] += amount
+
+    def window(self, seconds: float, now: Optional[float] = None) -> List[int]:
+        """Counts per slot over the trailing `seconds` (bucket granularity)."""
+        now = time.monotonic() if now is None else now
+        current = int(now // self.bucket_seconds)
+        span = min(len(self._ring), max(1, int(-(-seconds // self.bucket_seconds))))
+        out = [0] * len(self.labels)
+        for epoch in range(current - span + 1, current + 1):
+            i = epoch % len(self._ring)
+            if self._ring_epoch[i] == epoch:
+                for j, v in enumerate(self._ring[i]):
+                    out[j] += v
+        return out
+
+class RollingHistogram(RollingCounters):
+    """Histogram over fixed upper bounds, with the same windows as RollingCounters."""
+
+    def __init__(self, bounds: List[float], bucket_seconds: float = 10.0, buckets: int = 90):
+        self.bounds = list(bounds)
+        super().__init__([str(b) for b in self.bounds] + ["+Inf"], bucket_seconds, buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float, now: Optional[float] = None) -> None:
+        slot = len(self.bounds)
+        for i, bound in enumerate(self.bounds):
+            if value <= bound:
+                slot = i
+                break
+        self.sum += value
+        self.count += 1
+        self.inc(self.labels[slot], now=now)
+
+    def cumulative(self, counts: List[int]) -> List[Tuple[str, int]]:
+        running, out = 0, []
+        for label, c in zip(self.labels, counts):
+            running += c
+            out.append((label, running))
+        return out
+
+METRIC_WINDOWS: Dict[str, float] = {"1m": 60.0, "5m": 300.0, "15m": 900.0}
+DURATION_BUCKETS_MS = [100, 250, 500, 1000, 2000, 3000, 5000, 8000, 12000, 20000, 30000]
+
+class TelemetryMetrics:
+    """Live counters fed by log_events before sampling."""
+
+    def __init__(self):
+        self.events = RollingCounters(list(get_args(TelemetryEventName)))
+        self.modes = RollingCounters(["ai", "rule", "fallback"])
+        self.tones = RollingCounters(["gentle", "analytical", "motivational", "spiritual", "direct"])
+        self.lengths = RollingCounters(["short", "medium", "long"])
+        self.duration_ms = RollingHistogram(DURATION_BUCKETS_MS)
+
+    def observe(self, ev: "TelemetryEvent", now: Optional[float] = None) -> None:
+        now = time.monotonic() if now is None else now
+        self.events.inc(ev.event, now=now)
+        if ev.tone:
+            self.tones.inc(ev.tone, now=now)
+        if ev.length:
+            self.lengths.inc(ev.length, now=now)
+        if ev.event == "reading_result":
+            if ev.mode:
+                self.modes.inc(ev.mode, now=now)
+            if ev.durationMs is not None and ev.durationMs >= 0:
+                self.duration_ms.observe(ev.durationMs, now=now)
+
+    def _counter_lines(self, name: str, label: str, help_text: str, counters: RollingCounters, now: float) -> List[str]:
+        lines = prom_metric(f"{name}_total", "counter", help_text,
+                            [({label: l}, v) for l, v in zip(counters.labels, counters.totals)])
+        windowed = []
+        for window, seconds in METRIC_WINDOWS.items():
+            windowed += [({label: l, "window": window}, v) for l, v in zip(counters.labels, counters.window(seconds, now))]
+        return lines + prom_metric(f"{name}_window", "gauge", f"{help_text} Trailing window.", windowed)
+
+    def collect(self) -> List[str]:
+        now = time.monotonic()
+        lines = self._counter_lines("tarot_telemetry_events", "event", "Telemetry events received.", self.events, now)
+        lines += self._counter_lines("tarot_reading_mode", "mode", "reading_result events by interpretation mode.", self.modes, now)
+        lines += self._counter_lines("tarot_reading_tone", "tone", "Telemetry events by tone.", self.tones, now)
+        lines += self._counter_lines("tarot_reading_length", "length", "Telemetry events by length.", self.lengths, now)
+        hist = self.duration_ms
+        lines += [
+            "# HELP tarot_reading_duration_ms reading_result durationMs.",
+            "# TYPE tarot_reading_duration_ms histogram",
+        ]
+        lines += [f'tarot_reading_duration_ms_bucket{{le="{le}"}} {v}' for le, v in hist.cumulative(hist.totals)]
+        lines += [f"tarot_reading_duration_ms_sum {hist.sum:g}", f"tarot_reading_duration_ms_count {hist.count}"]
+        windowed = []
+        for window, seconds in METRIC_WINDOWS.items():
+            windowed += [({"le": le, "window": window}, v) for le, v in hist.cumulative(hist.window(seconds, now))]
+        lines += prom_metric("tarot_reading_duration_ms_window_bucket", "gauge",
+                             "reading_result durationMs cumulative buckets over a trailing window.", windowed)
+        return lines
+
+telemetry_metrics = TelemetryMetrics()
+
+def _collect_telemetry_metrics() -> List[str]:
+    return telemetry_metrics.collect()
+
+def _collect_telemetry_pipeline() -> List[str]:
+    stats = telemetry_sink.stats()
+    sampling = telemetry_sampler.stats()
+    lines = prom_metric("tarot_telemetry_queue_depth", "gauge", "Telemetry records waiting to be written.", [({}, stats["queue_depth"])])
+    for key in ("enqueued", "written", "dropped", "write_errors"):
+        lines += prom_metric(f"tarot_telemetry_{key}_total", "counter", f"Telemetry records {key.replace('_', ' ')}.", [({}, stats[key])])
+    lines += prom_metric("tarot_telemetry_sampled_kept_total", "counter", "Telemetry events kept by sampling.",
+                         [({"event": e}, n) for e, n in sorted(sampling["kept"].items())])
+    return lines
+
+METRICS_COLLECTORS.append(_collect_telemetry_metrics)
+METRICS_COLLECTORS.append(_collect_telemetry_pipeline)
+
+@api_router.get("/metrics")
+async def get_metrics():
+    lines: List[str] = []
+    for collect in METRICS_COLLECTORS:
+        try:
+            lines += collect()
         except Exception as e:
-            logging.warning(f"Failed to persist telemetry: {e}")
+            logging.warning(f"Metrics collector {getattr(collect, '__name__', collect)} failed: {e}")
+    return Response(content="\n".join(lines) + "\n", media_type="text/plain; version=0.0.4; charset=utf-8")
 
+@api_router.post("/log", status_code=204)
+async def log_events(payload: LogPayload, request: Request):
     ua = request.headers.get("user-agent", "")
     client_meta = {"ua": ua[:160]}
-    bg.add_task(_persist_events, payload, client_meta)
+    for ev in payload.events:
+        telemetry_metrics.observe(ev)
+        data = ev.model_dump()
+        data["ts"] = data.get("ts") or datetime.utcnow().isoformat()
+        data["id"] = str(uuid.uuid4())
+        data["client"] = client_meta
+        rate = telemetry_sampler.sample(data)
+        if rate is not None:
+            data["sampleRate"] = rate
+            telemetry_sink.submit(data)
     return Response(status_code=204)
 
+@api_router.get("/log/stats")
+async def get_log_stats():
+    return {**telemetry_sink.stats(), "sampling": telemetry_sampler.stats()}
+
 @api_router.get("/reading-types", response_model=List[ReadingType])
 async def get_reading_types():
     return [ReadingType(**reading_type) for reading_type in READING_TYPES]
 
 @api_router.get("/cards", response_model=List[TarotCard])
-async def get_cards(language: str = "en"):
+async def get_cards(request: Request, language: str = "en"):
+    catalog = get_card_catalog(language)
+    return cached_response(request, catalog.list_json, "application/json", catalog.list_etag,
+                           catalog.last_modified, CACHE_CONTROL_METADATA)
+
+# Stored readings reference catalog cards instead of embedding them:
+# {"schema": 2, "id", "reading_type", "language", "mode", "interpretation",
+#  "timestamp", "cards": [{"card_id", "position" (index), "reversed"}],
+#  "prompt_version" (AI interpretations only)}
+# Documents without "schema" are the original embedded shape and are read as-is.
+READING_SCHEMA_VERSION = 2
+
+def compact_reading(reading: TarotReading, language: str) -> Dict[str, Any]:
+    doc = {
+        "schema": READING_SCHEMA_VERSION,
+        "id": reading.id,
+        "reading_type": reading.reading_type,
+        "language": normalize_language(language),
+        "cards": [
+            {"card_id": item["card"]["id"], "position": i, "reversed": item["reversed"]}
+            for i, item in enumerate(reading.cards)
+        ],
+        "interpretation": reading.interpretation,
+        "mode": reading.mode,
+        "timestamp": reading.timestamp,
+    }
+    if reading.prompt_version is not None:
+        doc["prompt_version"] = reading.prompt_version
+    return doc
+
+def rehydrate_reading(doc: Dict[str, Any]) -> TarotReading:
+    """TarotReading from a stored document; interpretation is "" when projected out."""
+    doc = {k: v for k, v in doc.items() if k != "_id"}
+    doc.setdefault("interpretation", "")
+    if doc.get("schema") != READING_SCHEMA_VERSION:
+        return TarotReading(**doc)
+    catalog = get_card_catalog(doc.get("language"))
+    config = get_deck_index().reading_type(doc["reading_type"]) or {}
+    positions = config.get("positions", [])
     cards = []
-    for card_data in get_unique_major_arcana():
-        if card_data.get('id') in IMAGES_BY_ID:
-            card_data['image_local'] = IMAGES_BY_ID[card_data['id']]
-        if language == "tr":
-            card = {
-                "id": card_data["id"],
-                "name": card_data.get("name_tr", card_data["name"]),
-                "image_url": card_data["image_url"],
-                "keywords": card_data.get("keywords_tr", card_data["keywords"]),
-                "meaning_upright": card_data.get("meaning_upright_tr", card_data["meaning_upright"]),
-                "meaning_reversed": card_data.get("meaning_reversed_tr", card_data["meaning_reversed"]),
-                "description": card_data.get("description_tr", card_data["description"]),
-                "symbolism": card_data.get("symbolism_tr", card_data["symbolism"]),
-                "yes_no_meaning": card_data.get("yes_no_meaning_tr", card_data["yes_no_meaning"]),
-                "image_base64": None
-            }
-        else:
-            card = {
-                "id": card_data["id"],
-                "name": card_data["name"],
-                "image_url": card_data["image_url"],
-                "keywords": card_data["keywords"],
-                "meaning_upright": card_data["meaning_upright"],
-                "meaning_reversed": card_data["meaning_reversed"],
-                "description": card_data["description"],
-                "symbolism": card_data["symbolism"],
-                "yes_no_meaning": card_data["yes_no_meaning"],
-                "image_base64": None
-            }
-        cards.append(card)
-    return cards
+    for item in doc["cards"]:
+        index = item["position"]
+        cards.append({
+            "card": dict(catalog.cards_by_id[item["card_id"]]),
+            "position": positions[index] if index < len(positions) else str(index),
+            "reversed": item["reversed"],
+        })
+    return TarotReading(
+        id=doc["id"],
+        reading_type=doc["reading_type"],
+        cards=cards,
+        interpretation=doc["interpretation"],
+        mode=doc.get("mode", "rule"),
+        timestamp=doc["timestamp"],
+        prompt_version=doc.get("prompt_version"),
+    )
 
-@api_router.post("/reading/{reading_type}", response_model=TarotReading)
-async def create_reading(reading_type: str, question: Optional[str] = None, language: str = "en", ai: Optional[str] = None, tone: Optional[str] = "gentle", length: Optional[str] = "medium"):
-    # Normalize enums
-    tone_allowed = {"gentle", "analytical", "motivational", "spiritual", "direct"}
-    length_allowed = {"short", "medium", "long"}
-    if tone not in tone_allowed:
-        tone = "gentle"
-    if length not in length_allowed:
-        length = "medium"
-    ai_bypass = (ai == "off")
+from pymongo import IndexModel
+from pymongo.errors import BulkWriteError
+
+READINGS_WRITE_MODES = ("ack", "write_behind")
+
+class ReadingUpdate(NamedTuple):
+    reading_id: str
+    fields: Dict[str, Any]
+
+class ReadingWriter:
+    """Persists readings to db.readings.
+
+    In "ack" mode each reading is inserted before the response is sent. In
+    "write_behind" mode readings are queued and a writer task inserts them in
+    batches with insert_many(ordered=False). The queue is bounded: when it is
+    full, submit waits for room instead of dropping readings. stop() flushes
+    whatever is still queued.
+
+    update() goes through the same queue, so it is applied after the insert of
+    a reading submitted before it.
+    """
+
+    _STOP = object()
+
+    def __init__(self, mode: str = "ack", max_queue: int = 1000, batch_size: int = 100, flush_interval: float = 0.2):
+        if mode not in READINGS_WRITE_MODES:
+            logging.warning(f"Unknown READINGS_WRITE_MODE {mode!r}, using 'ack'")
+            mode = "ack"
+        self.mode = mode
+        self.max_queue = max_queue
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.enqueued = 0
+        self.written = 0
+        self.batches = 0
+        self.write_errors = 0
+        self.backpressure_waits = 0
+        self.updated = 0
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "mode": self.mode,
+            "queue_depth": self.queue_depth,
+            "enqueued": self.enqueued,
+            "written": self.written,
+            "batches": self.batches,
+            "write_errors": self.write_errors,
+            "backpressure_waits": self.backpressure_waits,
+            "updated": self.updated,
+        }
+
+    def start(self) -> None:
+        if self.mode == "write_behind" and (self._task is None or self._task.done()):
+            # A restarted writer keeps the readings a dead one left queued
+            if self._queue is None or self._queue.empty():
+                self._queue = asyncio.Queue(maxsize=self.max_queue)
+            self._task = asyncio.create_task(self._run())
+
+    async def submit(self, doc: Dict[str, Any]) -> None:
+        if self.mode == "ack":
+            await db.readings.insert_one(doc)
+            self.written += 1
+            return
+        await self._enqueue(doc)
+
+    async def update(self, reading_id: str, fields: Dict[str, Any]) -> None:
+        """$set fields on a reading submitted earlier."""
+        if self.mode == "ack":
+            await self._apply_update(ReadingUpdate(reading_id, fields))
+            return
+        await self._enqueue(ReadingUpdate(reading_id, fields))
+
+    async def _enqueue(self, item: Any) -> None:
+        self.start()
+        if self._queue.full():
+            self.backpressure_waits += 1
+        await self._queue.put(item)
+        self.enqueued += 1
 
-    # Find reading type
-    reading_config = None
-    for rt in READING_TYPES:
-        if rt["id"] == reading_type:
-            reading_config = rt
-            break
+    async def stop(self) -> None:
+        """Flush everything still queued."""
+        if self._task is not None and not self._task.done():
+            await self._queue.put(self._STOP)
+            await self._task
+        self._task = None
+
+    async def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            item = await self._queue.get()
+            if item is self._STOP:
+                break
+            if isinstance(item, ReadingUpdate):
+                await self._apply_update(item)
+                continue
+            # An update ends the batch so it is applied after the inserts before it
+            batch, boundary = await drain_batch(self._queue, item, self.batch_size, self.flush_interval,
+                                                lambda i: i is self._STOP or isinstance(i, ReadingUpdate))
+            await self._write_batch(batch)
+            if isinstance(boundary, ReadingUpdate):
+                await self._apply_update(boundary)
+            stopping = boundary is self._STOP
+
+    async def _write_batch(self, batch: List[Dict[str, Any]]) -> None:
+        try:
+            await db.readings.insert_many(batch, ordered=False)
+            self.written += len(batch)
+        except BulkWriteError as e:
+            # Unordered: everything except the failed documents was inserted
+            self.written += e.details.get("nInserted", 0)
+            self.write_errors += len(e.details.get("writeErrors", []))
+            logging.warning(f"Failed to persist {len(e.details.get('writeErrors', []))} readings: {e}")
+        except Exception as e:
+            self.write_errors += len(batch)
+            logging.warning(f"Failed to persist {len(batch)} readings: {e}")
+        self.batches += 1
+
+    async def _apply_update(self, update: ReadingUpdate) -> None:
+        try:
+            await db.readings.update_one({"id": update.reading_id}, {"$set": update.fields})
+            self.updated += 1
+        except Exception as e:
+            self.write_errors += 1
+            logging.warning(f"Failed to update reading {update.reading_id}: {e}")
+
+reading_writer = ReadingWriter(
+    os.getenv("READINGS_WRITE_MODE", "ack"),
+    max_queue=int(os.getenv("READINGS_WRITE_QUEUE", "1000")),
+    batch_size=int(os.getenv("READINGS_WRITE_BATCH", "100")),
+    flush_interval=float(os.getenv("READINGS_WRITE_FLUSH_INTERVAL", "0.2")),
+)
+
+def _collect_reading_writer() -> List[str]:
+    stats = reading_writer.stats()
+    lines = prom_metric("tarot_readings_write_queue_depth", "gauge", "Readings waiting to be written.",
+                        [({"mode": stats["mode"]}, stats["queue_depth"])])
+    for key in ("written", "updated", "write_errors", "backpressure_waits"):
+        lines += prom_metric(f"tarot_readings_{key}_total", "counter", f"Readings {key.replace('_', ' ')}.", [({}, stats[key])])
+    return lines
+
+METRICS_COLLECTORS.append(_collect_reading_writer)
+
+TONES = ("gentle", "analytical", "motivational", "spiritual", "direct")
+LENGTHS = ("short", "medium", "long")
+
+def normalize_reading_options(tone: Optional[str], length: Optional[str]) -> Tuple[str, str]:
+    return (tone if tone in TONES else "gentle", length if length in LENGTHS else "medium")
+
+def draw_reading_cards(reading_type: str, language: str) -> List[Dict[str, Any]]:
+    """Random draw for a reading type with localized catalog cards; 404 if unknown."""
+    reading_config = get_deck_index().reading_type(reading_type)
     if not reading_config:
         raise HTTPException(status_code=404, detail="Reading type not found")
 
     selected_cards = random.sample(get_unique_major_arcana(), reading_config["card_count"])
 
+    catalog = get_card_catalog(language)
     reading_cards = []
     for i, card_data in enumerate(selected_cards):
-        if language == "tr":
-            card_info = {
-                "id": card_data["id"],
-                "name": card_data.get("name_tr", card_data["name"]),
-                "image_url": card_data["image_url"],
-                "keywords": card_data.get("keywords_tr", card_data["keywords"]),
-                "meaning_upright": card_data.get("meaning_upright_tr", card_data["meaning_upright"]),
-                "meaning_reversed": card_data.get("meaning_reversed_tr", card_data["meaning_reversed"]),
-                "description": card_data.get("description_tr", card_data["description"]),
-                "symbolism": card_data.get("symbolism_tr", card_data["symbolism"]),
-                "yes_no_meaning": card_data.get("yes_no_meaning_tr", card_data["yes_no_meaning"])
-            }
-        else:
-            card_info = {
-                "id": card_data["id"],
-                "name": card_data["name"],
-                "image_url": card_data["image_url"],
-                "keywords": card_data["keywords"],
-                "meaning_upright": card_data["meaning_upright"],
-                "meaning_reversed": card_data["meaning_reversed"],
-                "description": card_data["description"],
-                "symbolism": card_data["symbolism"],
-                "yes_no_meaning": card_data["yes_no_meaning"]
-            }
+        card_info = dict(catalog.cards_by_id[card_data["id"]])
         card_with_position = {
             "card": card_info,
             "position": reading_config["positions"][i],
             "reversed": random.choice([True, False])
         }
         reading_cards.append(card_with_position)
+    return reading_cards
 
-    interpretation_text, mode = generate_interpretation(
-        reading_type, reading_cards, question, language, tone, length, ai_bypass
-    )
+@api_router.post("/reading/{reading_type}", response_model=TarotReading)
+async def create_reading(reading_type: str, question: Optional[str] = None, language: str = "en", ai: Optional[str] = None, tone: Optional[str] = "gentle", length: Optional[str] = "medium", deadline: Optional[float] = None, job: bool = False):
+    """deadline: seconds to wait for the AI text before serving the rule text
+    as "fallback" (defaults to AI_READING_DEADLINE; unset waits for the AI).
+    job: return at once with mode "pending"; poll /api/reading-jobs/{id}."""
+    tone, length = normalize_reading_options(tone, length)
+    ai_bypass = (ai == "off")
+    reading_cards = draw_reading_cards(reading_type, language)
+    prompt_version = prompt_templates.active
+
+    if job and os.getenv('EMERGENT_LLM_KEY') and not ai_bypass:
+        reading = TarotReading(reading_type=reading_type, cards=reading_cards, interpretation="", mode="pending")
+        await reading_writer.submit(compact_reading(reading, language))
+        # Queued after submit, so the worker's update follows the insert
+        params = {"question": question, "language": language, "tone": tone, "length": length,
+                  "prompt_version": prompt_version}
+        response = reading.model_copy()
+        if not ai_job_queue.try_submit(reading, params):
+            response.interpretation = rule_interpretation(reading_type, reading_cards, language, length)
+            response.mode = "fallback"
+            await reading_writer.update(reading.id, {"interpretation": response.interpretation, "mode": response.mode})
+        return response
+
+    generate = generate_interpretation(reading_type, reading_cards, question, language, tone, length, ai_bypass,
+                                       prompt_version)
+    deadline = interpretation_race.resolve_deadline(deadline)
+    late = None
+    if deadline is not None and os.getenv('EMERGENT_LLM_KEY') and not ai_bypass:
+        interpretation_text, mode, late = await interpretation_race.run(
+            deadline, generate, rule_interpretation(reading_type, reading_cards, language, length)
+        )
+    else:
+        interpretation_text, mode = await generate
 
     reading = TarotReading(
         reading_type=reading_type,
         cards=reading_cards,
         interpretation=interpretation_text,
-        mode=mode
+        mode=mode,
+        prompt_version=prompt_version if mode == "ai" else None,
     )
 
-    # Persist
-    await db.readings.insert_one(reading.dict())
+    # Persist (or queue, in write-behind mode)
+    await reading_writer.submit(compact_reading(reading, language))
+    if late is not None:
+        # Started only after submit, so the update follows the insert
+        interpretation_race.track(interpretation_race.store_late_result(reading.id, late, prompt_version))
 
     return reading
 
-# Readings list
+def sse_event(event: str, data: Any) -> bytes:
+    return f"event: {event}\ndata: {json.dumps(jsonable_encoder(data), ensure_ascii=False)}\n\n".encode("utf-8")
+
+# Stream persists run as tasks so a second cancellation cannot abort them
+_stream_persists: set = set()
+
+async def drain_stream_persists(timeout: float) -> None:
+    """Wait for readings of disconnected streams to reach the writer."""
+    if _stream_persists:
+        await asyncio.wait(set(_stream_persists), timeout=timeout)
+
+@api_router.post("/reading/{reading_type}/stream")
+async def create_reading_stream(reading_type: str, question: Optional[str] = None, language: str = "en", ai: Optional[str] = None, tone: Optional[str] = "gentle", length: Optional[str] = "medium"):
+    """Server-Sent Events variant of create_reading.
+
+    Events: "cards" (the draw, sent immediately, with the reading id),
+    "token" ({"text": delta}, interpretation text as it is generated) and
+    "done" (the stored TarotReading). The done event's interpretation is
+    authoritative: it is trimmed at a sentence boundary like the non-streaming
+    endpoint, so it can be shorter than the concatenated tokens.
+    """
+    tone, length = normalize_reading_options(tone, length)
+    ai_bypass = (ai == "off")
+    reading_cards = draw_reading_cards(reading_type, language)
+    reading = TarotReading(reading_type=reading_type, cards=reading_cards, interpretation="", mode="rule")
+    prompt_version = prompt_templates.active
+
+    async def events():
+        ai_key = os.getenv('EMERGENT_LLM_KEY')
+        text, mode = None, "rule"
+        limiter: Optional[StreamLengthLimiter] = None
+        try:
+            yield sse_event("cards", {"id": reading.id, "reading_type": reading_type, "cards": reading_cards,
+                                      "timestamp": reading.timestamp})
+            if ai_key and not ai_bypass:
+                prompt = build_interpretation_prompt(reading_type, reading_cards, question, language, tone, length,
+                                                     prompt_version)
+                cache_key = ai_cache_key(prompt) if ai_response_cache is not None and not question else None
+                if cache_key:
+                    text = await ai_response_cache.pick(cache_key)
+                if text:
+                    mode = "ai"
+                    yield sse_event("token", {"text": text})
+                else:
+                    limiter = StreamLengthLimiter(length)
+                    outcome: Dict[str, Any] = {}
+                    try:
+                        async with ai_upstream_guard.admit():
+                            start = time.monotonic()
+                            try:
+                                async with contextlib.aclosing(stream_ai_completion(ai_key, prompt, (language, tone, length), outcome)) as deltas:
+                                    # The adaptive timeout bounds the wait for the first token only
+                                    try:
+                                        first = await asyncio.wait_for(anext(deltas), timeout=ai_upstream_guard.timeout())
+                                    except asyncio.TimeoutError:
+                                        ai_upstream_guard.timeouts += 1
+                                        raise
+                                    ai_upstream_guard.record(True, time.monotonic() - start)
+                                    emitted = limiter.feed(first)
+                                    if emitted:
+                                        yield sse_event("token", {"text": emitted})
+                                    async for delta in deltas:
+                                        if limiter.exhausted:
+                                            break
+                                        emitted = limiter.feed(delta)
+                                        if emitted:
+                                            yield sse_event("token", {"text": emitted})
+                            except Exception:
+                                if not limiter.words:
+                                    ai_upstream_guard.record(False)
+                                raise
+                    except UpstreamUnavailable as e:
+                        logging.debug(f"AI upstream skipped, falling back: {e}")
+                    except Exception as e:
+                        logging.warning(f"AI stream failed after {limiter.words} words: {e}")
+                    text = limiter.final_text() if limiter.words else None
+                    truncated = outcome.get("finish_reason") == "length"
+                    if text and truncated:
+                        # Cut off by max_tokens: the done event carries the last full sentence
+                        text = trim_to_sentence(text)
+                    if text:
+                        mode = "ai"
+                        if cache_key and not truncated:
+                            await ai_response_cache.put(cache_key, text)
+                    else:
+                        mode = "fallback"
+            if not text:
+                text = rule_interpretation(reading_type, reading_cards, language, length)
+                yield sse_event("token", {"text": text})
+        finally:
+            # The id went out with the cards event, so the reading is stored even
+            # when the client leaves early, with whatever text exists by then
+            if not text:
+                partial = trim_to_sentence(limiter.final_text()) if limiter is not None and limiter.words else None
+                if partial:
+                    text, mode = partial, "ai"
+                else:
+                    text = rule_interpretation(reading_type, reading_cards, language, length)
+                    mode = "fallback" if ai_key and not ai_bypass else "rule"
+            reading.interpretation = text
+            reading.mode = mode
+            reading.prompt_version = prompt_version if mode == "ai" else None
+            persist = asyncio.ensure_future(reading_writer.submit(compact_reading(reading, language)))
+            _stream_persists.add(persist)
+            persist.add_done_callback(_stream_persists.discard)
+            await asyncio.shield(persist)
+        yield sse_event("done", reading)
+
+    return StreamingResponse(events(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+# Readings list, newest first. Pages are keyset-based on (timestamp, id) and
+# served by the readings_timestamp_id index, so a page costs O(limit).
+READINGS_PAGE_MAX = 100
+READINGS_SORT = [("timestamp", -1), ("id", -1)]
+
+READINGS_INDEXES = [
+    IndexModel(READINGS_SORT, name="readings_timestamp_id"),
+    IndexModel([("reading_type", 1)], name="readings_reading_type"),
+    IndexModel([("id", 1)], name="readings_id"),
+]
+
+async def ensure_readings_indexes() -> None:
+    try:
+        await db.readings.create_indexes(READINGS_INDEXES)
+    except Exception as e:
+        logging.warning(f"Failed to create readings indexes: {e}")
+
+def encode_readings_cursor(doc: Dict[str, Any]) -> str:
+    ts = doc["timestamp"]
+    raw = json.dumps({"ts": ts.isoformat(), "id": doc["id"]}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+def decode_readings_cursor(cursor: str) -> Dict[str, Any]:
+    """Filter selecting readings strictly after the cursor position."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        data = json.loads(raw)
+        ts = datetime.fromisoformat(data["ts"])
+        last_id = str(data["id"])
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return {"$or": [{"timestamp": {"$lt": ts}}, {"timestamp": ts, "id": {"$lt": last_id}}]}
+
 @api_router.get("/readings", response_model=List[TarotReading])
-async def get_readings(limit: int = 10):
-    readings = await db.readings.find().sort("timestamp", -1).limit(limit).to_list(limit)
-    return [TarotReading(**reading) for reading in readings]
+async def get_readings(response: Response, limit: int = Query(10, ge=1, le=READINGS_PAGE_MAX), cursor: Optional[str] = None,
+                       include_interpretation: bool = True):
+    query = decode_readings_cursor(cursor) if cursor else {}
+    projection = {"_id": 0} if include_interpretation else {"_id": 0, "interpretation": 0}
+    readings = await db.readings.find(query, projection).sort(READINGS_SORT).limit(limit).to_list(limit)
+    if len(readings) == limit:
+        response.headers["X-Next-Cursor"] = encode_readings_cursor(readings[-1])
+    return [rehydrate_reading(reading) for reading in readings]
 
 # AI-powered interpretation function
-import requests as _requests
+import httpx
 
-def generate_interpretation(reading_type: str, cards: List[Dict], question: Optional[str] = None, language: str = "en", tone: str = "gentle", length: str = "medium", ai_bypass: bool = False) -> Tuple[str, str]:
-    """Generate interpretation using AI if available; fallback to rule-based text.
-    tone: gentle|analytical|motivational|spiritual|direct (AI only)
-    length: short|medium|long (applies to both AI and fallback via post-processing)
-    Returns (text, mode)
-    """
-    ai_key = os.getenv('EMERGENT_LLM_KEY')
+# Shared, pooled HTTP client for the upstream chat completions API. Created in
+# the startup hook and closed on shutdown; lazily created if used before startup.
+_ai_http_client: Optional[httpx.AsyncClient] = None
+
+def get_ai_http_client() -> httpx.AsyncClient:
+    global _ai_http_client
+    if _ai_http_client is None or _ai_http_client.is_closed:
+        max_conn = int(os.getenv("OPENAI_MAX_CONNECTIONS", "20"))
+        _ai_http_client = httpx.AsyncClient(
+            timeout=httpx.Timeout(float(os.getenv("OPENAI_TIMEOUT", "20")), connect=5.0),
+            limits=httpx.Limits(max_connections=max_conn, max_keepalive_connections=max_conn),
+        )
+    return _ai_http_client
 
-    TONE_GUIDE_TR = {
-        "gentle": "Üslup: nazik, empatik, yargısız.",
-        "analytical": "Üslup: analitik, kanıtsal, net yapı.",
-        "motivational": "Üslup: motive edici, cesaretlendiren.",
-        "spiritual": "Üslup: sezgisel, ritüel/dingin dil; aşırı determinizmden kaçın.",
-        "direct": "Üslup: doğrudan, kısa ve net; dolandırmadan öner."
+async def close_ai_http_client() -> None:
+    global _ai_http_client
+    if _ai_http_client is not None:
+        await _ai_http_client.aclose()
+        _ai_http_client = None
+
+def ai_completion_request(ai_key: str, prompt: str, stream: bool = False, max_tokens: Optional[int] = None) -> Tuple[str, Dict[str, str], Dict[str, Any]]:
+    """(url, headers, payload) for a chat completions call; max_tokens defaults to OPENAI_MAX_TOKENS."""
+    payload = {
+        "model": os.getenv("OPENAI_MODEL", "gpt-4o-mini"),
+        "messages": [
+            {"role": "system", "content": "You are an expert Tarot interpreter."},
+            {"role": "user", "content": prompt}
+        ],
+        "temperature": float(os.getenv("OPENAI_TEMPERATURE", "0.7")),
+        "max_tokens": max_tokens or int(os.getenv("OPENAI_MAX_TOKENS", "600"))
     }
-    LENGTH_GUIDE_TR = {
-        "short": "Yaklaşık 100 kelime (±%20).",
-        "medium": "Yaklaşık 200 kelime (±%20).",
-        "long": "Yaklaşık 350 kelime (±%20)."
+    if stream:
+        payload["stream"] = True
+    headers = {
+        "Authorization": f"Bearer {ai_key}",
+        "Content-Type": "application/json"
     }
+    url = os.getenv("OPENAI_BASE_URL", "https://api.openai.com/v1") + "/chat/completions"
+    return url, headers, payload
+
+class AICompletion(NamedTuple):
+    text: str
+    truncated: bool  # cut off by max_tokens and trimmed to its last full sentence; not cacheable
+
+_SENTENCE_BREAK = re.compile(r"[.!?…][\"'”’)]*(?=\s|$)|\n")
 
-    TARGET_WORDS = {"short": 100, "medium": 200, "long": 350}
+def trim_to_sentence(text: str) -> Optional[str]:
+    """Text up to its last sentence end or line break; None when it has neither."""
+    ends = [m.end() for m in _SENTENCE_BREAK.finditer(text)]
+    trimmed = text[:ends[-1]].rstrip() if ends else ""
+    return trimmed or None
 
-    def postprocess_length(text: str) -> str:
+async def fetch_ai_completion(ai_key: str, prompt: str, sizing: Optional[Tuple[str, str, str]] = None) -> Optional[AICompletion]:
+    """POST the prompt to the chat completions API; returns the completion or None.
+
+    sizing is (language, tone, length): max_tokens comes from the token budget
+    and the reported usage is fed back into it. A completion cut off by
+    max_tokens is trimmed to its last full sentence and marked truncated.
+    """
+    max_tokens = token_budget.max_tokens(prompt, *sizing) if sizing else None
+    url, headers, payload = ai_completion_request(ai_key, prompt, max_tokens=max_tokens)
+    resp = await get_ai_http_client().post(url, headers=headers, content=json.dumps(payload))
+    if resp.status_code == 200:
+        data = resp.json()
+        if data.get("choices"):
+            choice = data["choices"][0]
+            content = choice["message"]["content"]
+            if content and isinstance(content, str):
+                if sizing:
+                    token_budget.record(prompt, *sizing, content, data.get("usage"), choice.get("finish_reason"))
+                if choice.get("finish_reason") == "length":
+                    text = trim_to_sentence(content.strip())
+                    return AICompletion(text, True) if text else None
+                return AICompletion(content.strip(), False)
+    else:
+        logging.warning(f"AI upstream returned HTTP {resp.status_code}")
+    return None
+
+async def stream_ai_completion(ai_key: str, prompt: str, sizing: Optional[Tuple[str, str, str]] = None,
+                               outcome: Optional[Dict[str, Any]] = None):
+    """Yield content deltas from a streamed chat completion.
+
+    Raises on a non-200 response; closing the generator early closes the
+    upstream connection, which stops generation there. Streams carry no usage,
+    so they are sized by the token budget but do not tune it. The finish
+    reason, once seen, is stored in outcome["finish_reason"].
+    """
+    max_tokens = token_budget.max_tokens(prompt, *sizing) if sizing else None
+    url, headers, payload = ai_completion_request(ai_key, prompt, stream=True, max_tokens=max_tokens)
+    async with get_ai_http_client().stream("POST", url, headers=headers, content=json.dumps(payload)) as resp:
+        if resp.status_code != 200:
+            raise RuntimeError(f"AI upstream returned HTTP {resp.status_code}")
+        async for line in resp.aiter_lines():
+            if not line.startswith("data:"):
+                continue
+            data = line[5:].strip()
+            if data == "[DONE]":
+                break
+            choices = json.loads(data).get("choices") or []
+            if choices and choices[0].get("finish_reason") and outcome is not None:
+                outcome["finish_reason"] = choices[0]["finish_reason"]
+            delta = (choices[0].get("delta") or {}).get("content") if choices else None
+            if delta:
+                yield delta
+
+class UpstreamUnavailable(Exception):
+    """The AI upstream was not called: breaker open or no free concurrency slot."""
+
+class UpstreamGuard:
+    """Resilience layer around AI upstream calls.
+
+    - At most max_concurrency calls run at once; a caller that cannot get a
+      slot within queue_timeout is rejected instead of queueing behind a
+      degraded upstream.
+    - A circuit breaker opens after failure_threshold consecutive failures
+      (errors, timeouts, empty answers, or calls slower than slow_call_seconds).
+      While open, calls are rejected immediately; after open_seconds one probe
+      is let through (half-open) and its outcome closes or reopens the breaker.
+    - The timeout adapts to the p95 of recent successful calls, clamped to
+      [min_timeout, max_timeout].
+    """
+
+    CLOSED, HALF_OPEN, OPEN = "closed", "half_open", "open"
+
+    def __init__(self, max_concurrency: int = 16, queue_timeout: float = 2.0, failure_threshold: int = 5,
+                 open_seconds: float = 30.0, slow_call_seconds: float = 10.0, min_timeout: float = 3.0,
+                 max_timeout: float = 20.0, timeout_multiplier: float = 1.5, min_samples: int = 20,
+                 window: int = 200):
+        self.max_concurrency = max_concurrency
+        self.queue_timeout = queue_timeout
+        self.failure_threshold = failure_threshold
+        self.open_seconds = open_seconds
+        self.slow_call_seconds = slow_call_seconds
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self.timeout_multiplier = timeout_multiplier
+        self.min_samples = min_samples
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._latencies: "deque[float]" = deque(maxlen=window)
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self._opened_at = 0.0
+        self._probe_inflight = False
+        self._half_opens = 0  # identifies the current half-open cycle
+        self.inflight = 0
+        self.successes = 0
+        self.failures = 0
+        self.timeouts = 0
+        self.slow_calls = 0
+        self.short_circuited = 0
+        self.rejected = 0
+        self.trips = 0
+
+    def p95(self) -> Optional[float]:
+        if len(self._latencies) < self.min_samples:
+            return None
+        ordered = sorted(self._latencies)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+
+    def timeout(self) -> float:
+        p95 = self.p95()
+        if p95 is None:
+            return self.max_timeout
+        return min(self.max_timeout, max(self.min_timeout, p95 * self.timeout_multiplier))
+
+    def allow(self) -> bool:
+        """Whether a call may start now; moves open to half-open once the cool-down has passed."""
+        if self.state == self.OPEN and time.monotonic() - self._opened_at >= self.open_seconds:
+            self.state = self.HALF_OPEN
+            self._probe_inflight = False
+            self._half_opens += 1
+        if self.state == self.CLOSED:
+            return True
+        if self.state == self.HALF_OPEN and not self._probe_inflight:
+            self._probe_inflight = True
+            return True
+        return False
+
+    def record(self, ok: bool, elapsed: Optional[float] = None) -> None:
+        """Outcome of a call; elapsed feeds the adaptive timeout when given."""
+        if ok and elapsed is not None and elapsed > self.slow_call_seconds:
+            self.slow_calls += 1
+            ok = False
+        if ok:
+            self.successes += 1
+            self.consecutive_failures = 0
+            if elapsed is not None:
+                self._latencies.append(elapsed)
+            self.state = self.CLOSED
+        else:
+            self.failures += 1
+            self.consecutive_failures += 1
+            if self.state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    self.trips += 1
+                    logging.warning(f"AI circuit breaker open after {self.consecutive_failures} failures")
+                self.state = self.OPEN
+                self._opened_at = time.monotonic()
+        self._probe_inflight = False
+
+    @contextlib.asynccontextmanager
+    async def admit(self):
+        """Breaker check plus a concurrency slot; raises UpstreamUnavailable.
+
+        A half-open probe that ends without a recorded outcome (rejected,
+        cancelled, client gone) is released so the next call can probe.
+        """
+        if not self.allow():
+            self.short_circuited += 1
+            raise UpstreamUnavailable("circuit breaker open")
+        probe = self._half_opens if self.state == self.HALF_OPEN else None
         try:
-            target = TARGET_WORDS.get(length, 200)
-            words = text.split()
-            max_words = int(target * 1.2)
-            if len(words) > max_words:
-                sentences = [s.strip() for s in text.replace('\n', ' ').split('.') if s.strip()]
-                out = []
-                count = 0
-                for s in sentences:
-                    wc = len(s.split())
-                    if count + wc <= max_words:
-                        out.append(s)
-                        count += wc
-                    else:
-                        break
-                txt = '. '.join(out)
-                if txt:
-                    if not txt.endswith('.'):
-                        txt += '.'
-                    return txt
-                return ' '.join(words[:max_words])
-            return text
-        except Exception:
-            return text
+            try:
+                await asyncio.wait_for(self._semaphore.acquire(), timeout=self.queue_timeout)
+            except asyncio.TimeoutError:
+                self.rejected += 1
+                raise UpstreamUnavailable("no free upstream slot")
+            self.inflight += 1
+            try:
+                yield
+            finally:
+                self.inflight -= 1
+                self._semaphore.release()
+        finally:
+            # record() moves the breaker out of half-open, so still being in
+            # this cycle means the probe's outcome was never recorded
+            if probe is not None and self.state == self.HALF_OPEN and self._half_opens == probe:
+                self._probe_inflight = False
 
-    def build_prompt() -> str:
-        lang_line = "Lütfen yanıtı Türkçe yaz." if language == "tr" else "Please respond in English."
-        rt = reading_type
-        if language == "tr":
-            rt = {
+    async def call(self, fn: Callable[[], Any]) -> Any:
+        """Run fn under the guard; a None result counts as a failure."""
+        async with self.admit():
+            start = time.monotonic()
+            try:
+                result = await asyncio.wait_for(fn(), timeout=self.timeout())
+            except asyncio.TimeoutError:
+                self.timeouts += 1
+                self.record(False)
+                raise
+            except Exception:
+                self.record(False)
+                raise
+            self.record(result is not None, time.monotonic() - start)
+            return result
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "state": self.state, "inflight": self.inflight, "timeout": self.timeout(), "p95": self.p95(),
+            "successes": self.successes, "failures": self.failures, "timeouts": self.timeouts,
+            "slow_calls": self.slow_calls, "short_circuited": self.short_circuited,
+            "rejected": self.rejected, "trips": self.trips,
+        }
+
+def build_upstream_guard() -> UpstreamGuard:
+    return UpstreamGuard(
+        max_concurrency=int(os.getenv("AI_MAX_CONCURRENCY", "16")),
+        queue_timeout=float(os.getenv("AI_QUEUE_TIMEOUT", "2")),
+        failure_threshold=int(os.getenv("AI_BREAKER_FAILURES", "5")),
+        open_seconds=float(os.getenv("AI_BREAKER_OPEN_SECONDS", "30")),
+        slow_call_seconds=float(os.getenv("AI_SLOW_CALL_SECONDS", "10")),
+        min_timeout=float(os.getenv("AI_TIMEOUT_MIN", "3")),
+        max_timeout=float(os.getenv("OPENAI_TIMEOUT", "20")),
+    )
+
+ai_upstream_guard = build_upstream_guard()
+
+def _collect_ai_upstream_guard() -> List[str]:
+    stats = ai_upstream_guard.stats()
+    lines = prom_metric("tarot_ai_breaker_state", "gauge", "AI circuit breaker state (1 for the current state).",
+                        [({"state": st}, int(stats["state"] == st)) for st in (UpstreamGuard.CLOSED, UpstreamGuard.HALF_OPEN, UpstreamGuard.OPEN)])
+    lines += prom_metric("tarot_ai_upstream_inflight", "gauge", "AI upstream calls in progress.", [({}, stats["inflight"])])
+    lines += prom_metric("tarot_ai_upstream_timeout_seconds", "gauge", "Current adaptive AI upstream timeout.", [({}, float(stats["timeout"]))])
+    if stats["p95"] is not None:
+        lines += prom_metric("tarot_ai_upstream_p95_seconds", "gauge", "p95 of recent successful AI upstream calls.", [({}, float(stats["p95"]))])
+    for key in ("successes", "failures", "timeouts", "slow_calls", "short_circuited", "rejected", "trips"):
+        lines += prom_metric(f"tarot_ai_upstream_{key}_total", "counter", f"AI upstream {key.replace('_', ' ')}.", [({}, stats[key])])
+    return lines
+
+METRICS_COLLECTORS.append(_collect_ai_upstream_guard)
+
+TARGET_WORDS = {"short": 100, "medium": 200, "long": 350}
+
+def postprocess_length(text: str, length: str) -> str:
+    """Trim text to roughly the target word count (+20%) at sentence boundaries."""
+    try:
+        target = TARGET_WORDS.get(length, 200)
+        words = text.split()
+        max_words = int(target * 1.2)
+        if len(words) > max_words:
+            sentences = [s.strip() for s in text.replace('\n', ' ').split('.') if s.strip()]
+            out = []
+            count = 0
+            for s in sentences:
+                wc = len(s.split())
+                if count + wc <= max_words:
+                    out.append(s)
+                    count += wc
+                else:
+                    break
+            txt = '. '.join(out)
+            if txt:
+                if not txt.endswith('.'):
+                    txt += '.'
+                return txt
+            return ' '.join(words[:max_words])
+        return text
+    except Exception:
+        return text
+
+_TOKEN_PIECES = re.compile(r"\w+|[^\w\s]")
+
+def estimate_tokens(text: str) -> int:
+    """Rough local token estimate, no tokenizer or network: one per punctuation
+    mark, one per word plus one per further 8 characters. TokenBudget corrects
+    it per language from the prompt_tokens the upstream reports."""
+    return sum(1 + (len(piece) - 1) // 8 for piece in _TOKEN_PIECES.findall(text))
+
+class TokenBudget:
+    """max_tokens per language/tone/length, tuned from reported usage.
+
+    The budget is the postprocess_length word cap times the observed
+    completion tokens per word, plus headroom, so the upstream stops about
+    where the reply would be trimmed anyway instead of generating up to
+    OPENAI_MAX_TOKENS. Each completion's usage moves the tokens-per-word
+    estimate for its combination (EWMA), and prompt_tokens calibrates the
+    local prompt estimate per language. OPENAI_MAX_TOKENS stays the ceiling.
+    """
+
+    # Completion tokens per word before any usage has been seen
+    TOKENS_PER_WORD = {"en": 1.35, "tr": 2.3}
+
+    def __init__(self, ceiling: int = 600, context_tokens: int = 128000, headroom: float = 1.1,
+                 overhead: int = 16, alpha: float = 0.1, min_words: int = 10):
+        self.ceiling = ceiling
+        self.context_tokens = context_tokens
+        self.headroom = headroom
+        self.overhead = overhead
+        self.alpha = alpha
+        self.min_words = min_words
+        self._tokens_per_word: Dict[Tuple[str, str, str], float] = {}
+        self._prompt_ratio: Dict[str, float] = {}
+        self.samples: Dict[Tuple[str, str, str], int] = {}
+        self.completion_tokens = 0
+        self.prompt_tokens = 0
+        self.truncated = 0
+
+    def tokens_per_word(self, language: str, tone: str, length: str) -> float:
+        key = (normalize_language(language), tone, length)
+        return self._tokens_per_word.get(key, self.TOKENS_PER_WORD[key[0]])
+
+    def estimate_prompt_tokens(self, prompt: str, language: str) -> int:
+        return math.ceil(estimate_tokens(prompt) * self._prompt_ratio.get(normalize_language(language), 1.0))
+
+    def budget(self, language: str, tone: str, length: str) -> int:
+        """Completion budget for the combination, before the ceiling."""
+        max_words = int(TARGET_WORDS[length] * 1.2)
+        return math.ceil(max_words * self.tokens_per_word(language, tone, length) * self.headroom) + self.overhead
+
+    def max_tokens(self, prompt: str, language: str, tone: str, length: str) -> int:
+        tone, length = normalize_reading_options(tone, length)
+        room = self.context_tokens - self.estimate_prompt_tokens(prompt, language)
+        return max(1, min(self.budget(language, tone, length), self.ceiling, room))
+
+    def record(self, prompt: str, language: str, tone: str, length: str, content: str,
+               usage: Optional[Dict[str, Any]], finish_reason: Optional[str] = None) -> None:
+        """Tune from a completion's usage block; ignored when the upstream omits it."""
+        if finish_reason == "length":
+            self.truncated += 1
+        if not usage:
+            return
+        tone, length = normalize_reading_options(tone, length)
+        language = normalize_language(language)
+        completion = usage.get("completion_tokens")
+        words = len(content.split())
+        if isinstance(completion, int) and completion > 0:
+            self.completion_tokens += completion
+            if words >= self.min_words:
+                key = (language, tone, length)
+                observed = min(4.0, max(0.8, completion / words))
+                current = self.tokens_per_word(language, tone, length)
+                self._tokens_per_word[key] = current + self.alpha * (observed - current)
+                self.samples[key] = self.samples.get(key, 0) + 1
+        prompt_tokens = usage.get("prompt_tokens")
+        estimate = estimate_tokens(prompt)
+        if isinstance(prompt_tokens, int) and prompt_tokens > 0 and estimate:
+            self.prompt_tokens += prompt_tokens
+            current = self._prompt_ratio.get(language, 1.0)
+            self._prompt_ratio[language] = current + self.alpha * (prompt_tokens / estimate - current)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "completion_tokens": self.completion_tokens, "prompt_tokens": self.prompt_tokens, "truncated": self.truncated,
+            "budgets": {
+                (language, tone, length): self.budget(language, tone, length)
+                for language in SUPPORTED_LANGUAGES for tone in TONES for length in LENGTHS
+            },
+        }
+
+token_budget = TokenBudget(
+    ceiling=int(os.getenv("OPENAI_MAX_TOKENS", "600")),
+    context_tokens=int(os.getenv("OPENAI_CONTEXT_TOKENS", "128000")),
+    headroom=float(os.getenv("AI_TOKEN_HEADROOM", "1.1")),
+)
+
+def _collect_token_budget() -> List[str]:
+    stats = token_budget.stats()
+    lines = prom_metric("tarot_ai_max_tokens", "gauge", "Current max_tokens budget before the ceiling.",
+                        [({"language": lang, "tone": tone, "length": length}, budget)
+                         for (lang, tone, length), budget in sorted(stats["budgets"].items())])
+    lines += prom_metric("tarot_ai_max_tokens_ceiling", "gauge", "OPENAI_MAX_TOKENS ceiling.", [({}, token_budget.ceiling)])
+    for key in ("completion_tokens", "prompt_tokens", "truncated"):
+        lines += prom_metric(f"tarot_ai_{key}_total", "counter", f"AI upstream {key.replace('_', ' ')}.", [({}, stats[key])])
+    return lines
+
+METRICS_COLLECTORS.append(_collect_token_budget)
+
+# Persistent cache of AI interpretations for question-less readings. Their
+# prompt is fully determined by the draw and the options, so repeats can be
+# served without calling the upstream. Each key holds a pool of up to
+# AI_CACHE_VARIANTS texts: while the pool is filling every request calls the
+# upstream and adds its answer; once it is full a random variant is served.
+def ai_cache_key(prompt: str) -> str:
+    """Hash of the whitespace-normalized prompt and the model settings."""
+    normalized = " ".join(prompt.split())
+    material = "\x1f".join([os.getenv("OPENAI_MODEL", "gpt-4o-mini"), os.getenv("OPENAI_TEMPERATURE", "0.7"), normalized])
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+class MemoryAIResponseStore:
+    """Process-local store; LRU bounded by max_entries. Used in tests and single-worker setups."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+
+    async def get(self, key: str, now: datetime) -> List[str]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return []
+        if entry["expires_at"] <= now:
+            del self._entries[key]
+            return []
+        self._entries.move_to_end(key)
+        return list(entry["variants"])
+
+    async def add_variant(self, key: str, text: str, max_variants: int, expires_at: datetime, now: datetime) -> int:
+        """Append text to the key's pool; returns the number of keys evicted."""
+        entry = self._entries.get(key)
+        if entry is None or entry["expires_at"] <= now:
+            entry = self._entries[key] = {"variants": [], "expires_at": expires_at}
+        if len(entry["variants"]) < max_variants:
+            entry["variants"].append(text)
+        self._entries.move_to_end(key)
+        evicted = 0
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            evicted += 1
+        return evicted
+
+class MongoAIResponseStore:
+    """Shared store in a Mongo collection.
+
+    Expiry is left to a TTL index on expires_at. Size is bounded by trimming
+    the least recently used keys every trim_every new variants.
+    """
+
+    def __init__(self, collection: str, max_entries: int, trim_every: int = 100):
+        self.collection_name = collection
+        self.max_entries = max_entries
+        self.trim_every = trim_every
+        self._adds_since_trim = 0
+
+    @property
+    def collection(self):
+        return db[self.collection_name]
+
+    async def ensure_indexes(self) -> None:
+        try:
+            await self.collection.create_indexes([
+                IndexModel([("key", 1)], name="ai_cache_key", unique=True),
+                IndexModel([("expires_at", 1)], name="ai_cache_ttl", expireAfterSeconds=0),
+                IndexModel([("last_used", 1)], name="ai_cache_last_used"),
+            ])
+        except Exception as e:
+            logging.warning(f"Failed to create AI cache indexes: {e}")
+
+    async def get(self, key: str, now: datetime) -> List[str]:
+        doc = await self.collection.find_one_and_update(
+            {"key": key, "expires_at": {"$gt": now}},
+            {"$set": {"last_used": now}},
+            projection={"_id": 0, "variants": 1},
+        )
+        return list(doc["variants"]) if doc else []
+
+    async def add_variant(self, key: str, text: str, max_variants: int, expires_at: datetime, now: datetime) -> int:
+        await self.collection.update_one(
+            {"key": key},
+            {
+                "$setOnInsert": {"created_at": now, "expires_at": expires_at},
+                "$set": {"last_used": now},
+                "$push": {"variants": {"$each": [text], "$slice": max_variants}},
+            },
+            upsert=True,
+        )
+        self._adds_since_trim += 1
+        if self._adds_since_trim < self.trim_every:
+            return 0
+        self._adds_since_trim = 0
+        excess = await self.collection.estimated_document_count() - self.max_entries
+        if excess <= 0:
+            return 0
+        oldest = await self.collection.find({}, {"_id": 1}).sort("last_used", 1).limit(excess).to_list(excess)
+        result = await self.collection.delete_many({"_id": {"$in": [d["_id"] for d in oldest]}})
+        return result.deleted_count
+
+class AIResponseCache:
+    def __init__(self, store, ttl_seconds: float, variants: int):
+        self.store = store
+        self.ttl_seconds = ttl_seconds
+        self.variants = max(1, variants)
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+        self.errors = 0
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "stores": self.stores,
+                "evictions": self.evictions, "errors": self.errors}
+
+    async def pick(self, key: str) -> Optional[str]:
+        """A cached variant once the key's pool is full; None means call the upstream."""
+        try:
+            variants = await self.store.get(key, datetime.utcnow())
+        except Exception as e:
+            self.errors += 1
+            logging.warning(f"AI cache lookup failed: {e}")
+            return None
+        if len(variants) >= self.variants:
+            self.hits += 1
+            return random.choice(variants)
+        self.misses += 1
+        return None
+
+    async def put(self, key: str, text: str) -> None:
+        now = datetime.utcnow()
+        try:
+            self.evictions += await self.store.add_variant(
+                key, text, self.variants, now + timedelta(seconds=self.ttl_seconds), now
+            )
+            self.stores += 1
+        except Exception as e:
+            self.errors += 1
+            logging.warning(f"AI cache store failed: {e}")
+
+def build_ai_response_cache() -> Optional[AIResponseCache]:
+    backend = os.getenv("AI_CACHE_BACKEND", "mongo").lower()
+    max_entries = int(os.getenv("AI_CACHE_MAX_ENTRIES", "50000"))
+    if backend == "off":
+        return None
+    if backend == "memory":
+        store = MemoryAIResponseStore(max_entries)
+    else:
+        store = MongoAIResponseStore(os.getenv("AI_CACHE_COLLECTION", "ai_cache"), max_entries)
+    return AIResponseCache(
+        store,
+        ttl_seconds=float(os.getenv("AI_CACHE_TTL", str(7 * 24 * 3600))),
+        variants=int(os.getenv("AI_CACHE_VARIANTS", "3")),
+    )
+
+ai_response_cache = build_ai_response_cache()
+
+def _collect_ai_response_cache() -> List[str]:
+    if ai_response_cache is None:
+        return []
+    stats = ai_response_cache.stats()
+    lines: List[str] = []
+    for key in ("hits", "misses", "stores", "evictions", "errors"):
+        lines += prom_metric(f"tarot_ai_cache_{key}_total", "counter", f"AI response cache {key}.", [({}, stats[key])])
+    return lines
+
+METRICS_COLLECTORS.append(_collect_ai_response_cache)
+
+# Prompt templates: version -> language -> pieces. PROMPT_TEMPLATES_FILE may
+# add versions (or override pieces of existing ones) from JSON, and
+# PROMPT_TEMPLATE_VERSION picks the active one, so a prompt variant can be
+# A/B tested without a code change. The prompt text feeds the AI cache key, so
+# versions never share cached answers.
+PROMPT_TEMPLATES: Dict[str, Dict[str, Dict[str, Any]]] = {
+    "v1": {
+        "en": {
+            "reading_type": "Okuma türü: {reading_type}",
+            "reading_type_names": {},
+            "language": "Dil: English",
+            "question": "Question: ",
+            "cards": "Kartlar:",
+            "card": "{name}{reversed} | Keywords: {keywords} | Summary: {meaning}",
+            "reversed": " (Reversed)",
+            "tones": {
+                "gentle": "Tone: gentle, empathetic, non-judgmental.",
+                "analytical": "Tone: analytical, evidence-based, structured.",
+                "motivational": "Tone: motivational, encouraging.",
+                "spiritual": "Tone: intuitive, calm, avoid determinism.",
+                "direct": "Tone: direct, concise, no beating around the bush.",
+            },
+            "lengths": {
+                "short": "About 100 words (±20%).",
+                "medium": "About 200 words (±20%).",
+                "long": "About 350 words (±20%).",
+            },
+            "guidance": [
+                "Format: 1-sentence 'theme of the day' + 3 short bullets (Love/Work/Money) + 1 closing sentence.",
+                "Avoid deterministic/fear language. Provide actionable, kind guidance.",
+            ],
+            "respond": "Please respond in English.",
+        },
+        "tr": {
+            "reading_type": "Okuma türü: {reading_type}",
+            "reading_type_names": {
                 "card_of_day": "Günün Kartı",
                 "classic_tarot": "Klasik Tarot",
                 "path_of_day": "Günün Yolu",
                 "yes_no": "Evet/Hayır",
-                "couples_tarot": "Çiftler Tarot"
-            }.get(reading_type, reading_type)
-        lines = [
-            f"Okuma türü: {rt}",
-            f"Dil: {'Türkçe' if language=='tr' else 'English'}",
-        ]
+                "couples_tarot": "Çiftler Tarot",
+            },
+            "language": "Dil: Türkçe",
+            "question": "Soru: ",
+            "cards": "Kartlar:",
+            "card": "{name}{reversed} | Anahtar kelimeler: {keywords} | Özet: {meaning}",
+            "reversed": " (Ters)",
+            "tones": {
+                "gentle": "Üslup: nazik, empatik, yargısız.",
+                "analytical": "Üslup: analitik, kanıtsal, net yapı.",
+                "motivational": "Üslup: motive edici, cesaretlendiren.",
+                "spiritual": "Üslup: sezgisel, ritüel/dingin dil; aşırı determinizmden kaçın.",
+                "direct": "Üslup: doğrudan, kısa ve net; dolandırmadan öner.",
+            },
+            "lengths": {
+                "short": "Yaklaşık 100 kelime (±%20).",
+                "medium": "Yaklaşık 200 kelime (±%20).",
+                "long": "Yaklaşık 350 kelime (±%20).",
+            },
+            "guidance": [
+                "Biçim: 1 cümle 'bugünün teması' + 3 kısa madde (Aşk/İş/Para) + 1 onay cümlesi.",
+                "Kaçın: kesin kader söylemleri, korku dili. Öner: uygulanabilir, nazik rehberlik.",
+            ],
+            "respond": "Lütfen yanıtı Türkçe yaz.",
+        },
+    },
+}
+DEFAULT_PROMPT_VERSION = "v1"
+
+class PromptTemplate:
+    """One language of one template version, compiled into joinable pieces.
+
+    Reading-type headers, tone/length footers and the text of every catalog
+    card in both orientations are rendered once; render() only formats the
+    position prefix and the question.
+    """
+
+    def __init__(self, version: str, language: str, spec: Dict[str, Any]):
+        self.version = version
+        self.language = language
+        self.spec = spec
+        self.headers: Dict[str, str] = {
+            reading_type: self._header(reading_type) for reading_type in get_deck_index().reading_types_by_id
+        }
+        self.footers: Dict[Tuple[str, str], str] = {
+            (tone, length): "\n".join([spec["tones"][tone], spec["lengths"][length], *spec["guidance"], spec["respond"]])
+            for tone in TONES for length in LENGTHS
+        }
+        # (card id, reversed) -> (card name, line text after the position)
+        self.card_lines: Dict[Tuple[int, bool], Tuple[str, str]] = {
+            (card["id"], rev): (card["name"], self._card_line(card, rev))
+            for card in get_card_catalog(language).cards_by_id.values() for rev in (False, True)
+        }
+
+    def _header(self, reading_type: str) -> str:
+        name = self.spec["reading_type_names"].get(reading_type, reading_type)
+        return self.spec["reading_type"].format(reading_type=name) + "\n" + self.spec["language"]
+
+    def _card_line(self, card: Dict[str, Any], rev: bool) -> str:
+        return self.spec["card"].format(
+            name=card.get("name", ""),
+            reversed=self.spec["reversed"] if rev else "",
+            keywords=", ".join(card.get("keywords", [])[:4]),
+            meaning=card.get(f"meaning_{'reversed' if rev else 'upright'}", ""),
+        )
+
+    def render(self, reading_type: str, cards: List[Dict], question: Optional[str], tone: str, length: str) -> str:
+        parts = [self.headers.get(reading_type) or self._header(reading_type)]
         if question:
-            lines.append(("Soru: " if language=="tr" else "Question: ") + str(question))
-        lines.append("Kartlar:")
+            parts.append(self.spec["question"] + str(question))
+        parts.append(self.spec["cards"])
         for idx, item in enumerate(cards, 1):
-            c = item["card"]
-            pos = item.get("position", f"Card {idx}")
+            card = item["card"]
             rev = item.get("reversed", False)
-            meaning_key = f"meaning_{'reversed' if rev else 'upright'}"
-            meaning = c.get(meaning_key, "")
-            name = c.get("name", "")
-            kw = ", ".join(c.get("keywords", [])[:4])
-            if language == "tr":
-                lines.append(f"- {pos}: {name}{' (Ters)' if rev else ''} | Anahtar kelimeler: {kw} | Özet: {meaning}")
-            else:
-                lines.append(f"- {pos}: {name}{' (Reversed)' if rev else ''} | Keywords: {kw} | Summary: {meaning}")
-        if language == "tr":
-            tone_line = TONE_GUIDE_TR.get(tone, TONE_GUIDE_TR['gentle'])
-            len_line = LENGTH_GUIDE_TR.get(length, LENGTH_GUIDE_TR['medium'])
-            lines.append(tone_line)
-            lines.append(len_line)
-            lines.append("Biçim: 1 cümle 'bugünün teması' + 3 kısa madde (Aşk/İş/Para) + 1 onay cümlesi.")
-            lines.append("Kaçın: kesin kader söylemleri, korku dili. Öner: uygulanabilir, nazik rehberlik.")
+            compiled = self.card_lines.get((card.get("id"), rev))
+            # Cards that are not this language's catalog card are rendered as given
+            line = compiled[1] if compiled and compiled[0] == card.get("name") else self._card_line(card, rev)
+            parts.append(f"- {item.get('position', f'Card {idx}')}: {line}")
+        parts.append(self.footers[normalize_reading_options(tone, length)])
+        return "\n".join(parts)
+
+PROMPT_SPEC_PIECES: Dict[str, type] = {
+    "reading_type": str, "reading_type_names": dict, "language": str, "question": str, "cards": str,
+    "card": str, "reversed": str, "tones": dict, "lengths": dict, "guidance": list, "respond": str,
+}
+
+def merge_prompt_spec(base: Dict[str, Any], override: Dict[str, Any]) -> Dict[str, Any]:
+    """override over base, key by key; dict pieces (tones, lengths, names) merge per entry."""
+    spec = dict(base)
+    for key, value in override.items():
+        if isinstance(base.get(key), dict) and isinstance(value, dict):
+            spec[key] = {**base[key], **value}
         else:
-            tone_map_en = {
-                "gentle": "Tone: gentle, empathetic, non-judgmental.",
-                "analytical": "Tone: analytical, evidence-based, structured.",
-                "motivational": "Tone: motivational, encouraging.",
-                "spiritual": "Tone: intuitive, calm, avoid determinism.",
-                "direct": "Tone: direct, concise, no beating around the bush."
-            }
-            length_map_en = {
-                "short": "About 100 words (±20%).",
-                "medium": "About 200 words (±20%).",
-                "long": "About 350 words (±20%)."
-            }
-            lines.append(tone_map_en.get(tone, tone_map_en['gentle']))
-            lines.append(length_map_en.get(length, length_map_en['medium']))
-            lines.append("Format: 1-sentence 'theme of the day' + 3 short bullets (Love/Work/Money) + 1 closing sentence.")
-            lines.append("Avoid deterministic/fear language. Provide actionable, kind guidance.")
-        lines.append(lang_line)
-        return "\n".join(lines)
+            spec[key] = value
+    return spec
+
+def check_prompt_spec(spec: Dict[str, Any]) -> None:
+    """Raise ValueError naming the first piece that would not compile."""
+    for piece, kind in PROMPT_SPEC_PIECES.items():
+        if not isinstance(spec.get(piece), kind):
+            raise ValueError(f"{piece!r} must be a {kind.__name__}")
+    for piece, names in (("tones", TONES), ("lengths", LENGTHS)):
+        for name in names:
+            if not isinstance(spec[piece].get(name), str):
+                raise ValueError(f"{piece!r} has no text for {name!r}")
+    if not all(isinstance(line, str) for line in spec["guidance"]):
+        raise ValueError("'guidance' must be a list of strings")
+    try:
+        spec["reading_type"].format(reading_type="")
+    except (KeyError, IndexError, ValueError) as e:
+        raise ValueError(f"'reading_type' has a bad placeholder: {e}")
+    try:
+        spec["card"].format(name="", reversed="", keywords="", meaning="")
+    except (KeyError, IndexError, ValueError) as e:
+        raise ValueError(f"'card' has a bad placeholder: {e}")
+
+def load_prompt_templates() -> Dict[str, Dict[str, Dict[str, Any]]]:
+    """Built-in templates plus PROMPT_TEMPLATES_FILE.
+
+    File pieces are merged over the version they name (or over the default
+    version for a new one). A version that would not compile is skipped with a
+    warning instead of failing at startup.
+    """
+    versions = {v: {lang: dict(spec) for lang, spec in langs.items()} for v, langs in PROMPT_TEMPLATES.items()}
+    path = os.getenv("PROMPT_TEMPLATES_FILE")
+    if path:
+        try:
+            with open(path, encoding="utf-8") as f:
+                extra = json.load(f)
+            if not isinstance(extra, dict):
+                raise ValueError("expected an object of versions")
+        except Exception as e:
+            logging.warning(f"Failed to load prompt templates from {path}: {e}")
+            extra = {}
+        base = versions[DEFAULT_PROMPT_VERSION]
+        for version, langs in extra.items():
+            try:
+                if not isinstance(langs, dict) or not all(isinstance(o, dict) for o in langs.values()):
+                    raise ValueError("expected an object of languages, each an object of pieces")
+                merged = {}
+                for lang in SUPPORTED_LANGUAGES:
+                    merged[lang] = merge_prompt_spec(versions.get(version, base)[lang], langs.get(lang, {}))
+                    try:
+                        check_prompt_spec(merged[lang])
+                    except ValueError as e:
+                        raise ValueError(f"{lang}: {e}")
+            except ValueError as e:
+                logging.warning(f"Ignoring prompt template version {version!r} from {path}: {e}")
+                continue
+            versions[version] = merged
+    return versions
+
+class PromptTemplates:
+    """Compiled templates for every version and language, built on first use."""
+
+    def __init__(self, versions: Dict[str, Dict[str, Dict[str, Any]]], active: str):
+        if active not in versions:
+            logging.warning(f"Unknown PROMPT_TEMPLATE_VERSION {active!r}, using {DEFAULT_PROMPT_VERSION!r}")
+            active = DEFAULT_PROMPT_VERSION
+        self.versions = versions
+        self.active = active
+        self._compiled: Dict[Tuple[str, str], PromptTemplate] = {}
+
+    def get(self, language: str, version: Optional[str] = None) -> PromptTemplate:
+        key = (version or self.active, normalize_language(language))
+        template = self._compiled.get(key)
+        if template is None:
+            template = self._compiled[key] = PromptTemplate(key[0], key[1], self.versions[key[0]][key[1]])
+        return template
+
+    def compile(self) -> int:
+        for version in self.versions:
+            for language in SUPPORTED_LANGUAGES:
+                self.get(language, version)
+        return len(self._compiled)
+
+prompt_templates = PromptTemplates(load_prompt_templates(), os.getenv("PROMPT_TEMPLATE_VERSION", DEFAULT_PROMPT_VERSION))
+
+def build_interpretation_prompt(reading_type: str, cards: List[Dict], question: Optional[str], language: str, tone: str, length: str,
+                                version: Optional[str] = None) -> str:
+    """User prompt for the chat completions API; version defaults to the active one."""
+    return prompt_templates.get(language, version).render(reading_type, cards, question, tone, length)
+
+class SingleFlight:
+    """Concurrent calls with the same key share one in-flight call.
+
+    The call runs as its own task, so a leader whose request is cancelled does
+    not cancel the work the followers are waiting on.
+    """
+
+    def __init__(self):
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self.leaders = 0
+        self.coalesced = 0
+
+    @property
+    def inflight(self) -> int:
+        return len(self._inflight)
+
+    def stats(self) -> Dict[str, int]:
+        return {"inflight": self.inflight, "leaders": self.leaders, "coalesced": self.coalesced}
+
+    async def do(self, key: str, fn: Callable[[], Any]) -> Any:
+        task = self._inflight.get(key)
+        if task is None:
+            self.leaders += 1
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._done(key, t))
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+    def _done(self, key: str, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            task.exception()  # retrieved here in case every waiter was cancelled
+
+ai_single_flight = SingleFlight()
+
+def _collect_ai_single_flight() -> List[str]:
+    stats = ai_single_flight.stats()
+    lines = prom_metric("tarot_ai_inflight_prompts", "gauge", "Distinct AI prompts awaiting the upstream.", [({}, stats["inflight"])])
+    lines += prom_metric("tarot_ai_upstream_calls_total", "counter", "AI upstream calls started.", [({}, stats["leaders"])])
+    lines += prom_metric("tarot_ai_coalesced_requests_total", "counter",
+                         "AI requests that joined an identical in-flight prompt.", [({}, stats["coalesced"])])
+    return lines
+
+METRICS_COLLECTORS.append(_collect_ai_single_flight)
+
+class StreamLengthLimiter:
+    """postprocess_length for a token stream.
+
+    Deltas pass through until the word cap is reached. The cap is detected at
+    the first character of the word past it, which is kept (but not emitted) so
+    that final_text() trims exactly like postprocess_length on the full text.
+    """
+
+    def __init__(self, length: str):
+        self.length = length
+        self.max_words = int(TARGET_WORDS.get(length, 200) * 1.2)
+        self.words = 0
+        self.exhausted = False
+        self._in_word = False
+        self._received: List[str] = []
+
+    def feed(self, delta: str) -> str:
+        """The part of delta to emit; sets exhausted once the cap is passed."""
+        if self.exhausted:
+            return ""
+        for i, ch in enumerate(delta):
+            if ch.isspace():
+                self._in_word = False
+            elif not self._in_word:
+                self._in_word = True
+                self.words += 1
+                if self.words > self.max_words:
+                    self.exhausted = True
+                    self._received.append(delta[:i + 1])
+                    return delta[:i]
+        self._received.append(delta)
+        return delta
+
+    def final_text(self) -> str:
+        return postprocess_length("".join(self._received).strip(), self.length)
+
+async def generate_interpretation(reading_type: str, cards: List[Dict], question: Optional[str] = None, language: str = "en", tone: str = "gentle", length: str = "medium", ai_bypass: bool = False, prompt_version: Optional[str] = None) -> Tuple[str, str]:
+    """Generate interpretation using AI if available; fallback to rule-based text.
+    tone: gentle|analytical|motivational|spiritual|direct (AI only)
+    length: short|medium|long (applies to both AI and fallback via post-processing)
+    prompt_version: prompt template version (AI only; defaults to the active one)
+    Returns (text, mode)
+    """
+    ai_key = os.getenv('EMERGENT_LLM_KEY')
 
     # AI path
     if ai_key and not ai_bypass:
         try:
-            payload = {
-                "model": os.getenv("OPENAI_MODEL", "gpt-4o-mini"),
-                "messages": [
-                    {"role": "system", "content": "You are an expert Tarot interpreter."},
-                    {"role": "user", "content": build_prompt()}
-                ],
-                "temperature": float(os.getenv("OPENAI_TEMPERATURE", "0.7")),
-                "max_tokens": int(os.getenv("OPENAI_MAX_TOKENS", "600"))
-            }
-            headers = {
-                "Authorization": f"Bearer {ai_key}",
-                "Content-Type": "application/json"
-            }
-            url = os.getenv("OPENAI_BASE_URL", "https://api.openai.com/v1") + "/chat/completions"
-            resp = _requests.post(url, headers=headers, data=json.dumps(payload), timeout=20)
-            if resp.status_code == 200:
-                data = resp.json()
-                if data.get("choices"):
-                    content = data["choices"][0]["message"]["content"]
-                    if content and isinstance(content, str):
-                        return postprocess_length(content.strip()), "ai"
+            prompt = build_interpretation_prompt(reading_type, cards, question, language, tone, length, prompt_version)
+            prompt_key = ai_cache_key(prompt)
+            # Personal questions are never cached
+            cache_key = prompt_key if ai_response_cache is not None and not question else None
+            if cache_key:
+                cached = await ai_response_cache.pick(cache_key)
+                if cached:
+                    return cached, "ai"
+
+            async def complete() -> Optional[str]:
+                completion = await ai_upstream_guard.call(lambda: fetch_ai_completion(ai_key, prompt, (language, tone, length)))
+                if not completion:
+                    return None
+                text = postprocess_length(completion.text, length)
+                if cache_key and not completion.truncated:
+                    await ai_response_cache.put(cache_key, text)
+                return text
+
+            # Identical prompts already in flight share one upstream call
+            text = await ai_single_flight.do(prompt_key, complete)
+            if text:
+                return text, "ai"
+        except UpstreamUnavailable as e:
+            logging.debug(f"AI upstream skipped, falling back: {e}")
         except Exception as e:
             logging.warning(f"AI interpretation failed, falling back. Error: {e}")
             # continue to fallback
         # fallback mode
-        text = rule_based_interpretation(reading_type, cards, language)
-        return postprocess_length(text), "fallback"
+        return rule_interpretation(reading_type, cards, language, length), "fallback"
 
     # Rule mode
-    text = rule_based_interpretation(reading_type, cards, language)
-    return postprocess_length(text), "rule"
+    return rule_interpretation(reading_type, cards, language, length), "rule"
+
+class InterpretationRace:
+    """Deadline mode for interactive readings.
+
+    The rule text is ready before the AI call starts. If the AI answer has not
+    arrived within the deadline the rule text is served as "fallback" and the
+    AI call keeps running: it still fills the AI cache and coalesced callers,
+    and with store_late its text is written onto the stored reading.
+    """
+
+    def __init__(self, default_deadline: Optional[float] = None, max_deadline: float = 30.0, store_late: bool = True):
+        self.default_deadline = default_deadline
+        self.max_deadline = max_deadline
+        self.store_late = store_late
+        self.races = 0
+        self.ai_in_time = 0
+        self.deadline_misses = 0
+        self.late_ai = 0
+        self.late_stored = 0
+        self._late: set = set()
+
+    @property
+    def pending_late(self) -> int:
+        return len(self._late)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "races": self.races, "ai_in_time": self.ai_in_time, "deadline_misses": self.deadline_misses,
+            "late_ai": self.late_ai, "late_stored": self.late_stored, "pending_late": self.pending_late,
+        }
+
+    def resolve_deadline(self, deadline: Optional[float]) -> Optional[float]:
+        """Effective deadline in seconds; None waits for the AI as before."""
+        if deadline is None:
+            deadline = self.default_deadline
+        if deadline is None or deadline <= 0:
+            return None
+        return min(deadline, self.max_deadline)
+
+    async def run(self, deadline: float, generate: Awaitable[Tuple[str, str]],
+                  rule_text: str) -> Tuple[str, str, Optional[asyncio.Task]]:
+        """(text, mode, late task); the late task is set when the deadline was missed."""
+        self.races += 1
+        task = asyncio.ensure_future(generate)
+        done, _ = await asyncio.wait({task}, timeout=deadline)
+        if done:
+            self.ai_in_time += 1
+            text, mode = task.result()
+            return text, mode, None
+        self.deadline_misses += 1
+        self._late.add(task)
+        task.add_done_callback(self._late.discard)
+        return rule_text, "fallback", task
+
+    async def store_late_result(self, reading_id: str, task: asyncio.Task,
+                                prompt_version: Optional[str] = None) -> None:
+        """Wait for a late AI call and write its text (and prompt version) onto the stored reading."""
+        try:
+            text, mode = await task
+        except Exception as e:
+            logging.warning(f"Late AI interpretation failed for reading {reading_id}: {e}")
+            return
+        if mode != "ai":
+            return
+        self.late_ai += 1
+        if self.store_late:
+            await reading_writer.update(reading_id, {"interpretation": text, "mode": "ai", "prompt_version": prompt_version})
+            self.late_stored += 1
+
+    def track(self, coro: Awaitable[None]) -> None:
+        task = asyncio.ensure_future(coro)
+        self._late.add(task)
+        task.add_done_callback(self._late.discard)
+
+    async def drain(self, timeout: float) -> None:
+        """Give late AI calls a chance to finish and be stored before shutdown;
+        whatever is still running after timeout is cancelled."""
+        if self._late:
+            _, pending = await asyncio.wait(set(self._late), timeout=timeout)
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+def build_interpretation_race() -> InterpretationRace:
+    default = os.getenv("AI_READING_DEADLINE")
+    return InterpretationRace(
+        default_deadline=float(default) if default else None,
+        max_deadline=float(os.getenv("AI_READING_DEADLINE_MAX", "30")),
+        store_late=os.getenv("AI_STORE_LATE_RESULTS", "1").lower() not in ("0", "false", "off"),
+    )
+
+interpretation_race = build_interpretation_race()
+
+def _collect_interpretation_race() -> List[str]:
+    stats = interpretation_race.stats()
+    lines = prom_metric("tarot_ai_late_pending", "gauge", "AI calls still running after their reading's deadline.",
+                        [({}, stats["pending_late"])])
+    for key in ("races", "ai_in_time", "deadline_misses", "late_ai", "late_stored"):
+        lines += prom_metric(f"tarot_ai_deadline_{key}_total", "counter", f"Deadline readings: {key.replace('_', ' ')}.", [({}, stats[key])])
+    return lines
+
+METRICS_COLLECTORS.append(_collect_interpretation_race)
+
+class AIJob:
+    __slots__ = ("reading", "params", "event")
+
+    def __init__(self, reading: TarotReading, params: Dict[str, Any]):
+        self.reading = reading
+        self.params = params  # question, language, tone, length for generate_interpretation
+        self.event = asyncio.Event()
+
+    @property
+    def status(self) -> str:
+        return "pending" if self.reading.mode == "pending" else "done"
+
+class AIJobQueue:
+    """Background AI interpretations for readings created with job=true.
+
+    The reading is stored with mode "pending" and an empty interpretation; a
+    fixed pool of workers generates the text and writes it onto the stored
+    reading. The worker count bounds upstream concurrency independently of
+    HTTP concurrency. Finished jobs stay in memory (up to max_finished) for
+    long-polling; older ones are answered from db.readings.
+    """
+
+    def __init__(self, workers: int = 4, max_queue: int = 1000, max_finished: int = 10000):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.max_finished = max_finished
+        self.submitted = 0
+        self.completed = 0
+        self.rejected = 0
+        self.abandoned = 0
+        self._jobs: "OrderedDict[str, AIJob]" = OrderedDict()
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "workers": len(self._tasks), "queue_depth": self.queue_depth, "submitted": self.submitted,
+            "completed": self.completed, "rejected": self.rejected, "abandoned": self.abandoned,
+        }
+
+    def start(self) -> None:
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self.max_queue)
+        self._tasks = [t for t in self._tasks if not t.done()]
+        while len(self._tasks) < self.workers:
+            self._tasks.append(asyncio.create_task(self._worker()))
+
+    def try_submit(self, reading: TarotReading, params: Dict[str, Any]) -> bool:
+        """Queue a pending reading; False when the queue is full."""
+        self.start()
+        job = AIJob(reading, params)
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            self.rejected += 1
+            return False
+        self._jobs[reading.id] = job
+        self.submitted += 1
+        return True
+
+    def get(self, job_id: str) -> Optional[AIJob]:
+        return self._jobs.get(job_id)
+
+    async def stop(self) -> None:
+        """Cancel the workers; queued jobs are finished with the rule text."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        while self._queue is not None and not self._queue.empty():
+            await self._abandon(self._queue.get_nowait())
+
+    async def _worker(self) -> None:
+        while True:
+            job = await self._queue.get()
+            reading = job.reading
+            try:
+                text, mode = await generate_interpretation(reading.reading_type, reading.cards, **job.params)
+            except asyncio.CancelledError:
+                await self._abandon(job)
+                raise
+            await self._finish(job, text, mode)
+
+    async def _abandon(self, job: AIJob) -> None:
+        reading = job.reading
+        self.abandoned += 1
+        text = rule_interpretation(reading.reading_type, reading.cards, job.params["language"], job.params["length"])
+        await self._finish(job, text, "fallback")
+
+    async def _finish(self, job: AIJob, text: str, mode: str) -> None:
+        job.reading.interpretation = text
+        job.reading.mode = mode
+        fields = {"interpretation": text, "mode": mode}
+        if mode == "ai":
+            job.reading.prompt_version = fields["prompt_version"] = job.params.get("prompt_version")
+        await reading_writer.update(job.reading.id, fields)
+        job.event.set()
+        self.completed += 1
+        self._jobs.move_to_end(job.reading.id)
+        while len(self._jobs) > self.max_finished:
+            oldest_id, oldest = next(iter(self._jobs.items()))
+            if oldest.status == "pending":
+                break
+            del self._jobs[oldest_id]
+
+ai_job_queue = AIJobQueue(
+    workers=int(os.getenv("AI_JOB_WORKERS", "4")),
+    max_queue=int(os.getenv("AI_JOB_QUEUE", "1000")),
+)
+
+def _collect_ai_job_queue() -> List[str]:
+    stats = ai_job_queue.stats()
+    lines = prom_metric("tarot_ai_job_workers", "gauge", "AI job workers running.", [({}, stats["workers"])])
+    lines += prom_metric("tarot_ai_job_queue_depth", "gauge", "AI jobs waiting for a worker.", [({}, stats["queue_depth"])])
+    for key in ("submitted", "completed", "rejected", "abandoned"):
+        lines += prom_metric(f"tarot_ai_jobs_{key}_total", "counter", f"AI jobs {key}.", [({}, stats[key])])
+    return lines
+
+METRICS_COLLECTORS.append(_collect_ai_job_queue)
+
+class ReadingJobStatus(BaseModel):
+    id: str
+    status: Literal["pending", "done"]
+    reading: TarotReading
+
+READING_JOB_MAX_WAIT = 30.0
+
+@api_router.get("/reading-jobs/{job_id}", response_model=ReadingJobStatus)
+async def get_reading_job(job_id: str, wait: float = 0.0):
+    """Status of a job=true reading; wait > 0 long-polls up to that many seconds."""
+    job = ai_job_queue.get(job_id)
+    if job is not None:
+        if job.status == "pending" and wait > 0:
+            with contextlib.suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(job.event.wait(), timeout=min(wait, READING_JOB_MAX_WAIT))
+        return ReadingJobStatus(id=job_id, status=job.status, reading=job.reading)
+    docs = await db.readings.find({"id": job_id}, {"_id": 0}).limit(1).to_list(1)
+    if not docs:
+        raise HTTPException(status_code=404, detail="Reading job not found")
+    reading = rehydrate_reading(docs[0])
+    return ReadingJobStatus(id=job_id, status="pending" if reading.mode == "pending" else "done", reading=reading)
+
+def resolve_reading_card(item: Dict[str, Any], language: str) -> Dict[str, Any]:
+    """Localized catalog card for a reading position, falling back to the embedded card."""
+    card = item["card"]
+    return get_card_catalog(language).cards_by_id.get(card.get("id"), card)
 
 # Extracted rule-based interpretation (original logic) for reuse
 def rule_based_interpretation(reading_type: str, cards: List[Dict], language: str) -> str:
     interpretation = ""
     if reading_type == "card_of_day":
-        card = cards[0]["card"]
+        card = resolve_reading_card(cards[0], language)
         reversed = cards[0]["reversed"]
         meaning_key = f"meaning_{'reversed' if reversed else 'upright'}"
         if language == "tr":
@@ -559,7 +2738,7 @@ def rule_based_interpretation(reading_type: str, cards: List[Dict], language: st
     elif reading_type == "classic_tarot":
         interpretation = "**Klasik Üç Kart Falı**\n\n" if language == "tr" else "**Classic Three-Card Reading**\n\n"
         for i, card_data in enumerate(cards):
-            card = card_data["card"]
+            card = resolve_reading_card(card_data, language)
             position = card_data["position"]
             reversed = card_data["reversed"]
             meaning_key = f"meaning_{'reversed' if reversed else 'upright'}"
@@ -578,7 +2757,7 @@ def rule_based_interpretation(reading_type: str, cards: List[Dict], language: st
             interpretation = "**Path of the Day - Four Areas Reading**\n\n"
             advice_areas = ["work environment", "financial decisions", "romantic connections", "overall life direction"]
         for i, card_data in enumerate(cards):
-            card = card_data["card"]
+            card = resolve_reading_card(card_data, language)
             position = card_data["position"]
             reversed = card_data["reversed"]
             meaning_key = f"meaning_{'reversed' if reversed else 'upright'}"
@@ -590,7 +2769,7 @@ def rule_based_interpretation(reading_type: str, cards: List[Dict], language: st
     elif reading_type == "couples_tarot":
         interpretation = "**Çiftler Tarot Falı**\n\n" if language == "tr" else "**Couples Tarot Reading**\n\n"
         for i, card_data in enumerate(cards):
-            card = card_data["card"]
+            card = resolve_reading_card(card_data, language)
             position = card_data["position"]
             reversed = card_data["reversed"]
             meaning_key = f"meaning_{'reversed' if reversed else 'upright'}"
@@ -602,7 +2781,7 @@ def rule_based_interpretation(reading_type: str, cards: List[Dict], language: st
                            if language == "tr" else
                            "This reading suggests strengthening your bond through mutual understanding, clear communication, and shared goals.")
     elif reading_type == "yes_no":
-        card = cards[0]["card"]
+        card = resolve_reading_card(cards[0], language)
         interpretation = (f"**Evet/Hayır Yorumu**\n\n{card.get('yes_no_meaning_tr', card.get('yes_no_meaning', 'Belirsiz'))}"
                            if language == "tr" else
                            f"**Yes/No Interpretation**\n\n{card.get('yes_no_meaning', card.get('yes_no_meaning_tr', 'Unclear'))}")
@@ -610,9 +2789,153 @@ def rule_based_interpretation(reading_type: str, cards: List[Dict], language: st
         interpretation = ("Seçilen fal türü için yorum oluşturulamadı." if language == "tr" else "Could not generate interpretation for the selected reading type.")
     return interpretation
 
+class InterpretationCache:
+    """LRU memo of length-processed rule-based interpretations.
+
+    The rule text depends only on the reading type, the (card, position,
+    reversed) sequence, language and length, so the key space is finite and
+    repeated draws skip the string building. Entries added with pin() live in a
+    separate table outside the LRU, so multi-card spreads cannot evict them.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple, str]" = OrderedDict()
+        self._pinned: Dict[Tuple, str] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._pinned) + len(self._entries)
+
+    def stats(self) -> Dict[str, int]:
+        return {"entries": len(self), "pinned": len(self._pinned), "hits": self.hits, "misses": self.misses,
+                "evictions": self.evictions}
+
+    @staticmethod
+    def key(reading_type: str, cards: List[Dict], language: str, length: str) -> Tuple:
+        return (
+            reading_type,
+            tuple((item["card"].get("id"), item.get("position"), bool(item.get("reversed"))) for item in cards),
+            normalize_language(language),
+            length,
+        )
+
+    def pin(self, reading_type: str, cards: List[Dict], language: str, length: str) -> None:
+        key = self.key(reading_type, cards, language, length)
+        if key not in self._pinned:
+            self._pinned[key] = self._entries.pop(key, None) or \
+                postprocess_length(rule_based_interpretation(reading_type, cards, language), length)
+
+    def get_or_build(self, reading_type: str, cards: List[Dict], language: str, length: str) -> str:
+        key = self.key(reading_type, cards, language, length)
+        text = self._pinned.get(key)
+        if text is not None:
+            self.hits += 1
+            return text
+        text = self._entries.get(key)
+        if text is not None:
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return text
+        self.misses += 1
+        text = postprocess_length(rule_based_interpretation(reading_type, cards, language), length)
+        if self.max_entries > 0:
+            self._entries[key] = text
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return text
+
+interpretation_cache = InterpretationCache(int(os.getenv("RULE_CACHE_MAX_ENTRIES", "4096")))
+
+def rule_interpretation(reading_type: str, cards: List[Dict], language: str, length: str) -> str:
+    """Rule-based text trimmed to length, served from the memo when possible."""
+    return interpretation_cache.get_or_build(reading_type, cards, language, length)
+
+RULE_PRECOMPUTE_TYPES = ("card_of_day", "yes_no")
+
+def precompute_rule_interpretations() -> int:
+    """Pin every single-card reading in the memo: 22 cards x upright/reversed."""
+    index = get_deck_index()
+    count = 0
+    for reading_type in RULE_PRECOMPUTE_TYPES:
+        position = index.reading_type(reading_type)["positions"][0]
+        for language in SUPPORTED_LANGUAGES:
+            catalog = get_card_catalog(language)
+            for length in TARGET_WORDS:
+                for card in index.cards:
+                    for reversed_ in (False, True):
+                        cards = [{"card": catalog.cards_by_id[card["id"]], "position": position, "reversed": reversed_}]
+                        interpretation_cache.pin(reading_type, cards, language, length)
+                        count += 1
+    return count
+
+def _collect_interpretation_cache() -> List[str]:
+    stats = interpretation_cache.stats()
+    lines = prom_metric("tarot_rule_cache_entries", "gauge", "Memoized rule-based interpretations.", [({}, stats["entries"])])
+    lines += prom_metric("tarot_rule_cache_pinned_entries", "gauge", "Precomputed interpretations exempt from eviction.",
+                         [({}, stats["pinned"])])
+    for key in ("hits", "misses", "evictions"):
+        lines += prom_metric(f"tarot_rule_cache_{key}_total", "counter", f"Rule interpretation cache {key}.", [({}, stats[key])])
+    return lines
+
+METRICS_COLLECTORS.append(_collect_interpretation_cache)
+
 # Root & include
 app.include_router(api_router)
 
+@app.on_event("startup")
+async def startup_card_catalog():
+    for language in SUPPORTED_LANGUAGES:
+        get_card_catalog(language)
+    count = precompute_rule_interpretations()
+    logging.info(f"Precomputed {count} rule interpretations")
+    templates = prompt_templates.compile()
+    logging.info(f"Compiled {templates} prompt templates (active version {prompt_templates.active})")
+
+@app.on_event("startup")
+async def startup_image_store():
+    store = get_image_store()
+    count = await asyncio.to_thread(build_image_variants, store)
+    global _thumbnail_sprite
+    _thumbnail_sprite = await asyncio.to_thread(build_thumbnail_sprite, store)
+    logging.info(f"Image store ready: {len(store.entries)} images ({count} variants), {store.resident_bytes} bytes resident")
+
+@app.on_event("startup")
+async def startup_telemetry_sink():
+    telemetry_sink.start()
+
+@app.on_event("startup")
+async def startup_reading_writer():
+    reading_writer.start()
+    # Built in the background so an unreachable database does not block startup
+    asyncio.create_task(ensure_readings_indexes())
+
+@app.on_event("startup")
+async def startup_ai_client():
+    get_ai_http_client()
+    ai_job_queue.start()
+    if ai_response_cache is not None and isinstance(ai_response_cache.store, MongoAIResponseStore):
+        asyncio.create_task(ai_response_cache.store.ensure_indexes())
+
+@app.on_event("shutdown")
+async def shutdown_telemetry_sink():
+    await telemetry_sink.stop()
+    logging.info(f"Telemetry sink stopped: {telemetry_sink.stats()}")
+
+@app.on_event("shutdown")
+async def shutdown_ai_client():
+    # AI work still in flight needs the HTTP client, and stores its results
+    # through the reading writer, which shutdown_db_client flushes afterwards
+    await ai_job_queue.stop()
+    await interpretation_race.drain(float(os.getenv("AI_LATE_DRAIN_SECONDS", "5")))
+    await close_ai_http_client()
+
 @app.on_event("shutdown")
 async def shutdown_db_client():
+    await drain_stream_persists(float(os.getenv("STREAM_PERSIST_DRAIN_SECONDS", "5")))
+    await reading_writer.stop()
+    logging.info(f"Reading writer stopped: {reading_writer.stats()}")
     client.close()
\ No newline at end of file
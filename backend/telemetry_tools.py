@@ -0,0 +1,642 @@
+"""Offline tools for the telemetry JSONL logs written by server.TelemetrySink.
+
+Streams the day files in fixed-size chunks, so memory stays bounded no matter how
+large a day gets. Counts are re-weighted by 1 / sampleRate when events carry it.
+Closed days can be compacted into a columnar .tcol.npz file, which report reads
+in place of the JSONL, touching only the columns and row groups it needs.
+
+Usage (from the repository root):
+    python -m backend.telemetry_tools report backend/logs
+    python -m backend.telemetry_tools report backend/logs --day 20250924 --json
+    python -m backend.telemetry_tools compact backend/logs [--delete-source]
+"""
+
+import hashlib
+import json
+import os
+import re
+import uuid
+from datetime import datetime, timedelta, timezone
+from itertools import islice
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import typer
+
+DAY_FILE_RE = re.compile(r"^telemetry-(\d{8})\.(jsonl|tcol\.npz)$")
+COMPACT_SUFFIX = ".tcol.npz"
+COLUMNS = ["event", "sessionId", "userIdHash", "type", "mode", "durationMs", "sampleRate"]
+# Funnel stages in order; a session reaches a stage when it logged that event
+FUNNEL = ("paywall_view", "purchase_start", "purchase_success")
+# Log-spaced duration buckets from 1 ms to ~17 min; relative error per bucket is ~3.5%
+DURATION_EDGES = np.concatenate(([0.0], np.logspace(0, 6, 401)))
+
+app = typer.Typer(help="Telemetry log tools", no_args_is_help=True)
+
+
+@app.callback()
+def main() -> None:
+    """Telemetry log tools."""
+
+
+def _scan_days(logs_dir: Path) -> Dict[str, Dict[str, Path]]:
+    days: Dict[str, Dict[str, Path]] = {}
+    for path in Path(logs_dir).iterdir():
+        m = DAY_FILE_RE.match(path.name)
+        if m:
+            days.setdefault(m.group(1), {})[m.group(2)] = path
+    return days
+
+
+def day_files(logs_dir: Path, day: Optional[str] = None) -> List[Tuple[str, Path]]:
+    """(day, path) per day in logs_dir, sorted by day.
+
+    A compacted file is preferred over the JSONL unless the JSONL changed after it.
+    """
+    found = []
+    for file_day, files in _scan_days(logs_dir).items():
+        if day is not None and file_day != day:
+            continue
+        jsonl, compacted = files.get("jsonl"), files.get("tcol.npz")
+        if compacted is not None and (jsonl is None or compacted.stat().st_mtime >= jsonl.stat().st_mtime):
+            found.append((file_day, compacted))
+        else:
+            found.append((file_day, jsonl))
+    return sorted(found)
+
+
+def _iter_records(path: Path, chunk_size: int = 50000) -> Iterator[Tuple[List[Dict[str, Any]], int]]:
+    """(records, skipped) per chunk of at most chunk_size lines; skipped counts lines
+    that are not JSON event objects."""
+    with open(path, "r", encoding="utf-8") as f:
+        while True:
+            lines = list(islice(f, chunk_size))
+            if not lines:
+                return
+            records = []
+            skipped = 0
+            for line in lines:
+                try:
+                    data = json.loads(line)
+                except ValueError:
+                    skipped += 1
+                    continue
+                if isinstance(data, dict) and data.get("event"):
+                    records.append(data)
+                else:
+                    skipped += 1
+            yield records, skipped
+
+
+def iter_chunks(path: Path, chunk_size: int = 50000) -> Iterator[pd.DataFrame]:
+    """DataFrames of at most chunk_size events; malformed lines are skipped."""
+    for records, _ in _iter_records(path, chunk_size):
+        if records:
+            yield pd.DataFrame.from_records([{c: data.get(c) for c in COLUMNS} for data in records], columns=COLUMNS)
+
+
+class DurationHistogram:
+    """Fixed-size histogram; percentiles are read off the bucket upper edges."""
+
+    def __init__(self):
+        self.counts = np.zeros(len(DURATION_EDGES) - 1)
+
+    def add(self, values: np.ndarray, weights: np.ndarray) -> None:
+        values = np.clip(values, 0, DURATION_EDGES[-1] - 1)
+        self.counts += np.histogram(values, bins=DURATION_EDGES, weights=weights)[0]
+
+    @property
+    def total(self) -> float:
+        return float(self.counts.sum())
+
+    def percentile(self, q: float) -> Optional[float]:
+        if self.total <= 0:
+            return None
+        cumulative = np.cumsum(self.counts)
+        idx = int(np.searchsorted(cumulative, self.total * q / 100.0))
+        return float(DURATION_EDGES[min(idx + 1, len(DURATION_EDGES) - 1)])
+
+
+class TelemetryAggregator:
+    """Single-pass aggregation over event chunks.
+
+    Keeps only counters, fixed-size histograms and one small bitmask per session
+    that entered the monetization funnel.
+    """
+
+    def __init__(self, percentiles: Tuple[float, ...] = (50, 95, 99)):
+        self.percentiles = percentiles
+        self.events = 0
+        self.event_counts: Dict[Tuple[str, str], float] = {}
+        self.mode_counts: Dict[Tuple[str, str], float] = {}
+        self.durations: Dict[str, DurationHistogram] = {}
+        self.funnel_events: Dict[str, float] = {}
+        self._funnel_sessions: Dict[str, int] = {}
+
+    def add_chunk(self, day: str, df: pd.DataFrame) -> None:
+        self.events += len(df)
+        rate = pd.to_numeric(df["sampleRate"], errors="coerce").fillna(1.0)
+        weight = 1.0 / rate.where(rate > 0, 1.0)
+
+        for event, w in weight.groupby(df["event"]).sum().items():
+            key = (day, event)
+            self.event_counts[key] = self.event_counts.get(key, 0.0) + float(w)
+
+        results = df["event"] == "reading_result"
+        modes = df.loc[results, "mode"].fillna("unknown")
+        for mode, w in weight[results].groupby(modes).sum().items():
+            key = (day, mode)
+            self.mode_counts[key] = self.mode_counts.get(key, 0.0) + float(w)
+
+        durations = pd.to_numeric(df["durationMs"], errors="coerce")
+        timed = results & durations.notna()
+        if timed.any():
+            types = df.loc[timed, "type"].fillna("unknown")
+            for reading_type, idx in types.groupby(types).groups.items():
+                hist = self.durations.setdefault(reading_type, DurationHistogram())
+                hist.add(durations[idx].to_numpy(dtype=float), weight[idx].to_numpy(dtype=float))
+
+        in_funnel = df["event"].isin(FUNNEL)
+        if in_funnel.any():
+            for event, w in weight[in_funnel].groupby(df.loc[in_funnel, "event"]).sum().items():
+                self.funnel_events[event] = self.funnel_events.get(event, 0.0) + float(w)
+            sessions = df.loc[in_funnel, "sessionId"].fillna(df.loc[in_funnel, "userIdHash"])
+            stages = df.loc[in_funnel, "event"].map({e: 1 << i for i, e in enumerate(FUNNEL)})
+            for session, bit in zip(sessions, stages):
+                if session:
+                    self._funnel_sessions[session] = self._funnel_sessions.get(session, 0) | int(bit)
+
+    def add_file(self, day: str, path: Path, chunk_size: int = 50000) -> None:
+        if path.name.endswith(COMPACT_SUFFIX):
+            with CompactedDay(path) as compacted:
+                for chunk in compacted.read(COLUMNS):
+                    self.add_chunk(day, chunk)
+            return
+        for chunk in iter_chunks(path, chunk_size):
+            self.add_chunk(day, chunk)
+
+    def funnel(self) -> List[Dict[str, Any]]:
+        """Per stage: weighted event count and sessions that reached it after all earlier stages."""
+        steps = []
+        required = 0
+        for i, event in enumerate(FUNNEL):
+            required |= 1 << i
+            sessions = sum(1 for mask in self._funnel_sessions.values() if mask & required == required)
+            steps.append({"event": event, "events": round(self.funnel_events.get(event, 0.0), 3), "sessions": sessions})
+        for prev, step in zip(steps, steps[1:]):
+            step["conversion"] = round(step["sessions"] / prev["sessions"], 4) if prev["sessions"] else None
+        return steps
+
+    def report(self) -> Dict[str, Any]:
+        days: Dict[str, Dict[str, Any]] = {}
+        for (day, event), count in sorted(self.event_counts.items()):
+            days.setdefault(day, {"events": {}, "modes": {}})["events"][event] = round(count, 3)
+        for (day, mode), count in sorted(self.mode_counts.items()):
+            days.setdefault(day, {"events": {}, "modes": {}})["modes"][mode] = round(count, 3)
+        for summary in days.values():
+            total = sum(summary["modes"].values())
+            summary["mode_ratio"] = {m: round(c / total, 4) for m, c in summary["modes"].items()} if total else {}
+        durations = {
+            reading_type: {
+                "count": round(hist.total, 3),
+                **{f"p{q:g}": hist.percentile(q) for q in self.percentiles},
+            }
+            for reading_type, hist in sorted(self.durations.items())
+        }
+        return {"events_read": self.events, "days": days, "duration_ms": durations, "funnel": self.funnel()}
+
+
+# Columnar compaction. Each column of each row group is its own member of a
+# compressed .npz archive; members are decompressed only when read. Rows are sorted
+# by (event, ts) and cut into row groups per event type, and the JSON index lists
+# every group's event and time range so readers can skip whole groups.
+# Values a typed column cannot hold exactly (an unparseable ts, a durationMs beyond
+# int32, a non-UUID id, unknown keys) are kept verbatim in the _raw column, a
+# dictionary of per-row JSON objects that readers overlay on the typed columns.
+ROW_GROUP_SIZE = 65536
+TS_NULL = np.iinfo(np.int64).min
+COMPACT_SCHEMA: Dict[str, str] = {
+    # dictionary-encoded: small enums and repeated strings
+    "event": "dict", "type": "dict", "lang": "dict", "mode": "dict", "tone": "dict", "length": "dict",
+    "sessionId": "dict", "userIdHash": "dict", "ua": "dict",
+    "ts": "ts",               # epoch milliseconds, TS_NULL when missing
+    "durationMs": "int",      # int32, -1 when missing
+    "sampleRate": "float",    # float32, NaN when missing
+    "aiEnabled": "bool",      # int8: -1 missing, 0 false, 1 true
+    "questionPresent": "bool",
+    "id": "uuid",             # 16 raw bytes
+    "_raw": "dict",           # JSON object of the row's values kept verbatim, code 0 when none
+}
+INT32_MAX = int(np.iinfo(np.int32).max)
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def _parse_ts(value: Any) -> Optional[int]:
+    """Epoch milliseconds for an ISO 8601 string (naive means UTC), None when it does not parse."""
+    if not isinstance(value, str):
+        return None
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return (parsed - EPOCH) // timedelta(milliseconds=1)
+
+
+def _number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _fits(kind: str, value: Any) -> bool:
+    """Whether the typed column decodes value back to an equivalent value."""
+    if kind == "dict":
+        return isinstance(value, str)
+    if kind == "ts":
+        return _parse_ts(value) is not None
+    if kind == "int":
+        return _number(value) and float(value).is_integer() and 0 <= value <= INT32_MAX
+    if kind == "float":
+        return _number(value) and float(np.float32(value)) == float(value)
+    if kind == "bool":
+        return isinstance(value, bool)
+    if kind == "uuid":
+        try:
+            # all-zero bytes mark a missing id, so the nil UUID is kept verbatim
+            return str(uuid.UUID(value)) == value and uuid.UUID(value).int != 0
+        except (ValueError, TypeError, AttributeError):
+            return False
+    raise ValueError(f"unknown column kind {kind}")
+
+
+def _split_record(data: Dict[str, Any]) -> Tuple[Dict[str, Any], Optional[str]]:
+    """Typed column values plus the JSON of everything they cannot hold."""
+    typed: Dict[str, Any] = {}
+    raw: Dict[str, Any] = {}
+    for key, value in data.items():
+        kind = COMPACT_SCHEMA.get(key)
+        if value is None:
+            continue
+        if key == "client":
+            ua = value.get("ua") if isinstance(value, dict) else None
+            if isinstance(ua, str):
+                typed["ua"] = ua
+            if not (isinstance(value, dict) and set(value) == {"ua"} and isinstance(ua, str)):
+                raw[key] = value
+        elif kind is None or key in ("ua", "_raw"):
+            raw[key] = value
+        elif _fits(kind, value):
+            typed[key] = value
+        else:
+            raw[key] = value
+    return typed, json.dumps(raw, ensure_ascii=False, sort_keys=True) if raw else None
+
+
+def _canonical(data: Dict[str, Any]) -> bytes:
+    """Record identity for the compaction round-trip: nulls dropped, numbers as floats,
+    timestamps to the millisecond."""
+    out = {}
+    for key, value in data.items():
+        if value is None:
+            continue
+        if key == "ts" and _parse_ts(value) is not None:
+            value = _parse_ts(value)
+        if _number(value):
+            value = float(value)
+        out[key] = value
+    return json.dumps(out, ensure_ascii=False, sort_keys=True).encode("utf-8")
+
+
+def _digest(records: Iterator[Dict[str, Any]]) -> Tuple[int, int]:
+    """Order-independent (count, sum of hashes) over records."""
+    count, total = 0, 0
+    for data in records:
+        count += 1
+        total += int.from_bytes(hashlib.blake2b(_canonical(data), digest_size=8).digest(), "big")
+    return count, total % 2 ** 64
+
+
+def _smallest_uint(n: int) -> Any:
+    for dtype in (np.uint8, np.uint16, np.uint32):
+        if n <= np.iinfo(dtype).max:
+            return dtype
+    return np.uint64
+
+
+class _DictEncoder:
+    """Code 0 is reserved for missing values."""
+
+    def __init__(self):
+        self.values: List[Any] = [None]
+        self._codes: Dict[Any, int] = {}
+
+    def encode(self, values: List[Any]) -> np.ndarray:
+        out = np.empty(len(values), dtype=np.uint32)
+        for i, v in enumerate(values):
+            if v is None:
+                out[i] = 0
+                continue
+            code = self._codes.get(v)
+            if code is None:
+                code = self._codes[v] = len(self.values)
+                self.values.append(v)
+            out[i] = code
+        return out
+
+
+def _encode_column(kind: str, values: List[Any], encoder: Optional[_DictEncoder]) -> np.ndarray:
+    if kind == "dict":
+        return encoder.encode(values)
+    if kind == "ts":
+        return np.array([TS_NULL if v is None else _parse_ts(v) for v in values], dtype=np.int64)
+    if kind == "int":
+        return np.array([-1 if v is None else v for v in values], dtype=np.int64).astype(np.int32)
+    if kind == "float":
+        return np.array([np.nan if v is None else v for v in values], dtype=np.float32)
+    if kind == "bool":
+        return np.array([-1 if v is None else int(v) for v in values], dtype=np.int8)
+    if kind == "uuid":
+        out = np.zeros(len(values), dtype="S16")
+        for i, v in enumerate(values):
+            try:
+                out[i] = uuid.UUID(str(v)).bytes
+            except ValueError:
+                pass
+        return out
+    raise ValueError(f"unknown column kind {kind}")
+
+
+def _decode_column(kind: str, data: np.ndarray, values: Optional[List[Any]]) -> Any:
+    if kind == "dict":
+        return np.array(values, dtype=object)[data]
+    if kind == "ts":
+        return pd.to_datetime(np.where(data == TS_NULL, np.datetime64("NaT"), data.astype("datetime64[ms]")), utc=True)
+    if kind == "int":
+        return np.where(data < 0, np.nan, data.astype(np.float64))
+    if kind == "float":
+        return data.astype(np.float64)
+    if kind == "bool":
+        return np.array([None, False, True], dtype=object)[data + 1]
+    if kind == "uuid":
+        # numpy drops trailing NUL bytes from S16 items
+        return np.array([str(uuid.UUID(bytes=b.ljust(16, b"\0"))) if any(b) else None for b in data.tolist()],
+                        dtype=object)
+    raise ValueError(f"unknown column kind {kind}")
+
+
+def compact_day(src: Path, dest: Optional[Path] = None, chunk_size: int = 50000,
+                row_group_size: int = ROW_GROUP_SIZE) -> Dict[str, Any]:
+    """Convert one JSONL day file into a columnar .tcol.npz; returns size statistics.
+
+    skipped counts lines that are not JSON event objects; they are not compacted.
+    """
+    src = Path(src)
+    if dest is None:
+        dest = src.with_name(src.name[: -len(".jsonl")] + COMPACT_SUFFIX)
+    encoders = {c: _DictEncoder() for c, kind in COMPACT_SCHEMA.items() if kind == "dict"}
+    parts: Dict[str, List[np.ndarray]] = {c: [] for c in COMPACT_SCHEMA}
+    skipped = 0
+    for records, bad in _iter_records(src, chunk_size):
+        skipped += bad
+        split = [_split_record(r) for r in records]
+        for column, kind in COMPACT_SCHEMA.items():
+            if column == "_raw":
+                values = [raw for _, raw in split]
+            else:
+                values = [typed.get(column) for typed, _ in split]
+            parts[column].append(_encode_column(kind, values, encoders.get(column)))
+
+    columns = {c: np.concatenate(p) if p else np.array([]) for c, p in parts.items()}
+    rows = len(columns["event"])
+    order = np.lexsort((columns["ts"], columns["event"])) if rows else np.array([], dtype=np.int64)
+    for column, kind in COMPACT_SCHEMA.items():
+        columns[column] = columns[column][order]
+        if kind == "dict":
+            columns[column] = columns[column].astype(_smallest_uint(len(encoders[column].values)))
+
+    arrays: Dict[str, np.ndarray] = {}
+    row_groups = []
+    events = columns["event"]
+    boundaries = np.flatnonzero(np.diff(events.astype(np.int64))) + 1 if rows else []
+    for start, stop in zip(np.r_[0, boundaries].astype(int).tolist(), np.r_[boundaries, rows].astype(int).tolist()):
+        if start == stop:
+            continue
+        for lo in range(start, stop, row_group_size):
+            hi = min(lo + row_group_size, stop)
+            gid = len(row_groups)
+            for column in COMPACT_SCHEMA:
+                arrays[f"rg{gid}.{column}"] = columns[column][lo:hi]
+            ts = columns["ts"][lo:hi]
+            ts = ts[ts != TS_NULL]
+            row_groups.append({
+                "event": encoders["event"].values[int(events[lo])],
+                "rows": hi - lo,
+                "ts_min": int(ts.min()) if len(ts) else None,
+                "ts_max": int(ts.max()) if len(ts) else None,
+            })
+
+    index = {
+        "version": 2,
+        "source": src.name,
+        "rows": rows,
+        "schema": COMPACT_SCHEMA,
+        "dictionaries": {c: e.values for c, e in encoders.items()},
+        "row_groups": row_groups,
+    }
+    arrays["__index__"] = np.frombuffer(json.dumps(index, ensure_ascii=False).encode("utf-8"), dtype=np.uint8)
+    tmp = dest.with_name(dest.name + ".tmp")
+    with open(tmp, "wb") as f:
+        np.savez_compressed(f, **arrays)
+    os.replace(tmp, dest)
+
+    src_bytes, dest_bytes = src.stat().st_size, dest.stat().st_size
+    return {"rows": rows, "row_groups": len(row_groups), "skipped": skipped, "source_bytes": src_bytes,
+            "compacted_bytes": dest_bytes, "ratio": round(src_bytes / dest_bytes, 2) if dest_bytes else None}
+
+
+def verify_compacted(src: Path, dest: Path, chunk_size: int = 50000) -> bool:
+    """True when dest decodes to the same event records as src, in any order, and
+    src has no malformed lines (those are not compacted)."""
+    skipped = 0
+
+    def source_records() -> Iterator[Dict[str, Any]]:
+        nonlocal skipped
+        for records, bad in _iter_records(src, chunk_size):
+            skipped += bad
+            yield from records
+
+    with CompactedDay(dest) as compacted:
+        return _digest(source_records()) == _digest(compacted.records()) and not skipped
+
+
+class CompactedDay:
+    """Reader for a .tcol.npz day file; loads only the requested columns and row groups."""
+
+    def __init__(self, path: Path):
+        self._npz = np.load(path, allow_pickle=False)
+        self.index = json.loads(self._npz["__index__"].tobytes().decode("utf-8"))
+        self.schema: Dict[str, str] = self.index["schema"]
+
+    def __enter__(self) -> "CompactedDay":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._npz.close()
+
+    def row_groups(self, events: Optional[List[str]] = None, start_ms: Optional[int] = None,
+                   end_ms: Optional[int] = None) -> List[int]:
+        """Ids of row groups that may hold matching rows (time bounds are inclusive)."""
+        selected = []
+        for gid, group in enumerate(self.index["row_groups"]):
+            if events is not None and group["event"] not in events:
+                continue
+            if start_ms is not None and group["ts_max"] is not None and group["ts_max"] < start_ms:
+                continue
+            if end_ms is not None and group["ts_min"] is not None and group["ts_min"] > end_ms:
+                continue
+            selected.append(gid)
+        return selected
+
+    def records(self) -> Iterator[Dict[str, Any]]:
+        """Every row as an event record, the _raw values restored; ts as ISO 8601 UTC."""
+        for df in self.read(list(dict.fromkeys([*self.schema, "_raw"]))):
+            df["ts"] = df["ts"].dt.strftime("%Y-%m-%dT%H:%M:%S.%f").str[:-3] + "Z"
+            for row in df.to_dict("records"):
+                raw, ua = row.pop("_raw"), row.pop("ua")
+                data = {k: v for k, v in row.items() if not _missing(v)}
+                if not _missing(ua):
+                    data["client"] = {"ua": ua}
+                if not _missing(raw):
+                    data.update(json.loads(raw))
+                yield data
+
+    def read(self, columns: List[str], events: Optional[List[str]] = None, start_ms: Optional[int] = None,
+             end_ms: Optional[int] = None) -> Iterator[pd.DataFrame]:
+        """One DataFrame per matching row group; columns missing from the schema come back empty.
+
+        Values kept verbatim in _raw replace the typed ones, except for ts, which
+        stays a datetime column (NaT where the original did not parse).
+        """
+        dictionaries = self.index["dictionaries"]
+        for gid in self.row_groups(events, start_ms, end_ms):
+            rows = self.index["row_groups"][gid]["rows"]
+            frame = {}
+            for column in columns:
+                kind = self.schema.get(column)
+                if kind is None:
+                    frame[column] = np.full(rows, None, dtype=object)
+                else:
+                    frame[column] = _decode_column(kind, self._npz[f"rg{gid}.{column}"], dictionaries.get(column))
+            df = pd.DataFrame(frame, columns=columns)
+            self._overlay_raw(df, gid, [c for c in columns if c not in ("ts", "_raw")])
+            if start_ms is not None or end_ms is not None:
+                ts = self._npz[f"rg{gid}.ts"]
+                keep = np.ones(rows, dtype=bool)
+                if start_ms is not None:
+                    keep &= ts >= start_ms
+                if end_ms is not None:
+                    keep &= ts <= end_ms
+                df = df[keep].reset_index(drop=True)
+            yield df
+
+    def _overlay_raw(self, df: pd.DataFrame, gid: int, columns: List[str]) -> None:
+        if "_raw" not in self.schema or not columns:
+            return
+        codes = self._npz[f"rg{gid}._raw"]
+        dictionary = self.index["dictionaries"]["_raw"]
+        for i in np.flatnonzero(codes).tolist():
+            raw = json.loads(dictionary[int(codes[i])])
+            raw.pop("ua", None)  # the ua column holds client.ua, not a top-level key
+            if "client" in raw:
+                client = raw["client"]
+                raw["ua"] = client.get("ua") if isinstance(client, dict) else None
+            for column in columns:
+                if column in raw:
+                    if df[column].dtype != object:
+                        df[column] = df[column].astype(object)
+                    df.at[i, column] = raw[column]
+
+
+def _missing(value: Any) -> bool:
+    return value is None or value is pd.NaT or (isinstance(value, float) and np.isnan(value))
+
+
+def aggregate(logs_dir: Path, day: Optional[str] = None, chunk_size: int = 50000) -> Dict[str, Any]:
+    agg = TelemetryAggregator()
+    for file_day, path in day_files(logs_dir, day):
+        agg.add_file(file_day, path, chunk_size)
+    return agg.report()
+
+
+def _print_report(report: Dict[str, Any]) -> None:
+    typer.echo(f"events read: {report['events_read']}")
+    for day, summary in report["days"].items():
+        typer.echo(f"\n{day}")
+        for event, count in summary["events"].items():
+            typer.echo(f"  {event:<20} {count:>12.1f}")
+        if summary["mode_ratio"]:
+            ratios = "  ".join(f"{m}={r:.1%}" for m, r in summary["mode_ratio"].items())
+            typer.echo(f"  modes: {ratios}")
+    if report["duration_ms"]:
+        typer.echo("\ndurationMs by reading type")
+        for reading_type, stats in report["duration_ms"].items():
+            pcts = "  ".join(f"{k}={v:.0f}" for k, v in stats.items() if k != "count" and v is not None)
+            typer.echo(f"  {reading_type:<16} n={stats['count']:<10.0f} {pcts}")
+    typer.echo("\nfunnel")
+    for step in report["funnel"]:
+        conv = f"  conversion={step['conversion']:.1%}" if step.get("conversion") is not None else ""
+        typer.echo(f"  {step['event']:<18} events={step['events']:<10.0f} sessions={step['sessions']}{conv}")
+
+
+@app.command()
+def report(
+    logs_dir: Path = typer.Argument(Path(__file__).parent / "logs", help="Directory holding telemetry-YYYYMMDD.jsonl files"),
+    day: Optional[str] = typer.Option(None, help="Only this day (YYYYMMDD)"),
+    chunk_size: int = typer.Option(50000, help="Events per processing chunk"),
+    as_json: bool = typer.Option(False, "--json", help="Print the report as JSON"),
+):
+    """Event counts, AI/rule/fallback split, durationMs percentiles and funnel conversion."""
+    result = aggregate(logs_dir, day, chunk_size)
+    if as_json:
+        typer.echo(json.dumps(result, indent=2, ensure_ascii=False))
+    else:
+        _print_report(result)
+
+
+@app.command()
+def compact(
+    logs_dir: Path = typer.Argument(Path(__file__).parent / "logs", help="Directory holding telemetry-YYYYMMDD.jsonl files"),
+    day: Optional[str] = typer.Option(None, help="Only this day (YYYYMMDD)"),
+    delete_source: bool = typer.Option(False, help="Remove each JSONL file once its compacted file decodes back to the same events"),
+    force: bool = typer.Option(False, help="Recompact days that already have an up-to-date compacted file"),
+):
+    """Compact closed day files (before today, UTC) into columnar .tcol.npz files."""
+    today = datetime.utcnow().strftime("%Y%m%d")
+    for file_day, files in sorted(_scan_days(logs_dir).items()):
+        jsonl = files.get("jsonl")
+        if jsonl is None or (day is not None and file_day != day):
+            continue
+        if file_day >= today:
+            typer.echo(f"{file_day}: still open, skipped")
+            continue
+        existing = files.get("tcol.npz")
+        if existing is not None and not force and existing.stat().st_mtime >= jsonl.stat().st_mtime:
+            typer.echo(f"{file_day}: up to date")
+        else:
+            stats = compact_day(jsonl)
+            existing = jsonl.with_name(jsonl.name[: -len(".jsonl")] + COMPACT_SUFFIX)
+            typer.echo(f"{file_day}: {stats['rows']} rows, {stats['source_bytes']} -> {stats['compacted_bytes']} bytes (x{stats['ratio']})")
+        if delete_source:
+            if verify_compacted(jsonl, existing):
+                jsonl.unlink()
+            else:
+                typer.echo(f"{file_day}: compacted file does not reproduce the source, source kept")
+
+
+if __name__ == "__main__":
+    app()
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+In-process benchmarks for the Tarot API
+
+Runs against the ASGI app directly (no network, no MongoDB), so numbers
+reflect handler cost rather than deployment latency.
+
+Usage:
+    python backend_benchmark.py            # run every benchmark
+    python backend_benchmark.py cards      # run selected benchmarks
+    python backend_benchmark.py prompts
+"""
+
+import asyncio
+import os
+import random
+import sys
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import httpx
+from fastapi import APIRouter, FastAPI
+
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+
+import backend.server as server  # noqa: E402
+
+
+def legacy_cards_app() -> FastAPI:
+    """The per-request /api/cards implementation prior to the card catalog."""
+    legacy = FastAPI()
+    router = APIRouter(prefix="/api")
+
+    def build(card_data: Dict[str, Any], language: str) -> Dict[str, Any]:
+        if language == "tr":
+            return {
+                "id": card_data["id"],
+                "name": card_data.get("name_tr", card_data["name"]),
+                "image_url": card_data["image_url"],
+                "keywords": card_data.get("keywords_tr", card_data["keywords"]),
+                "meaning_upright": card_data.get("meaning_upright_tr", card_data["meaning_upright"]),
+                "meaning_reversed": card_data.get("meaning_reversed_tr", card_data["meaning_reversed"]),
+                "description": card_data.get("description_tr", card_data["description"]),
+                "symbolism": card_data.get("symbolism_tr", card_data["symbolism"]),
+                "yes_no_meaning": card_data.get("yes_no_meaning_tr", card_data["yes_no_meaning"]),
+            }
+        return {k: card_data[k] for k in ("id", "name", "image_url", "keywords", "meaning_upright",
+                                          "meaning_reversed", "description", "symbolism", "yes_no_meaning")}
+
+    @router.get("/cards", response_model=List[server.TarotCard])
+    async def get_cards(language: str = "en"):
+        return [dict(build(c, language), image_base64=None) for c in server.get_unique_major_arcana()]
+
+    @router.get("/cards/{card_id}", response_model=server.TarotCard)
+    async def get_card(card_id: int, language: str = "en"):
+        for card_data in server.get_unique_major_arcana():
+            if card_data["id"] == card_id:
+                card = build(card_data, language)
+                local_path = server.IMAGES_BY_ID.get(card_id)
+                card["image_base64"] = server.load_image_b64(local_path) if local_path else None
+                return server.TarotCard(**card)
+
+    legacy.include_router(router)
+    return legacy
+
+
+def legacy_build_prompt(reading_type: str, cards: List[Dict], question: Optional[str], language: str, tone: str, length: str) -> str:
+    """The per-call prompt builder prior to compiled prompt templates."""
+    tone_guide_tr = {
+        "gentle": "Üslup: nazik, empatik, yargısız.",
+        "analytical": "Üslup: analitik, kanıtsal, net yapı.",
+        "motivational": "Üslup: motive edici, cesaretlendiren.",
+        "spiritual": "Üslup: sezgisel, ritüel/dingin dil; aşırı determinizmden kaçın.",
+        "direct": "Üslup: doğrudan, kısa ve net; dolandırmadan öner.",
+    }
+    length_guide_tr = {
+        "short": "Yaklaşık 100 kelime (±%20).",
+        "medium": "Yaklaşık 200 kelime (±%20).",
+        "long": "Yaklaşık 350 kelime (±%20).",
+    }
+    lang_line = "Lütfen yanıtı Türkçe yaz." if language == "tr" else "Please respond in English."
+    rt = reading_type
+    if language == "tr":
+        rt = {
+            "card_of_day": "Günün Kartı",
+            "classic_tarot": "Klasik Tarot",
+            "path_of_day": "Günün Yolu",
+            "yes_no": "Evet/Hayır",
+            "couples_tarot": "Çiftler Tarot",
+        }.get(reading_type, reading_type)
+    lines = [f"Okuma türü: {rt}", f"Dil: {'Türkçe' if language == 'tr' else 'English'}"]
+    if question:
+        lines.append(("Soru: " if language == "tr" else "Question: ") + str(question))
+    lines.append("Kartlar:")
+    for idx, item in enumerate(cards, 1):
+        c = item["card"]
+        pos = item.get("position", f"Card {idx}")
+        rev = item.get("reversed", False)
+        meaning = c.get(f"meaning_{'reversed' if rev else 'upright'}", "")
+        name = c.get("name", "")
+        kw = ", ".join(c.get("keywords", [])[:4])
+        if language == "tr":
+            lines.append(f"- {pos}: {name}{' (Ters)' if rev else ''} | Anahtar kelimeler: {kw} | Özet: {meaning}")
+        else:
+            lines.append(f"- {pos}: {name}{' (Reversed)' if rev else ''} | Keywords: {kw} | Summary: {meaning}")
+    if language == "tr":
+        lines.append(tone_guide_tr.get(tone, tone_guide_tr["gentle"]))
+        lines.append(length_guide_tr.get(length, length_guide_tr["medium"]))
+        lines.append("Biçim: 1 cümle 'bugünün teması' + 3 kısa madde (Aşk/İş/Para) + 1 onay cümlesi.")
+        lines.append("Kaçın: kesin kader söylemleri, korku dili. Öner: uygulanabilir, nazik rehberlik.")
+    else:
+        tone_map_en = {
+            "gentle": "Tone: gentle, empathetic, non-judgmental.",
+            "analytical": "Tone: analytical, evidence-based, structured.",
+            "motivational": "Tone: motivational, encouraging.",
+            "spiritual": "Tone: intuitive, calm, avoid determinism.",
+            "direct": "Tone: direct, concise, no beating around the bush.",
+        }
+        length_map_en = {
+            "short": "About 100 words (±20%).",
+            "medium": "About 200 words (±20%).",
+            "long": "About 350 words (±20%).",
+        }
+        lines.append(tone_map_en.get(tone, tone_map_en["gentle"]))
+        lines.append(length_map_en.get(length, length_map_en["medium"]))
+        lines.append("Format: 1-sentence 'theme of the day' + 3 short bullets (Love/Work/Money) + 1 closing sentence.")
+        lines.append("Avoid deterministic/fear language. Provide actionable, kind guidance.")
+    lines.append(lang_line)
+    return "\n".join(lines)
+
+
+def calls_per_second(fn: Callable[..., Any], cases: List[tuple], duration: float = 2.0) -> float:
+    count = 0
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        for case in cases:
+            fn(*case)
+        count += len(cases)
+    return count / duration
+
+
+async def requests_per_second(app: FastAPI, paths: List[str], duration: float = 2.0) -> float:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as http:
+        for path in paths:  # warm caches
+            (await http.get(path)).raise_for_status()
+        count = 0
+        deadline = time.perf_counter() + duration
+        while time.perf_counter() < deadline:
+            await http.get(paths[count % len(paths)])
+            count += 1
+        return count / duration
+
+
+def report(name: str, before: float, after: float, unit: str = "req/s") -> None:
+    print(f"{name:<40} before {before:>10.1f} {unit}   after {after:>10.1f} {unit}   x{after / before:.2f}")
+
+
+async def bench_cards() -> None:
+    legacy = legacy_cards_app()
+    for label, paths in (
+        ("GET /api/cards", ["/api/cards?language=en", "/api/cards?language=tr"]),
+        ("GET /api/cards/{id}", [f"/api/cards/{i}?language=tr" for i in range(22)]),
+    ):
+        before = await requests_per_second(legacy, paths)
+        after = await requests_per_second(server.app, paths)
+        report(label, before, after)
+
+
+async def bench_prompts() -> None:
+    rng = random.Random(0)
+    cases = []
+    for _ in range(200):
+        language = rng.choice(server.SUPPORTED_LANGUAGES)
+        reading_type = rng.choice(["card_of_day", "classic_tarot", "couples_tarot"])
+        cards = server.draw_reading_cards(reading_type, language)
+        question = rng.choice([None, "What should I focus on?"])
+        cases.append((reading_type, cards, question, language, rng.choice(server.TONES), rng.choice(server.LENGTHS)))
+    for case in cases:
+        assert server.build_interpretation_prompt(*case) == legacy_build_prompt(*case)
+    server.prompt_templates.compile()
+    before = calls_per_second(legacy_build_prompt, cases)
+    after = calls_per_second(server.build_interpretation_prompt, cases)
+    report("build_interpretation_prompt", before, after, unit="prompts/s")
+
+
+BENCHMARKS: Dict[str, Callable[[], Awaitable[None]]] = {
+    "cards": bench_cards,
+    "prompts": bench_prompts,
+}
+
+
+def main(argv: List[str]) -> int:
+    selected = argv or list(BENCHMARKS)
+    unknown = [name for name in selected if name not in BENCHMARKS]
+    if unknown:
+        print(f"Unknown benchmark(s): {', '.join(unknown)}; choose from {', '.join(BENCHMARKS)}")
+        return 2
+    for name in selected:
+        asyncio.run(BENCHMARKS[name]())
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
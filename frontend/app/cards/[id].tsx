@@ -129,9 +129,13 @@ export default function CardDetailScreen() {
     }
   }, [id, language]); // language değiştiğinde de yeniden yükle
 
+  // image_url is a versioned path on the backend; image_base64 is only set for ?image=inline
+  const getCardImageUri = (c: TarotCard) =>
+    c.image_base64 || (c.image_url ? `${BACKEND_URL}${c.image_url}` : null);
+
   const fetchCard = async () => {
     try {
-      const response = await fetch(`${BACKEND_URL}/api/cards/${id}?language=${language}&_=${Date.now()}`);
+      const response = await fetch(`${BACKEND_URL}/api/cards/${id}?language=${language}`);
       if (!response.ok) {
         throw new Error('Failed to fetch card');
       }
@@ -139,8 +143,7 @@ export default function CardDetailScreen() {
       console.log('Card detail response', {
         id: cardData?.id,
         name: cardData?.name,
-        hasImage: !!cardData?.image_base64,
-        imagePrefix: cardData?.image_base64 ? cardData.image_base64.slice(0, 30) : null,
+        imageUrl: cardData?.image_url ?? null,
       });
       setImageError(false);
       setCard(cardData);
@@ -230,21 +233,21 @@ export default function CardDetailScreen() {
               }}
             >
               <Animated.View style={[styles.card, frontStyle]}>
-                {card.image_base64 && !imageError ? (
+                {getCardImageUri(card) && !imageError ? (
                   <View style={styles.cardImageWrapper}>
                     <ExpoImage
-                      key={card.image_base64?.slice(0,20) || String(card.id)}
-                      source={{ uri: card.image_base64 }}
+                      key={getCardImageUri(card) || String(card.id)}
+                      source={{ uri: getCardImageUri(card)! }}
                       style={styles.cardImage}
                       contentFit="cover"
                       transition={200}
                       onError={() => setImageError(true)}
                     />
                   </View>
-                ) : card.image_base64 && imageError ? (
+                ) : getCardImageUri(card) && imageError ? (
                   <View style={styles.cardImageWrapper}>
                     <RNImage
-                      source={{ uri: card.image_base64 }}
+                      source={{ uri: getCardImageUri(card)! }}
                       style={styles.cardImage}
                       resizeMode="cover"
                       onError={() => setImageError(true)}
@@ -334,8 +337,8 @@ export default function CardDetailScreen() {
           {/* Debug Panel (geçici) */}
           <View style={styles.debugPanel}>
             <Text style={styles.debugTitle}>Görsel Durumu (geçici tanılama)</Text>
-            <Text style={styles.debugText}>hasImage: {card.image_base64 ? 'evet' : 'hayır'}</Text>
-            <Text style={styles.debugText}>prefix: {card.image_base64 ? card.image_base64.slice(0, 30) + '…' : '-'}</Text>
+            <Text style={styles.debugText}>hasImage: {getCardImageUri(card) ? 'evet' : 'hayır'}</Text>
+            <Text style={styles.debugText}>url: {card.image_url || '-'}</Text>
             <Text style={styles.debugText}>imageError: {imageError ? 'evet' : 'hayır'}</Text>
             <TouchableOpacity
               onPress={() => { setImageError(false); fetchCard(); }}
@@ -76,7 +76,9 @@ export default function CardsListScreen() {
     }
   };
 
-  const getCardImageUrl = (id: number) => `${BACKEND_URL}/api/cards/${id}/image`;
+  // Grid tiles only need a thumbnail; the backend serves a pre-built 160px WebP variant.
+  // image_url carries the ?v= content version, which is what makes the response immutable.
+  const getCardImageUrl = (card: TarotCard) => `${BACKEND_URL}${card.image_url}&w=160&format=webp`;
 
   const fetchCards_real = async () => {
     try {
@@ -113,7 +115,7 @@ export default function CardsListScreen() {
         <View style={styles.headerRow}>
           <View style={styles.thumbWrapper}>
             <ExpoImage
-              source={{ uri: getCardImageUrl(item.id) }}
+              source={{ uri: getCardImageUrl(item) }}
               style={styles.thumb}
               contentFit="cover"
               transition={300}
@@ -1,3 +1,6 @@
+import 'react-native-get-random-values';
+import { v4 as uuid } from "uuid";
+
 type ReadingTelemetryEvent = "reading_begin" | "reading_result" | "ai_toggle" | "tone_change" | "length_change";
 type MonetizationTelemetryEvent =
   | "share_click"
@@ -22,10 +25,17 @@ export type TelemetryEvent = {
   questionPresent?: boolean;   // metni loglama, sadece var/yok
 };
 
+// Uygulama oturumu başına bir kez üretilir; sunucu örneklemeyi ve funnel'ı bu anahtara göre yapar
+const SESSION_ID = uuid();
+
+export function getSessionId() {
+  return SESSION_ID;
+}
+
 export async function logEvent(ev: TelemetryEvent) {
   try {
     const ts = new Date().toISOString();
-    const body = JSON.stringify({ events: [{ ts, ...ev }] });
+    const body = JSON.stringify({ events: [{ ts, sessionId: SESSION_ID, ...ev }] });
     const base = process.env.EXPO_PUBLIC_BACKEND_URL;
     if (!base) return;
     const url = `${base}/api/log`;
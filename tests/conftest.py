@@ -0,0 +1,86 @@
+import os
+
+import pytest
+
+
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+
+
+import backend.server as server  # noqa: E402
+
+
+def _matches(doc, query):
+    for key, cond in query.items():
+        if key == "$or":
+            if not any(_matches(doc, sub) for sub in cond):
+                return False
+        elif isinstance(cond, dict):
+            for op, value in cond.items():
+                if op == "$lt" and not doc.get(key) < value:
+                    return False
+                if op == "$in" and doc.get(key) not in value:
+                    return False
+        elif doc.get(key) != cond:
+            return False
+    return True
+
+
+class FakeCursor:
+    def __init__(self, docs):
+        self._docs = docs
+
+    def sort(self, keys, direction=None):
+        if isinstance(keys, str):
+            keys = [(keys, direction)]
+        for key, order in reversed(keys):
+            self._docs.sort(key=lambda d: d.get(key), reverse=order < 0)
+        return self
+
+    def limit(self, n):
+        self._docs = self._docs[:n]
+        return self
+
+    async def to_list(self, length):
+        return [dict(d) for d in self._docs[:length]]
+
+
+class FakeCollection:
+    def __init__(self):
+        self.docs = []
+        self.insert_many_calls = 0
+
+    async def insert_one(self, doc):
+        self.docs.append(dict(doc))
+
+    def find(self, query=None, projection=None):
+        excluded = {k for k, v in (projection or {}).items() if not v}
+        return FakeCursor([
+            {k: v for k, v in d.items() if k not in excluded}
+            for d in self.docs if _matches(d, query or {})
+        ])
+
+    async def create_indexes(self, indexes):
+        self.indexes = [index.document["name"] for index in indexes]
+        return self.indexes
+
+    async def update_one(self, query, update):
+        for doc in self.docs:
+            if _matches(doc, query):
+                doc.update(update["$set"])
+                return
+
+    async def insert_many(self, docs, ordered=True):
+        self.insert_many_calls += 1
+        self.docs.extend(dict(doc) for doc in docs)
+
+
+class FakeDB:
+    def __init__(self):
+        self.readings = FakeCollection()
+
+
+@pytest.fixture()
+def fake_db(monkeypatch):
+    db = FakeDB()
+    monkeypatch.setattr(server, "db", db)
+    return db
@@ -0,0 +1,782 @@
+import asyncio
+import json
+import random
+import time
+
+import httpx
+import pytest
+
+import backend.server as server
+
+
+AI_TEXT = "The cards speak of patience. Trust the slow turn of the wheel."
+
+
+def _completion_response(text: str = AI_TEXT, usage=None, finish_reason: str = "stop") -> httpx.Response:
+    body = {"choices": [{"message": {"content": text}, "finish_reason": finish_reason}]}
+    if usage:
+        body["usage"] = usage
+    return httpx.Response(200, json=body)
+
+
+def _stream_response(text: str, finish_reason: str = "stop") -> httpx.Response:
+    tokens = [text[i:i + 7] for i in range(0, len(text), 7)]
+    events = [json.dumps({"choices": [{"delta": {"content": t}}]}) for t in tokens]
+    events.append(json.dumps({"choices": [{"delta": {}, "finish_reason": finish_reason}]}))
+    body = "".join(f"data: {e}\n\n" for e in events) + "data: [DONE]\n\n"
+    return httpx.Response(200, content=body.encode("utf-8"), headers={"content-type": "text/event-stream"})
+
+
+@pytest.fixture()
+def ai_upstream(monkeypatch):
+    """Install a mock upstream on the shared client; returns the call log."""
+    state = {"calls": 0, "delay": 0.0, "status": 200, "numbered": False, "text": AI_TEXT,
+             "max_tokens": [], "usage": None, "finish_reason": "stop"}
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        state["calls"] += 1
+        call = state["calls"]
+        if state["delay"]:
+            await asyncio.sleep(state["delay"])
+        if state["status"] != 200:
+            return httpx.Response(state["status"], json={"error": "boom"})
+        text = f"{state['text']} #{call}" if state["numbered"] else state["text"]
+        payload = json.loads(request.content)
+        state["max_tokens"].append(payload["max_tokens"])
+        if payload.get("stream"):
+            return _stream_response(text, state["finish_reason"])
+        usage = state["usage"](payload, text) if state["usage"] else None
+        return _completion_response(text, usage, state["finish_reason"])
+
+    monkeypatch.setenv("EMERGENT_LLM_KEY", "test-key")
+    monkeypatch.setattr(server, "ai_single_flight", server.SingleFlight())
+    monkeypatch.setattr(server, "ai_upstream_guard", server.UpstreamGuard())
+    monkeypatch.setattr(server, "interpretation_race", server.InterpretationRace())
+    monkeypatch.setattr(server, "ai_job_queue", server.AIJobQueue(workers=2))
+    monkeypatch.setattr(server, "token_budget", server.TokenBudget())
+    monkeypatch.setattr(
+        server, "ai_response_cache", server.AIResponseCache(server.MemoryAIResponseStore(1000), ttl_seconds=3600, variants=3)
+    )
+    monkeypatch.setattr(
+        server, "_ai_http_client", httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    )
+    yield state
+    asyncio.run(server.close_ai_http_client())
+
+
+def _cards(reading_type: str = "card_of_day"):
+    card = dict(server.get_unique_major_arcana()[0])
+    return [{"card": card, "position": "Your Day", "reversed": False}]
+
+
+def test_ai_mode_uses_shared_client(ai_upstream):
+    text, mode = asyncio.run(server.generate_interpretation("card_of_day", _cards()))
+    assert mode == "ai"
+    assert text == AI_TEXT
+    assert ai_upstream["calls"] == 1
+
+
+def test_upstream_error_falls_back_to_rule_text(ai_upstream):
+    ai_upstream["status"] = 503
+    text, mode = asyncio.run(server.generate_interpretation("card_of_day", _cards()))
+    assert mode == "fallback"
+    assert text.startswith("Your card for today is")
+
+
+def test_ai_bypass_and_missing_key_use_rule_mode(ai_upstream, monkeypatch):
+    _, mode = asyncio.run(server.generate_interpretation("card_of_day", _cards(), ai_bypass=True))
+    assert mode == "rule"
+    monkeypatch.delenv("EMERGENT_LLM_KEY")
+    _, mode = asyncio.run(server.generate_interpretation("card_of_day", _cards()))
+    assert mode == "rule"
+    assert ai_upstream["calls"] == 0
+
+
+def test_cards_latency_unaffected_by_inflight_ai_readings(ai_upstream, fake_db):
+    """Load test: /api/cards stays fast while slow AI readings are in flight."""
+    ai_upstream["delay"] = 1.0
+
+    async def _run():
+        transport = httpx.ASGITransport(app=server.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+            readings = [
+                asyncio.create_task(http.post("/api/reading/classic_tarot"))
+                for _ in range(20)
+            ]
+            await asyncio.sleep(0.05)
+
+            latencies = []
+            for _ in range(50):
+                start = time.perf_counter()
+                resp = await http.get("/api/cards")
+                latencies.append(time.perf_counter() - start)
+                assert resp.status_code == 200
+            inflight_during_probe = sum(not t.done() for t in readings)
+
+            results = await asyncio.gather(*readings)
+        return latencies, inflight_during_probe, results
+
+    latencies, inflight, results = asyncio.run(_run())
+
+    assert inflight == 20, "AI readings should still be awaiting the upstream"
+    latencies.sort()
+    p95 = latencies[int(len(latencies) * 0.95) - 1]
+    assert p95 < 0.25, f"/api/cards p95 {p95:.3f}s while AI readings in flight"
+    assert all(r.status_code == 200 for r in results)
+    assert {json.loads(r.content)["mode"] for r in results} == {"ai"}
+    assert len(fake_db.readings.docs) == 20
+
+
+def test_ai_cache_fills_variant_pool_then_serves_from_it(ai_upstream):
+    ai_upstream["numbered"] = True
+
+    async def _run():
+        return [await server.generate_interpretation("card_of_day", _cards()) for _ in range(10)]
+
+    results = asyncio.run(_run())
+
+    assert ai_upstream["calls"] == 3
+    assert {mode for _, mode in results} == {"ai"}
+    pool = {f"{AI_TEXT} #{i}" for i in (1, 2, 3)}
+    assert {text for text, _ in results} <= pool
+    assert server.ai_response_cache.stats()["hits"] == 7
+
+
+def test_ai_cache_skips_questions_and_keys_on_normalized_prompt(ai_upstream):
+    async def _run():
+        for _ in range(4):
+            await server.generate_interpretation("card_of_day", _cards(), question="Will it rain?")
+
+    asyncio.run(_run())
+
+    assert ai_upstream["calls"] == 4
+    assert server.ai_response_cache.stats()["stores"] == 0
+    assert server.ai_cache_key("a  b\nc ") == server.ai_cache_key("a b c")
+    assert server.ai_cache_key("a b c") != server.ai_cache_key("a b d")
+
+
+def test_memory_ai_store_expires_and_evicts():
+    store = server.MemoryAIResponseStore(max_entries=2)
+    now = server.datetime(2024, 1, 1)
+    later = now + server.timedelta(hours=2)
+
+    async def _run():
+        await store.add_variant("a", "x", 3, now + server.timedelta(hours=1), now)
+        assert await store.get("a", now) == ["x"]
+        assert await store.get("a", later) == []
+        await store.add_variant("b", "y", 3, later, now)
+        await store.add_variant("c", "z", 3, later, now)
+        await store.get("b", now)
+        return await store.add_variant("d", "w", 3, later, now)
+
+    evicted = asyncio.run(_run())
+
+    assert evicted == 1
+    assert list(store._entries) == ["b", "d"]
+
+
+def test_concurrent_identical_prompts_share_one_upstream_call(ai_upstream):
+    ai_upstream["delay"] = 0.1
+    ai_upstream["numbered"] = True
+
+    async def _run():
+        same = [server.generate_interpretation("card_of_day", _cards(), question="Same?") for _ in range(8)]
+        other = server.generate_interpretation("card_of_day", _cards(), question="Different?")
+        return await asyncio.gather(*same, other)
+
+    results = asyncio.run(_run())
+
+    assert ai_upstream["calls"] == 2
+    assert len({text for text, _ in results[:8]}) == 1
+    assert results[8][0] != results[0][0]
+    assert server.ai_single_flight.stats() == {"inflight": 0, "leaders": 2, "coalesced": 7}
+
+
+def test_coalesced_callers_share_failures_and_survive_leader_cancel(ai_upstream):
+    ai_upstream["delay"] = 0.1
+
+    async def _run():
+        leader = asyncio.ensure_future(server.generate_interpretation("card_of_day", _cards(), question="q"))
+        await asyncio.sleep(0.01)
+        follower = asyncio.ensure_future(server.generate_interpretation("card_of_day", _cards(), question="q"))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        return await follower
+
+    text, mode = asyncio.run(_run())
+    assert (text, mode) == (AI_TEXT, "ai")
+    assert ai_upstream["calls"] == 1
+
+    ai_upstream["status"] = 503
+
+    async def _failing():
+        return await asyncio.gather(*[server.generate_interpretation("card_of_day", _cards(), question="q") for _ in range(3)])
+
+    results = asyncio.run(_failing())
+    assert {mode for _, mode in results} == {"fallback"}
+    assert ai_upstream["calls"] == 2
+
+
+def test_breaker_opens_after_failures_and_half_opens_later(ai_upstream, monkeypatch):
+    guard = server.UpstreamGuard(failure_threshold=3, open_seconds=0.2)
+    monkeypatch.setattr(server, "ai_upstream_guard", guard)
+    ai_upstream["status"] = 503
+
+    for i in range(5):
+        _, mode = asyncio.run(server.generate_interpretation("card_of_day", _cards(), question=f"q{i}"))
+        assert mode == "fallback"
+
+    assert ai_upstream["calls"] == 3, "open breaker must not reach the upstream"
+    assert guard.state == guard.OPEN
+    assert (guard.trips, guard.short_circuited) == (1, 2)
+
+    time.sleep(0.25)
+    ai_upstream["status"] = 200
+    text, mode = asyncio.run(server.generate_interpretation("card_of_day", _cards(), question="probe"))
+    assert (text, mode) == (AI_TEXT, "ai")
+    assert guard.state == guard.CLOSED
+
+
+def test_failed_half_open_probe_reopens_breaker():
+    guard = server.UpstreamGuard(failure_threshold=1, open_seconds=0.0)
+    guard.record(False)
+    assert guard.state == guard.OPEN
+
+    assert guard.allow() is True
+    assert guard.state == guard.HALF_OPEN
+    assert guard.allow() is False, "only one probe while half-open"
+    guard.record(False)
+    assert guard.state == guard.OPEN
+    assert guard.trips == 2
+
+
+def test_cancelled_half_open_probe_is_released(ai_upstream, fake_db, monkeypatch):
+    guard = server.UpstreamGuard(failure_threshold=1, open_seconds=0.0)
+    guard.record(False)
+    monkeypatch.setattr(server, "ai_upstream_guard", guard)
+    ai_upstream["delay"] = 1.0
+
+    async def _cancel_call():
+        task = asyncio.ensure_future(guard.call(lambda: asyncio.sleep(1.0)))
+        await asyncio.sleep(0.02)
+        assert guard._probe_inflight
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+    asyncio.run(_cancel_call())
+    assert (guard.state, guard._probe_inflight) == (guard.HALF_OPEN, False)
+
+    async def _cancel_stream():
+        response = await server.create_reading_stream("card_of_day")
+        body = response.body_iterator
+        await body.__anext__()  # cards event; the probe now waits for its first token
+        task = asyncio.ensure_future(body.__anext__())
+        await asyncio.sleep(0.05)
+        assert guard._probe_inflight
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        await body.aclose()
+
+    asyncio.run(_cancel_stream())
+    assert (guard.state, guard._probe_inflight) == (guard.HALF_OPEN, False)
+    assert guard.allow() is True
+
+
+def test_slow_successes_count_as_failures():
+    guard = server.UpstreamGuard(failure_threshold=2, slow_call_seconds=1.0)
+    guard.record(True, 1.5)
+    guard.record(True, 2.0)
+    assert guard.state == guard.OPEN
+    assert guard.slow_calls == 2
+
+
+def test_concurrency_limit_rejects_when_saturated(ai_upstream, monkeypatch):
+    guard = server.UpstreamGuard(max_concurrency=2, queue_timeout=0.05)
+    monkeypatch.setattr(server, "ai_upstream_guard", guard)
+    ai_upstream["delay"] = 0.2
+
+    async def _run():
+        return await asyncio.gather(*[
+            server.generate_interpretation("card_of_day", _cards(), question=f"q{i}") for i in range(4)
+        ])
+
+    results = asyncio.run(_run())
+
+    assert sorted(mode for _, mode in results) == ["ai", "ai", "fallback", "fallback"]
+    assert ai_upstream["calls"] == 2
+    assert guard.rejected == 2
+    assert guard.state == guard.CLOSED, "rejections are not upstream failures"
+
+
+def test_timeout_adapts_to_observed_p95(ai_upstream, monkeypatch):
+    guard = server.UpstreamGuard(min_timeout=0.05, max_timeout=5.0, min_samples=5, timeout_multiplier=2.0)
+    assert guard.timeout() == 5.0
+    for _ in range(20):
+        guard.record(True, 0.04)
+    assert guard.timeout() == pytest.approx(0.08)
+
+    monkeypatch.setattr(server, "ai_upstream_guard", guard)
+    ai_upstream["delay"] = 0.5
+    start = time.perf_counter()
+    _, mode = asyncio.run(server.generate_interpretation("card_of_day", _cards(), question="slow"))
+
+    assert mode == "fallback"
+    assert time.perf_counter() - start < 0.4
+    assert guard.timeouts == 1
+
+
+def test_stream_falls_back_instantly_while_breaker_open(ai_upstream, fake_db, monkeypatch):
+    guard = server.UpstreamGuard(failure_threshold=1, open_seconds=60)
+    guard.record(False)
+    monkeypatch.setattr(server, "ai_upstream_guard", guard)
+
+    async def _run():
+        response = await server.create_reading_stream("card_of_day")
+        return await _read_stream(response)
+
+    events = _sse_events(asyncio.run(_run())[0])
+
+    assert events[-1][1]["mode"] == "fallback"
+    assert ai_upstream["calls"] == 0
+    assert guard.short_circuited == 1
+
+
+def test_deadline_serves_rule_text_and_stores_late_ai(ai_upstream, fake_db):
+    ai_upstream["delay"] = 0.3
+
+    async def _run():
+        start = time.perf_counter()
+        reading = await server.create_reading("card_of_day", deadline=0.05)
+        elapsed = time.perf_counter() - start
+        stored_before = fake_db.readings.docs[0]["mode"]
+        await server.interpretation_race.drain(2.0)
+        return reading, elapsed, stored_before
+
+    reading, elapsed, stored_before = asyncio.run(_run())
+
+    assert elapsed < 0.2
+    assert reading.mode == "fallback"
+    assert reading.interpretation == server.rule_interpretation("card_of_day", reading.cards, "en", "medium")
+    assert stored_before == "fallback"
+    assert (fake_db.readings.docs[0]["interpretation"], fake_db.readings.docs[0]["mode"]) == (AI_TEXT, "ai")
+    assert server.interpretation_race.stats() == {
+        "races": 1, "ai_in_time": 0, "deadline_misses": 1, "late_ai": 1, "late_stored": 1, "pending_late": 0,
+    }
+
+
+def test_shutdown_waits_for_late_ai_before_closing_client(ai_upstream, fake_db, monkeypatch):
+    ai_upstream["delay"] = 0.3
+    close = server.close_ai_http_client
+    at_close = {}
+
+    async def recording_close():
+        at_close.setdefault("mode", fake_db.readings.docs[0]["mode"] if fake_db.readings.docs else None)
+        await close()
+
+    monkeypatch.setattr(server, "close_ai_http_client", recording_close)
+
+    async def _run():
+        reading = await server.create_reading("card_of_day", deadline=0.05)
+        for handler in server.app.router.on_shutdown:
+            await handler()
+        return reading
+
+    reading = asyncio.run(_run())
+
+    assert reading.mode == "fallback"
+    assert at_close["mode"] == "ai", "the late result is stored before the HTTP client closes"
+    assert server.ai_upstream_guard.failures == 0
+    assert server._ai_http_client is None
+
+
+def test_drain_cancels_late_calls_past_the_timeout(ai_upstream, fake_db):
+    ai_upstream["delay"] = 5.0
+
+    async def _run():
+        await server.create_reading("card_of_day", deadline=0.05)
+        start = time.perf_counter()
+        await server.interpretation_race.drain(0.05)
+        return time.perf_counter() - start, server.interpretation_race.pending_late
+
+    elapsed, pending = asyncio.run(_run())
+    assert elapsed < 1.0
+    assert pending == 0
+    assert fake_db.readings.docs[0]["mode"] == "fallback"
+
+
+def test_deadline_returns_ai_text_when_in_time(ai_upstream, fake_db):
+    reading = asyncio.run(server.create_reading("card_of_day", deadline=2.0))
+
+    assert (reading.interpretation, reading.mode) == (AI_TEXT, "ai")
+    assert server.interpretation_race.ai_in_time == 1
+
+
+def test_deadline_defaults_and_late_storage_can_be_disabled(ai_upstream, fake_db, monkeypatch):
+    race = server.InterpretationRace(default_deadline=0.05, max_deadline=1.0, store_late=False)
+    monkeypatch.setattr(server, "interpretation_race", race)
+    assert race.resolve_deadline(None) == 0.05
+    assert race.resolve_deadline(90) == 1.0
+    assert race.resolve_deadline(0) is None
+    ai_upstream["delay"] = 0.2
+
+    async def _run():
+        reading = await server.create_reading("card_of_day")
+        await race.drain(2.0)
+        return reading
+
+    reading = asyncio.run(_run())
+
+    assert reading.mode == "fallback"
+    assert fake_db.readings.docs[0]["mode"] == "fallback"
+    assert (race.late_ai, race.late_stored) == (1, 0)
+    assert ai_upstream["calls"] == 1
+
+
+def test_job_mode_returns_pending_then_long_polls_result(ai_upstream, fake_db):
+    ai_upstream["delay"] = 0.2
+
+    async def _run():
+        start = time.perf_counter()
+        reading = await server.create_reading("classic_tarot", job=True, length="long")
+        elapsed = time.perf_counter() - start
+        stored = dict(fake_db.readings.docs[0])
+        polled = await server.get_reading_job(reading.id)
+        done = await server.get_reading_job(reading.id, wait=2.0)
+        await server.ai_job_queue.stop()
+        return reading, elapsed, stored, polled, done
+
+    reading, elapsed, stored, polled, done = asyncio.run(_run())
+
+    assert elapsed < 0.1
+    assert (reading.mode, reading.interpretation, len(reading.cards)) == ("pending", "", 3)
+    assert stored["mode"] == "pending"
+    assert polled.status == "pending"
+    assert (done.status, done.reading.mode, done.reading.interpretation) == ("done", "ai", AI_TEXT)
+    assert (fake_db.readings.docs[0]["mode"], fake_db.readings.docs[0]["interpretation"]) == ("ai", AI_TEXT)
+
+
+def test_ai_readings_record_the_prompt_version(ai_upstream, fake_db, monkeypatch):
+    versions = {v: {lang: dict(spec) for lang, spec in langs.items()} for v, langs in server.PROMPT_TEMPLATES.items()}
+    versions["v2"] = {lang: {**spec, "respond": "Respond in two sentences."} for lang, spec in versions["v1"].items()}
+    monkeypatch.setattr(server, "prompt_templates", server.PromptTemplates(versions, "v2"))
+    prompts = []
+    monkeypatch.setattr(server, "fetch_ai_completion", _recording(server.fetch_ai_completion, prompts))
+
+    async def _run():
+        inline = await server.create_reading("card_of_day", deadline=2.0)
+        ai_upstream["delay"] = 0.2
+        late = await server.create_reading("yes_no", deadline=0.05)
+        job = await server.create_reading("classic_tarot", job=True)
+        await server.get_reading_job(job.id, wait=2.0)
+        await server.interpretation_race.drain(2.0)
+        await server.ai_job_queue.stop()
+        rule = await server.create_reading("card_of_day", ai="off")
+        events = _sse_events((await _read_stream(await server.create_reading_stream("classic_tarot")))[0])
+        return inline, late, job, rule, events[-1][1]
+
+    inline, late, job, rule, streamed = asyncio.run(_run())
+
+    assert (inline.mode, inline.prompt_version) == ("ai", "v2")
+    assert (late.mode, late.prompt_version) == ("fallback", None)
+    assert rule.prompt_version is None
+    stored = {doc["id"]: doc for doc in fake_db.readings.docs}
+    assert streamed["prompt_version"] == "v2"
+    for reading_id in (inline.id, late.id, job.id, streamed["id"]):
+        assert (stored[reading_id]["mode"], stored[reading_id]["prompt_version"]) == ("ai", "v2")
+    assert "prompt_version" not in stored[rule.id]
+    assert server.rehydrate_reading(stored[job.id]).prompt_version == "v2"
+    assert prompts and all("Respond in two sentences." in p for p in prompts)
+
+
+def _recording(fetch, prompts):
+    async def recording(ai_key, prompt, *args, **kwargs):
+        prompts.append(prompt)
+        return await fetch(ai_key, prompt, *args, **kwargs)
+    return recording
+
+
+def test_job_workers_bound_upstream_concurrency(ai_upstream, fake_db, monkeypatch):
+    queue = server.AIJobQueue(workers=2, max_queue=3)
+    monkeypatch.setattr(server, "ai_job_queue", queue)
+    ai_upstream["delay"] = 0.1
+    peak = {"now": 0, "max": 0}
+    fetch = server.fetch_ai_completion
+
+    async def counting_fetch(ai_key, prompt, sizing=None):
+        peak["now"] += 1
+        peak["max"] = max(peak["max"], peak["now"])
+        try:
+            return await fetch(ai_key, prompt, sizing)
+        finally:
+            peak["now"] -= 1
+
+    monkeypatch.setattr(server, "fetch_ai_completion", counting_fetch)
+
+    async def _run():
+        readings = [await server.create_reading("card_of_day", question=f"q{i}", job=True) for i in range(6)]
+        await asyncio.sleep(0.5)
+        await queue.stop()
+        return readings
+
+    readings = asyncio.run(_run())
+
+    assert peak["max"] == 2
+    assert [r.mode for r in readings].count("fallback") == queue.rejected > 0
+    assert {d["mode"] for d in fake_db.readings.docs} == {"ai", "fallback"}
+
+
+def test_job_stop_finishes_queued_jobs_with_rule_text(ai_upstream, fake_db, monkeypatch):
+    queue = server.AIJobQueue(workers=1)
+    monkeypatch.setattr(server, "ai_job_queue", queue)
+    ai_upstream["delay"] = 1.0
+
+    async def _run():
+        for i in range(3):
+            await server.create_reading("card_of_day", question=f"q{i}", job=True)
+        await asyncio.sleep(0.05)
+        await queue.stop()
+
+    asyncio.run(_run())
+
+    assert {d["mode"] for d in fake_db.readings.docs} == {"fallback"}
+    assert queue.abandoned == 3
+
+
+def test_job_status_falls_back_to_stored_reading(ai_upstream, fake_db):
+    reading = asyncio.run(server.create_reading("card_of_day", ai="off", job=True))
+    assert reading.mode == "rule", "job mode only applies to AI readings"
+
+    status = asyncio.run(server.get_reading_job(reading.id))
+    assert (status.status, status.reading.interpretation) == ("done", reading.interpretation)
+
+    with pytest.raises(server.HTTPException) as err:
+        asyncio.run(server.get_reading_job("missing"))
+    assert err.value.status_code == 404
+
+
+def test_max_tokens_follows_length_and_language(ai_upstream, fake_db):
+    async def _run():
+        for language in ("en", "tr"):
+            for length in ("short", "medium", "long"):
+                await server.generate_interpretation("card_of_day", _cards(), question=f"{language}-{length}",
+                                                     language=language, length=length)
+        response = await server.create_reading_stream("card_of_day", length="short")
+        await _read_stream(response)
+
+    asyncio.run(_run())
+
+    en_short, en_medium, en_long, tr_short, tr_medium, tr_long, stream_short = ai_upstream["max_tokens"]
+    assert en_short < en_medium < en_long <= 600
+    assert tr_short > en_short
+    assert en_short < 250, "short readings must not request the full ceiling"
+    assert tr_long == 600
+    assert stream_short == en_short
+
+
+def test_token_budget_tunes_from_reported_usage(ai_upstream):
+    ai_upstream["text"] = AI_TEXT + " Then the"
+    words = len(ai_upstream["text"].split())
+    ai_upstream["usage"] = lambda payload, text: {"completion_tokens": 3 * words, "prompt_tokens": 500}
+    ai_upstream["finish_reason"] = "length"
+    budget = server.token_budget
+    initial = budget.budget("en", "gentle", "short")
+
+    async def _run():
+        return [
+            await server.generate_interpretation("card_of_day", _cards(), question=f"q{i}", length="short")
+            for i in range(10)
+        ]
+
+    results = asyncio.run(_run())
+
+    assert set(results) == {(AI_TEXT, "ai")}, "truncated text is cut back to its last full sentence"
+    assert budget.samples[("en", "gentle", "short")] == 10
+    assert 1.35 < budget.tokens_per_word("en", "gentle", "short") < 3.0
+    assert budget.budget("en", "gentle", "short") > initial
+    assert budget.tokens_per_word("en", "gentle", "long") == 1.35, "other combinations are untouched"
+    assert ai_upstream["max_tokens"][-1] > ai_upstream["max_tokens"][0]
+    assert (budget.completion_tokens, budget.prompt_tokens, budget.truncated) == (30 * words, 5000, 10)
+    prompt = server.build_interpretation_prompt("card_of_day", _cards(), "q", "en", "gentle", "short")
+    assert budget.estimate_prompt_tokens(prompt, "en") > server.estimate_tokens(prompt)
+
+
+def test_truncated_completions_are_trimmed_and_not_cached(ai_upstream, fake_db):
+    ai_upstream["text"] = AI_TEXT + "\n- Love: open your heart to the"
+    ai_upstream["finish_reason"] = "length"
+
+    async def _run():
+        text, mode = await server.generate_interpretation("card_of_day", _cards(), length="short")
+        response = await server.create_reading_stream("card_of_day", length="short")
+        events = _sse_events((await _read_stream(response))[0])
+        return text, mode, events[-1][1]
+
+    text, mode, done = asyncio.run(_run())
+
+    assert (text, mode) == (AI_TEXT, "ai")
+    assert done["interpretation"] == AI_TEXT
+    assert server.ai_response_cache.store._entries == {}
+
+    ai_upstream["text"] = "No sentence ends before the"
+    _, mode = asyncio.run(server.generate_interpretation("card_of_day", _cards(), question="cut"))
+    assert mode == "fallback"
+    assert server.trim_to_sentence("One. Two!” three") == "One. Two!”"
+
+
+def test_estimate_tokens_and_context_room():
+    # 12 words and 2 punctuation marks
+    assert server.estimate_tokens("The cards speak of patience. Trust the slow turn of the wheel.") == 14
+    assert server.estimate_tokens("") == 0
+    assert server.estimate_tokens("internationalization") == 3
+    budget = server.TokenBudget(ceiling=600, context_tokens=100)
+    assert budget.max_tokens("word " * 90, "en", "gentle", "long") == 10
+
+
+def _sse_events(chunks):
+    events = []
+    for chunk in b"".join(chunks).decode("utf-8").split("\n\n"):
+        if chunk:
+            name, data = chunk.split("\n", 1)
+            events.append((name[len("event: "):], json.loads(data[len("data: "):])))
+    return events
+
+
+async def _read_stream(response):
+    chunks, first_at = [], None
+    start = time.perf_counter()
+    async for chunk in response.body_iterator:
+        if first_at is None:
+            first_at = time.perf_counter() - start
+        chunks.append(chunk)
+    return chunks, first_at
+
+
+def test_stream_sends_cards_first_then_tokens_and_persists(ai_upstream, fake_db):
+    ai_upstream["delay"] = 0.2
+
+    async def _run():
+        response = await server.create_reading_stream("classic_tarot")
+        return await _read_stream(response)
+
+    chunks, first_at = asyncio.run(_run())
+    events = _sse_events(chunks)
+
+    assert first_at < 0.1, "cards event must not wait for the upstream"
+    assert events[0][0] == "cards"
+    assert len(events[0][1]["cards"]) == 3
+    assert {name for name, _ in events[1:-1]} == {"token"}
+    assert "".join(data["text"] for _, data in events[1:-1]) == AI_TEXT
+    name, done = events[-1]
+    assert name == "done"
+    assert (done["id"], done["interpretation"], done["mode"]) == (events[0][1]["id"], AI_TEXT, "ai")
+    assert fake_db.readings.docs[0]["id"] == done["id"]
+    assert fake_db.readings.docs[0]["interpretation"] == AI_TEXT
+
+
+def test_stream_applies_length_limit_incrementally(ai_upstream, fake_db):
+    ai_upstream["text"] = " ".join(f"Sentence number {i} has exactly seven words." for i in range(80))
+
+    async def _run():
+        response = await server.create_reading_stream("card_of_day", length="short")
+        return await _read_stream(response)
+
+    events = _sse_events(asyncio.run(_run())[0])
+    streamed = "".join(data["text"] for name, data in events if name == "token")
+
+    assert len(streamed.split()) == 120
+    assert events[-1][1]["interpretation"] == server.postprocess_length(ai_upstream["text"], "short")
+
+
+def test_stream_falls_back_to_rule_text(ai_upstream, fake_db):
+    ai_upstream["status"] = 503
+
+    async def _run():
+        response = await server.create_reading_stream("card_of_day", ai="on")
+        return await _read_stream(response)
+
+    events = _sse_events(asyncio.run(_run())[0])
+
+    assert [name for name, _ in events] == ["cards", "token", "done"]
+    assert events[-1][1]["mode"] == "fallback"
+    assert events[1][1]["text"] == events[-1][1]["interpretation"]
+
+
+def test_stream_persists_reading_when_client_leaves(ai_upstream, fake_db):
+    ai_upstream["delay"] = 1.0
+
+    async def _cancel_while_waiting():
+        response = await server.create_reading_stream("card_of_day")
+        body = response.body_iterator
+        cards = json.loads((await body.__anext__()).decode("utf-8").split("data: ", 1)[1])
+        task = asyncio.ensure_future(body.__anext__())
+        await asyncio.sleep(0.05)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        return cards
+
+    cards = asyncio.run(_cancel_while_waiting())
+
+    [doc] = fake_db.readings.docs
+    assert doc["id"] == cards["id"]
+    assert doc["mode"] == "fallback"
+    assert doc["interpretation"] == server.rule_interpretation("card_of_day", cards["cards"], "en", "medium")
+
+    ai_upstream["delay"] = 0.0
+
+    async def _close_after_first_sentence():
+        response = await server.create_reading_stream("card_of_day")
+        body = response.body_iterator
+        received = ""
+        async for chunk in body:
+            received += chunk.decode("utf-8")
+            if received.count("event: token") == 6:  # past "...of patience."
+                break
+        await body.aclose()
+
+    asyncio.run(_close_after_first_sentence())
+
+    assert (fake_db.readings.docs[1]["interpretation"], fake_db.readings.docs[1]["mode"]) == \
+        ("The cards speak of patience.", "ai")
+
+
+def test_shutdown_waits_for_stream_persists(ai_upstream, fake_db, monkeypatch):
+    ai_upstream["delay"] = 1.0
+    insert = fake_db.readings.insert_one
+
+    async def slow_insert(doc):
+        await asyncio.sleep(0.2)
+        await insert(doc)
+
+    monkeypatch.setattr(fake_db.readings, "insert_one", slow_insert)
+
+    async def _run():
+        response = await server.create_reading_stream("card_of_day")
+        body = response.body_iterator
+        await body.__anext__()
+        task = asyncio.ensure_future(body.__anext__())
+        await asyncio.sleep(0.02)
+        task.cancel()
+        await asyncio.sleep(0.02)
+        task.cancel()  # cancel scopes re-deliver cancellation to the persist wait
+        await asyncio.gather(task, return_exceptions=True)
+        pending = len(server._stream_persists)
+        await server.shutdown_db_client()
+        return pending
+
+    assert asyncio.run(_run()) == 1
+    assert len(fake_db.readings.docs) == 1
+    assert not server._stream_persists
+
+
+@pytest.mark.parametrize("length", ["short", "medium", "long"])
+def test_stream_length_limiter_matches_postprocess(length):
+    rng = random.Random(length)
+    words = ["alpha", "beta.", "gamma,", "delta\n", "epsilon.", "zeta"]
+    for _ in range(50):
+        text = " ".join(rng.choice(words) for _ in range(rng.randint(1, 500)))
+        limiter = server.StreamLengthLimiter(length)
+        pos = 0
+        while pos < len(text) and not limiter.exhausted:
+            step = rng.randint(1, 12)
+            limiter.feed(text[pos:pos + step])
+            pos += step
+        assert limiter.final_text() == server.postprocess_length(text.strip(), length)
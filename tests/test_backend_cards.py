@@ -0,0 +1,142 @@
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+import backend.server as server
+
+
+@pytest.fixture()
+def http():
+    return TestClient(server.app)
+
+
+def test_cards_list_is_served_from_catalog_bytes(http):
+    resp = http.get("/api/cards?language=en")
+    assert resp.status_code == 200
+    assert resp.content == server.get_card_catalog("en").list_json
+    cards = resp.json()
+    assert [c["id"] for c in cards] == list(range(22))
+    assert all(c["image_base64"] is None for c in cards)
+
+
+def test_unknown_language_shares_english_catalog():
+    assert server.get_card_catalog("de") is server.get_card_catalog("en")
+
+
+def test_turkish_fields_fall_back_per_field():
+    card = {"id": 99, "name": "X", "name_tr": "İks", "image_url": "", "keywords": ["a"],
+            "meaning_upright": "up", "meaning_reversed": "down", "description": "d",
+            "symbolism": "s", "yes_no_meaning": "yes", "keywords_tr": ["b"]}
+    tr = server.localize_card(card, "tr")
+    assert tr["name"] == "İks"
+    assert tr["keywords"] == ["b"]
+    assert tr["meaning_upright"] == "up"
+    assert list(tr) == [f for f in server.TarotCard.model_fields if f != "image_base64"]
+
+
+def test_card_detail_and_missing_card(http):
+    resp = http.get("/api/cards/3?language=tr")
+    assert resp.status_code == 200
+    body = json.loads(resp.content)
+    assert body["id"] == 3
+    assert body["image_base64"] is None
+    assert body["image_url"].startswith("/api/cards/3/image?v=")
+    assert len(resp.content) < 4096
+    assert http.get("/api/cards/99").status_code == 404
+    assert http.get("/api/cards/99?image=inline").status_code == 404
+
+
+def test_card_image_url_resolves_to_image(http):
+    image_url = http.get("/api/cards/3").json()["image_url"]
+    resp = http.get(image_url)
+    assert resp.status_code == 200
+    assert resp.headers["content-type"] == "image/jpeg"
+
+
+def test_inline_image_mode_is_opt_in_and_cached(http):
+    resp = http.get("/api/cards/3?image=inline")
+    assert resp.status_code == 200
+    assert resp.json()["image_base64"].startswith("data:image/jpeg;base64,")
+    assert resp.headers["etag"] != http.get("/api/cards/3").headers["etag"]
+    catalog = server.get_card_catalog("en")
+    assert catalog.inline_card_json(3)[0] is catalog.inline_card_json(3)[0]
+    assert http.get("/api/cards/3?image=base64").status_code == 422
+
+
+def test_deck_index_lookups_cover_additional_decks():
+    minor = [{"id": 22 + i, "name": f"{i + 1} of Cups", "name_tr": f"Kupa {i + 1}"} for i in range(56)]
+    index = server.DeckIndex(server.DECKS + [minor, server.MAJOR_ARCANA], server.READING_TYPES)
+    assert len(index.cards) == 78
+    assert index.card(0)["name"] == "The Fool"
+    assert index.card(77)["name"] == "56 of Cups"
+    assert index.card_id_for_name("  the fool ") == 0
+    assert index.card_id_for_name("Kupa 3") == 24
+    assert index.card_id_for_name("nope") is None
+    assert index.reading_type("yes_no")["card_count"] == 1
+    assert index.reading_type("nope") is None
+
+
+def test_unknown_reading_type_is_404(http):
+    assert http.post("/api/reading/nope").status_code == 404
+
+
+@pytest.mark.parametrize("path", ["/api/cards?language=tr", "/api/cards/5", "/api/cards/5/image"])
+def test_conditional_get_returns_304(http, path):
+    first = http.get(path)
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+    assert first.headers["last-modified"]
+    assert "max-age" in first.headers["cache-control"]
+
+    again = http.get(path, headers={"If-None-Match": f'W/"other", {etag}'})
+    assert again.status_code == 304
+    assert again.content == b""
+    assert again.headers["etag"] == etag
+
+    changed = http.get(path, headers={"If-None-Match": '"stale"'})
+    assert changed.status_code == 200
+    assert changed.content == first.content
+
+
+def test_if_modified_since_and_immutable_images(http):
+    first = http.get("/api/cards/0/image")
+    assert "immutable" not in first.headers["cache-control"]
+    versioned = server.card_image_url(0)
+    assert "immutable" in http.get(versioned).headers["cache-control"]
+    assert "immutable" in http.get(f"{versioned}&w=160&format=webp").headers["cache-control"]
+    assert "immutable" not in http.get("/api/cards/0/image?v=stale").headers["cache-control"]
+    resp = http.get("/api/cards/0/image", headers={"If-Modified-Since": first.headers["last-modified"]})
+    assert resp.status_code == 304
+    resp = http.get("/api/cards/0/image", headers={"If-Modified-Since": "Thu, 01 Jan 1970 00:00:00 GMT"})
+    assert resp.status_code == 200
+
+
+def test_image_store_serves_without_filesystem_access(http, monkeypatch):
+    store = server.get_image_store()
+    assert set(store.entries) == set(server.IMAGES_BY_ID)
+
+    def _no_io(*args, **kwargs):
+        raise AssertionError("filesystem access while serving an image")
+
+    monkeypatch.setattr("builtins.open", _no_io)
+    monkeypatch.setattr(server.Path, "stat", _no_io)
+    resp = http.get("/api/cards/7/image")
+    assert resp.status_code == 200
+    assert resp.headers["content-type"] == "image/jpeg"
+    assert resp.headers["etag"] == store.entries[7].etag
+
+
+def test_image_store_evicts_least_recently_used():
+    sizes = {cid: (server.ROOT_DIR / path).stat().st_size for cid, path in server.IMAGES_BY_ID.items()}
+    store = server.ImageStore(server.ROOT_DIR, max_bytes=sizes[0] + sizes[1] + sizes[2] - 1)
+    for cid in (0, 1, 2):
+        store.add(cid, server.IMAGES_BY_ID[cid])
+    assert store.resident_bytes <= store.max_bytes
+    assert store.evictions == 1
+
+    entry, data = store.get(0)  # evicted, reread from disk
+    assert store.misses == 1
+    assert len(data) == entry.size
+    store.get(0)
+    assert store.hits == 1
@@ -0,0 +1,127 @@
+import io
+import shutil
+
+import pytest
+from fastapi.testclient import TestClient
+
+import backend.server as server
+
+
+PILImage = pytest.importorskip("PIL.Image")
+
+
+@pytest.fixture()
+def variant_store(tmp_path, monkeypatch):
+    """Image store over a copy of two card images, with variants built into tmp_path."""
+    images = {cid: server.IMAGES_BY_ID[cid] for cid in (0, 1)}
+    for rel_path in images.values():
+        (tmp_path / rel_path).parent.mkdir(parents=True, exist_ok=True)
+        shutil.copy(server.ROOT_DIR / rel_path, tmp_path / rel_path)
+    monkeypatch.setattr(server, "IMAGES_BY_ID", images)
+    store = server.ImageStore(tmp_path, max_bytes=64 * 1024 * 1024)
+    for cid, rel_path in images.items():
+        store.add(cid, rel_path)
+    server.build_image_variants(store)
+    monkeypatch.setattr(server, "_image_store", store)
+    return store
+
+
+def test_variants_are_built_once_and_reused(variant_store, tmp_path):
+    files = sorted((tmp_path / server.IMAGE_VARIANT_DIR).iterdir())
+    # every width in every format, plus a full-width webp of each jpeg original
+    assert len(files) == 2 * (len(server.IMAGE_VARIANT_WIDTHS) * len(server.IMAGE_VARIANT_FORMATS) + 1)
+    mtimes = [f.stat().st_mtime_ns for f in files]
+    registered = sum(1 for key in variant_store.entries if isinstance(key, tuple))
+
+    assert server.build_image_variants(variant_store) == registered
+    assert [f.stat().st_mtime_ns for f in files] == mtimes
+
+
+def test_width_and_format_selection(variant_store):
+    http = TestClient(server.app)
+    original = http.get("/api/cards/0/image")
+    small = http.get("/api/cards/0/image?w=200&format=webp")
+    assert small.status_code == 200
+    assert small.headers["content-type"] == "image/webp"
+    assert len(small.content) < len(original.content) / 3
+    assert variant_store.entries[(0, 320, "webp")].etag == small.headers["etag"]
+
+    jpeg = http.get("/api/cards/0/image?w=100&format=jpeg")
+    assert jpeg.headers["content-type"] == "image/jpeg"
+    assert jpeg.headers["etag"] == variant_store.entries[(0, 160, "jpeg")].etag
+
+    too_wide = http.get("/api/cards/0/image?w=5000&format=jpeg")
+    assert too_wide.content == original.content
+
+
+def test_format_without_width_keeps_full_size(variant_store):
+    http = TestClient(server.app)
+    original_bytes = http.get("/api/cards/0/image").content
+    original = PILImage.open(io.BytesIO(original_bytes))
+    for url, headers in (("/api/cards/0/image?format=webp", {}),
+                         ("/api/cards/0/image?format=auto", {"Accept": "image/webp"})):
+        response = http.get(url, headers=headers)
+        assert response.headers["content-type"] == "image/webp"
+        assert response.headers["etag"] == variant_store.entries[(0, None, "webp")].etag
+        assert PILImage.open(io.BytesIO(response.content)).size == original.size
+        assert len(response.content) < len(original_bytes)
+
+    jpeg = http.get("/api/cards/0/image?format=jpeg")
+    assert jpeg.headers["etag"] == variant_store.entries[0].etag
+
+
+def test_variants_larger_than_the_wider_option_are_not_served(tmp_path, monkeypatch):
+    rel_path = server.IMAGES_BY_ID[0]
+    (tmp_path / rel_path).parent.mkdir(parents=True, exist_ok=True)
+    shutil.copy(server.ROOT_DIR / rel_path, tmp_path / rel_path)
+    monkeypatch.setattr(server, "IMAGES_BY_ID", {0: rel_path})
+    encode = server._encode_variant
+
+    def bloated(source, width, pil_format):
+        data = encode(source, width, pil_format)
+        return data + b"\0" * 10_000_000 if width in (320, source.width) else data
+
+    monkeypatch.setattr(server, "_encode_variant", bloated)
+    store = server.ImageStore(tmp_path, max_bytes=64 * 1024 * 1024)
+    store.add(0, rel_path)
+    server.build_image_variants(store)
+
+    assert (0, 320, "jpeg") not in store.entries and (0, None, "webp") not in store.entries
+    assert (0, 160, "jpeg") in store.entries and (0, 640, "webp") in store.entries
+    assert server.select_image_variant(store, 0, 200, "jpeg") == (0, 640, "jpeg")
+    assert server.select_image_variant(store, 0, None, "webp") == 0
+    for key, entry in store.entries.items():
+        if isinstance(key, tuple):
+            wider = [e.size for k, e in store.entries.items() if isinstance(k, tuple) and k[2] == key[2]
+                     and k[1] is not None and key[1] is not None and k[1] > key[1]]
+            assert entry.size < min(wider + [store.entries[0].size])
+
+
+def test_accept_negotiation_sets_vary(variant_store):
+    http = TestClient(server.app)
+    webp = http.get("/api/cards/1/image?w=160", headers={"Accept": "image/webp,image/*"})
+    assert webp.headers["content-type"] == "image/webp"
+    assert webp.headers["vary"] == "Accept"
+    jpeg = http.get("/api/cards/1/image?w=160", headers={"Accept": "image/*"})
+    assert jpeg.headers["content-type"] == "image/jpeg"
+    revalidated = http.get("/api/cards/1/image?w=160", headers={"Accept": "image/*", "If-None-Match": jpeg.headers["etag"]})
+    assert revalidated.status_code == 304
+
+
+def test_thumbnail_sprite_manifest_and_sheet(variant_store, monkeypatch):
+    monkeypatch.setattr(server, "_thumbnail_sprite", None)
+    http = TestClient(server.app)
+    manifest = http.get("/api/thumbnails")
+    assert manifest.status_code == 200
+    body = manifest.json()
+    assert [c["id"] for c in body["cards"]] == [0, 1]
+    assert body["cards"][1]["x"] == server.IMAGE_VARIANT_WIDTHS[0]
+    assert http.get("/api/thumbnails", headers={"If-None-Match": manifest.headers["etag"]}).status_code == 304
+
+    sheet = http.get(body["sprite_url"], headers={"Accept": "image/webp"})
+    assert sheet.status_code == 200
+    assert sheet.headers["content-type"] == "image/webp"
+    assert sheet.headers["vary"] == "Accept"
+    jpeg = http.get(body["sprite_url"] + "&format=jpeg")
+    assert jpeg.headers["content-type"] == "image/jpeg"
+    assert http.get(body["sprite_url"] + "&format=jpeg", headers={"If-None-Match": jpeg.headers["etag"]}).status_code == 304
@@ -0,0 +1,134 @@
+import asyncio
+import json
+
+import pytest
+
+import backend.server as server
+
+
+def _cards(reading_type, card_ids, reversed_flags, language="en"):
+    catalog = server.get_card_catalog(language)
+    positions = server.get_deck_index().reading_type(reading_type)["positions"]
+    return [
+        {"card": dict(catalog.cards_by_id[cid]), "position": positions[i], "reversed": rev}
+        for i, (cid, rev) in enumerate(zip(card_ids, reversed_flags))
+    ]
+
+
+@pytest.mark.parametrize("language", ["en", "tr"])
+@pytest.mark.parametrize("length", ["short", "medium", "long"])
+def test_memoized_rule_text_matches_direct_build(language, length):
+    cache = server.InterpretationCache(16)
+    cards = _cards("classic_tarot", [0, 5, 9], [False, True, False], language)
+    expected = server.postprocess_length(server.rule_based_interpretation("classic_tarot", cards, language), length)
+
+    assert cache.get_or_build("classic_tarot", cards, language, length) == expected
+    assert cache.get_or_build("classic_tarot", cards, language, length) == expected
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_cache_key_distinguishes_reversed_and_evicts_lru():
+    cache = server.InterpretationCache(2)
+    upright = _cards("card_of_day", [3], [False])
+    reversed_ = _cards("card_of_day", [3], [True])
+    other = _cards("card_of_day", [4], [False])
+
+    assert cache.get_or_build("card_of_day", upright, "en", "medium") != cache.get_or_build("card_of_day", reversed_, "en", "medium")
+    cache.get_or_build("card_of_day", upright, "en", "medium")
+    cache.get_or_build("card_of_day", other, "en", "medium")
+
+    assert len(cache) == 2
+    assert cache.evictions == 1
+    assert cache.key("card_of_day", upright, "en", "medium") in cache._entries
+    assert cache.key("card_of_day", reversed_, "en", "medium") not in cache._entries
+
+
+def test_precompute_covers_single_card_readings(monkeypatch, fake_db):
+    cache = server.InterpretationCache(4096)
+    monkeypatch.setattr(server, "interpretation_cache", cache)
+
+    count = server.precompute_rule_interpretations()
+    assert count == len(server.RULE_PRECOMPUTE_TYPES) * 2 * 3 * 22 * 2
+    assert len(cache) == count
+
+    misses = cache.misses
+    asyncio.run(server.create_reading("yes_no", language="tr", ai="off", length="short"))
+    assert cache.misses == misses
+    assert cache.hits == 1
+
+
+def test_spreads_do_not_evict_pinned_readings(monkeypatch, fake_db):
+    cache = server.InterpretationCache(8)
+    monkeypatch.setattr(server, "interpretation_cache", cache)
+    count = server.precompute_rule_interpretations()
+    assert cache.stats()["pinned"] == count
+
+    for first in range(20):
+        cache.get_or_build("classic_tarot", _cards("classic_tarot", [first, 21, 10], [False] * 3), "en", "medium")
+    assert cache.evictions == 12
+    assert len(cache) == count + 8
+
+    misses = cache.misses
+    cache.get_or_build("card_of_day", _cards("card_of_day", [7], [True]), "en", "long")
+    assert cache.misses == misses
+
+
+def test_prompt_template_renders_compiled_and_foreign_cards():
+    catalog_card = _cards("yes_no", [0], [True], "tr")[0]
+    foreign = {"card": {"id": 1, "name": "Custom", "keywords": ["a", "b", "c", "d", "e"], "meaning_upright": "Up"}}
+
+    prompt = server.build_interpretation_prompt("yes_no", [catalog_card, foreign], "Olur mu?", "tr", "direct", "short")
+
+    assert prompt.split("\n") == [
+        "Okuma türü: Evet/Hayır",
+        "Dil: Türkçe",
+        "Soru: Olur mu?",
+        "Kartlar:",
+        f"- {catalog_card['position']}: {catalog_card['card']['name']} (Ters) | Anahtar kelimeler:  | Özet: ",
+        "- Card 2: Custom | Anahtar kelimeler: a, b, c, d | Özet: Up",
+        server.PROMPT_TEMPLATES["v1"]["tr"]["tones"]["direct"],
+        server.PROMPT_TEMPLATES["v1"]["tr"]["lengths"]["short"],
+        *server.PROMPT_TEMPLATES["v1"]["tr"]["guidance"],
+        "Lütfen yanıtı Türkçe yaz.",
+    ]
+    template = server.prompt_templates.get("tr")
+    assert template.render("yes_no", [catalog_card], None, "bogus", "long") == \
+        template.render("yes_no", [catalog_card], None, "gentle", "long")
+
+
+def test_prompt_template_versions_load_from_file(tmp_path, monkeypatch):
+    path = tmp_path / "prompts.json"
+    path.write_text('{"v2": {"en": {"guidance": ["Be brief."]}}}', encoding="utf-8")
+    monkeypatch.setenv("PROMPT_TEMPLATES_FILE", str(path))
+    templates = server.PromptTemplates(server.load_prompt_templates(), "v2")
+    cards = _cards("card_of_day", [3], [False])
+
+    v1 = templates.get("en", "v1").render("card_of_day", cards, None, "gentle", "medium")
+    v2 = templates.get("en").render("card_of_day", cards, None, "gentle", "medium")
+
+    assert templates.active == "v2"
+    assert "Be brief." in v2.split("\n") and "Be brief." not in v1
+    assert v1.replace("\n".join(server.PROMPT_TEMPLATES["v1"]["en"]["guidance"]), "Be brief.") == v2
+    assert templates.get("tr").spec == server.PROMPT_TEMPLATES["v1"]["tr"]
+    assert templates.compile() == 4
+    assert server.PromptTemplates(templates.versions, "v9").active == "v1"
+
+
+def test_prompt_template_overrides_merge_per_entry_and_skip_broken_versions(tmp_path, monkeypatch):
+    path = tmp_path / "prompts.json"
+    path.write_text(json.dumps({
+        "v2": {"en": {"tones": {"direct": "Tone: blunt."}}},
+        "v3": {"en": {"card": "{name} {missing}"}},
+        "v4": {"tr": {"guidance": "not a list"}},
+    }), encoding="utf-8")
+    monkeypatch.setenv("PROMPT_TEMPLATES_FILE", str(path))
+
+    versions = server.load_prompt_templates()
+    templates = server.PromptTemplates(versions, "v3")
+
+    assert set(versions) == {"v1", "v2"}
+    assert versions["v2"]["en"]["tones"]["direct"] == "Tone: blunt."
+    assert versions["v2"]["en"]["tones"]["gentle"] == server.PROMPT_TEMPLATES["v1"]["en"]["tones"]["gentle"]
+    assert templates.active == "v1"
+    assert templates.compile() == 4
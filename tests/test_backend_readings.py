@@ -0,0 +1,176 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import backend.server as server
+
+
+def _reading(offset: int = 0):
+    return server.TarotReading(reading_type="card_of_day", cards=[], interpretation=f"r{offset}", mode="rule").model_dump()
+
+
+def test_ack_mode_inserts_before_returning(fake_db):
+    writer = server.ReadingWriter("ack")
+
+    asyncio.run(writer.submit(_reading()))
+
+    assert len(fake_db.readings.docs) == 1
+    assert fake_db.readings.insert_many_calls == 0
+
+
+def test_write_behind_batches_and_flushes_on_stop(fake_db):
+    writer = server.ReadingWriter("write_behind", batch_size=50, flush_interval=5.0)
+
+    async def _execute():
+        for i in range(120):
+            await writer.submit(_reading(i))
+        queued_before_stop = len(fake_db.readings.docs)
+        await writer.stop()
+        return queued_before_stop
+
+    queued_before_stop = asyncio.run(_execute())
+
+    assert queued_before_stop < 120
+    assert len(fake_db.readings.docs) == 120
+    assert fake_db.readings.insert_many_calls == 3
+    assert writer.stats()["written"] == 120
+
+
+def test_write_behind_applies_backpressure(fake_db):
+    writer = server.ReadingWriter("write_behind", max_queue=5, batch_size=5, flush_interval=0.01)
+
+    async def _execute():
+        for i in range(40):
+            await writer.submit(_reading(i))
+        await writer.stop()
+
+    asyncio.run(_execute())
+
+    assert len(fake_db.readings.docs) == 40
+    assert writer.backpressure_waits > 0
+
+
+def test_write_behind_applies_updates_after_queued_insert(fake_db):
+    writer = server.ReadingWriter("write_behind", batch_size=50, flush_interval=5.0)
+    doc = _reading()
+
+    async def _execute():
+        await writer.submit(doc)
+        await writer.update(doc["id"], {"interpretation": "late", "mode": "ai"})
+        await writer.submit(_reading(1))
+        await writer.stop()
+
+    asyncio.run(_execute())
+
+    assert [(d["interpretation"], d["mode"]) for d in fake_db.readings.docs] == [("late", "ai"), ("r1", "rule")]
+    assert writer.stats()["updated"] == 1
+
+
+def test_write_behind_restart_keeps_queued_readings(fake_db):
+    writer = server.ReadingWriter("write_behind", flush_interval=0.01)
+
+    async def _execute():
+        writer.start()
+        writer._task.cancel()
+        await asyncio.gather(writer._task, return_exceptions=True)
+        writer._queue.put_nowait(_reading(0))  # left behind by the dead writer
+        await writer.submit(_reading(1))
+        await writer.stop()
+
+    asyncio.run(_execute())
+
+    assert [d["interpretation"] for d in fake_db.readings.docs] == ["r0", "r1"]
+
+
+def test_create_reading_uses_write_behind(fake_db, monkeypatch):
+    writer = server.ReadingWriter("write_behind", flush_interval=5.0)
+    monkeypatch.setattr(server, "reading_writer", writer)
+
+    async def _execute():
+        reading = await server.create_reading("card_of_day", ai="off")
+        pending = len(fake_db.readings.docs)
+        await server.shutdown_db_client()
+        return reading, pending
+
+    reading, pending = asyncio.run(_execute())
+
+    assert pending == 0
+    assert [d["id"] for d in fake_db.readings.docs] == [reading.id]
+
+
+def test_readings_pages_with_cursor(fake_db):
+    base = datetime(2024, 1, 1)
+    for i in range(25):
+        doc = _reading(i)
+        # Pairs share a timestamp so the id tiebreak is exercised
+        doc["timestamp"] = base + timedelta(seconds=i // 2)
+        fake_db.readings.docs.append(doc)
+
+    async def _page(cursor=None):
+        response = server.Response()
+        readings = await server.get_readings(response, limit=10, cursor=cursor)
+        return readings, response.headers.get("X-Next-Cursor")
+
+    seen, cursor = [], None
+    for _ in range(3):
+        page, cursor = asyncio.run(_page(cursor))
+        seen.extend(page)
+        if cursor is None:
+            break
+
+    assert cursor is None
+    assert len(seen) == 25
+    assert len({r.id for r in seen}) == 25
+    keys = [(r.timestamp, r.id) for r in seen]
+    assert keys == sorted(keys, reverse=True)
+
+
+def test_readings_rejects_bad_cursor_and_large_limit(fake_db):
+    from fastapi.testclient import TestClient
+
+    client = TestClient(server.app)
+    assert client.get("/api/readings", params={"cursor": "not-a-cursor"}).status_code == 400
+    assert client.get("/api/readings", params={"limit": 101}).status_code == 422
+
+
+def test_readings_indexes_created(fake_db):
+    asyncio.run(server.ensure_readings_indexes())
+
+    assert fake_db.readings.indexes == ["readings_timestamp_id", "readings_reading_type", "readings_id"]
+
+
+def test_stored_reading_is_compact_and_rehydrates(fake_db, monkeypatch):
+    monkeypatch.setattr(server, "reading_writer", server.ReadingWriter("ack"))
+
+    reading = asyncio.run(server.create_reading("classic_tarot", language="tr", ai="off"))
+    stored = fake_db.readings.docs[0]
+
+    assert stored["schema"] == server.READING_SCHEMA_VERSION
+    assert stored["language"] == "tr"
+    assert [set(c) for c in stored["cards"]] == [{"card_id", "position", "reversed"}] * 3
+    assert [c["position"] for c in stored["cards"]] == [0, 1, 2]
+    assert len(server.dump_json_bytes(stored["cards"])) * 3 < len(server.dump_json_bytes(reading.cards))
+
+    readings = asyncio.run(server.get_readings(server.Response(), limit=10, cursor=None, include_interpretation=True))
+    assert readings[0].model_dump() == reading.model_dump()
+
+
+def test_readings_projection_omits_interpretation(fake_db, monkeypatch):
+    monkeypatch.setattr(server, "reading_writer", server.ReadingWriter("ack"))
+    reading = asyncio.run(server.create_reading("card_of_day", ai="off"))
+
+    readings = asyncio.run(server.get_readings(server.Response(), limit=10, cursor=None, include_interpretation=False))
+
+    assert readings[0].interpretation == ""
+    assert readings[0].cards == reading.cards
+
+
+def test_legacy_embedded_readings_still_load(fake_db):
+    legacy = _reading()
+    legacy["cards"] = [{"card": dict(server.MAJOR_ARCANA[0]), "position": "Your Day", "reversed": False}]
+    legacy["_id"] = "mongo-object-id"
+    fake_db.readings.docs.append(legacy)
+
+    readings = asyncio.run(server.get_readings(server.Response(), limit=10, cursor=None, include_interpretation=True))
+
+    assert readings[0].id == legacy["id"]
+    assert readings[0].cards[0]["card"]["name"] == server.MAJOR_ARCANA[0]["name"]
@@ -1,10 +1,10 @@
 import asyncio
 import json
 import os
+import uuid
 from pathlib import Path
 
 import pytest
-from fastapi import BackgroundTasks
 from starlette.requests import Request
 
 
@@ -17,14 +17,11 @@ import backend.server as server  # noqa: E402
 @pytest.fixture()
 def telemetry_env(tmp_path, monkeypatch):
     monkeypatch.setattr(server, "ROOT_DIR", Path(tmp_path))
+    monkeypatch.setattr(server, "telemetry_sink", server.TelemetrySink(Path(tmp_path) / "logs"))
+    monkeypatch.setattr(server, "telemetry_metrics", server.TelemetryMetrics())
     return tmp_path
 
 
-async def _run_background_tasks(bg: BackgroundTasks):
-    for task in bg.tasks:
-        await task()
-
-
 def _make_request(user_agent: str = "pytest") -> Request:
     scope = {
         "type": "http",
@@ -47,11 +44,9 @@ def test_log_accepts_monetization_events(telemetry_env):
         ]
     )
 
-    bg = BackgroundTasks()
-
     async def _execute():
-        response = await server.log_events(payload, _make_request(), bg)
-        await _run_background_tasks(bg)
+        response = await server.log_events(payload, _make_request())
+        await server.telemetry_sink.stop()
         return response
 
     response = asyncio.run(_execute())
@@ -72,3 +67,187 @@ def test_log_rejects_unknown_event_payload():
     with pytest.raises(Exception):
         server.LogPayload.model_validate({"events": [{"event": "not_a_valid_event"}]})
 
+
+def _record(event: str = "reading_result", **extra):
+    return dict(event=event, ts="2025-01-01T00:00:00", **extra)
+
+
+def test_sink_batches_writes_and_keeps_file_open(tmp_path):
+    sink = server.TelemetrySink(tmp_path, batch_size=100, flush_interval=0.05)
+
+    async def _execute():
+        for i in range(250):
+            assert sink.submit(_record(n=i))
+        await asyncio.sleep(0.3)
+        first_file = sink._file
+        assert first_file is not None and not first_file.closed
+        sink.submit(_record(n=250))
+        await sink.stop()
+        return first_file
+
+    first_file = asyncio.run(_execute())
+    assert first_file.closed
+    stats = sink.stats()
+    assert stats["written"] == 251
+    assert stats["batches"] <= 4
+    assert stats["dropped"] == 0 and stats["queue_depth"] == 0
+    lines = next(tmp_path.glob("telemetry-*.jsonl")).read_text(encoding="utf-8").splitlines()
+    assert [json.loads(line)["n"] for line in lines] == list(range(251))
+
+
+def test_sink_restart_keeps_queued_records(tmp_path):
+    sink = server.TelemetrySink(tmp_path, flush_interval=0.01)
+
+    async def _execute():
+        sink.start()
+        sink._task.cancel()
+        await asyncio.gather(sink._task, return_exceptions=True)
+        sink._queue.put_nowait(("20250101", _record(n=0)))  # left behind by the dead writer
+        sink.submit(_record(n=1))
+        await sink.stop()
+
+    asyncio.run(_execute())
+
+    assert sink.stats()["written"] == 2
+
+
+def test_sink_rotates_at_day_boundary(tmp_path):
+    sink = server.TelemetrySink(tmp_path, flush_interval=0.01)
+    sink._write_batch([("20250101", _record(n=1)), ("20250102", _record(n=2))])
+    sink._write_batch([("20250102", _record(n=3))])
+    sink._close()
+    assert (tmp_path / "telemetry-20250101.jsonl").read_text(encoding="utf-8").count("\n") == 1
+    assert (tmp_path / "telemetry-20250102.jsonl").read_text(encoding="utf-8").count("\n") == 2
+
+
+def test_sink_drops_and_counts_when_queue_full(tmp_path):
+    sink = server.TelemetrySink(tmp_path, max_queue=5)
+
+    async def _execute():
+        accepted = [sink.submit(_record(n=i)) for i in range(8)]
+        depth = sink.queue_depth
+        await sink.stop()
+        return accepted, depth
+
+    accepted, depth = asyncio.run(_execute())
+    assert accepted.count(False) == 3
+    assert depth == 5
+    assert sink.stats()["dropped"] == 3
+    assert sink.stats()["written"] == 5
+
+
+def test_sampling_is_deterministic_per_session():
+    sampler = server.TelemetrySampler({"*": 0.3, "reading_result": 0.6})
+    for i in range(200):
+        session = f"s-{i}"
+        begin = sampler.sample({"event": "reading_begin", "sessionId": session, "id": "a"})
+        again = sampler.sample({"event": "reading_begin", "sessionId": session, "id": "b"})
+        result = sampler.sample({"event": "reading_result", "sessionId": session})
+        assert begin == again
+        if begin is not None:
+            # lower-rate types keep a subset of the sessions kept at higher rates
+            assert result == 0.6
+    kept = sampler.stats()["kept"]["reading_begin"] / 2
+    assert 30 <= kept <= 90
+
+
+def test_client_sessions_are_sampled_whole_and_reach_the_funnel(telemetry_env, monkeypatch):
+    from backend import telemetry_tools
+
+    monkeypatch.setattr(server, "telemetry_sampler", server.TelemetrySampler({"*": 0.5}))
+    sessions = [str(uuid.uuid4()) for _ in range(40)]
+
+    async def _execute():
+        for session in sessions:
+            # same body as frontend/utils/telemetry.ts logEvent: one event per request
+            for event in ("reading_begin", "share_click", "paywall_view", "purchase_start"):
+                body = json.dumps({"events": [{"ts": "2025-01-01T10:00:00.000Z", "sessionId": session, "event": event}]})
+                await server.log_events(server.LogPayload.model_validate_json(body), _make_request())
+        await server.telemetry_sink.stop()
+
+    asyncio.run(_execute())
+    logs_dir = Path(telemetry_env) / "logs"
+    by_session = {}
+    for path in logs_dir.glob("telemetry-*.jsonl"):
+        for line in path.read_text(encoding="utf-8").splitlines():
+            record = json.loads(line)
+            by_session.setdefault(record["sessionId"], set()).add(record["event"])
+    sampled = {"reading_begin", "share_click"}
+    kept = [events & sampled for events in by_session.values() if events & sampled]
+    assert all(events == sampled for events in kept)
+    assert 5 <= len(kept) <= 35
+    funnel = telemetry_tools.aggregate(logs_dir)["funnel"]
+    assert [step["sessions"] for step in funnel[:2]] == [40, 40]
+
+
+def test_monetization_events_are_never_dropped():
+    sampler = server.TelemetrySampler({"*": 0.0})
+    for i in range(50):
+        for event in sorted(server.MONETIZATION_EVENTS):
+            assert sampler.sample({"event": event, "sessionId": f"s-{i}"}) == 1.0
+        assert sampler.sample({"event": "share_click", "sessionId": f"s-{i}"}) is None
+    assert sampler.stats()["seen"]["share_click"] == 50
+    assert "share_click" not in sampler.stats()["kept"]
+
+
+def test_sample_rates_from_env(monkeypatch, tmp_path):
+    monkeypatch.setenv("TELEMETRY_SAMPLE_RATES", '{"ai_toggle": 0.1}')
+    assert server.load_telemetry_sample_rates() == {"*": 0.5, "ai_toggle": 0.1}
+    path = tmp_path / "rates.json"
+    path.write_text('{"*": 0.25}', encoding="utf-8")
+    monkeypatch.setenv("TELEMETRY_SAMPLE_RATES", str(path))
+    assert server.load_telemetry_sample_rates() == {"*": 0.25}
+    monkeypatch.setenv("TELEMETRY_SAMPLE_RATES", '{"*": 2}')
+    assert server.load_telemetry_sample_rates() == server.DEFAULT_TELEMETRY_SAMPLE_RATES
+
+
+def test_rolling_counters_expire_old_buckets():
+    counters = server.RollingCounters(["a", "b"], bucket_seconds=10, buckets=90)
+    counters.inc("a", now=0)
+    counters.inc("a", now=100)
+    counters.inc("b", now=295)
+    counters.inc("unknown", now=295)
+
+    assert counters.totals == [2, 1]
+    assert counters.window(60, now=299) == [0, 1]
+    assert counters.window(300, now=305) == [1, 1]
+    # A bucket is reused once the ring wraps and must not leak its old count.
+    counters.inc("b", now=900)
+    assert counters.window(900, now=905) == [1, 2]
+    assert counters.window(10, now=905) == [0, 1]
+
+
+def test_metrics_endpoint_reports_counters_and_histogram(telemetry_env, monkeypatch):
+    monkeypatch.setattr(server, "telemetry_sampler", server.TelemetrySampler({"*": 1.0}))
+    payload = server.LogPayload(
+        events=[
+            server.TelemetryEvent(event="reading_begin", tone="gentle", length="short"),
+            server.TelemetryEvent(event="reading_result", mode="ai", tone="gentle", length="short", durationMs=800),
+            server.TelemetryEvent(event="reading_result", mode="rule", length="long", durationMs=40000),
+        ]
+    )
+
+    async def _execute():
+        await server.log_events(payload, _make_request())
+        response = await server.get_metrics()
+        await server.telemetry_sink.stop()
+        return response
+
+    response = asyncio.run(_execute())
+    assert response.media_type.startswith("text/plain; version=0.0.4")
+    text = response.body.decode("utf-8")
+    lines = set(text.splitlines())
+
+    assert 'tarot_telemetry_events_total{event="reading_result"} 2' in lines
+    assert 'tarot_telemetry_events_window{event="reading_begin",window="1m"} 1' in lines
+    assert 'tarot_reading_mode_total{mode="ai"} 1' in lines
+    assert 'tarot_reading_mode_total{mode="fallback"} 0' in lines
+    assert 'tarot_reading_tone_total{tone="gentle"} 2' in lines
+    assert 'tarot_reading_length_total{length="long"} 1' in lines
+    assert 'tarot_reading_duration_ms_bucket{le="1000"} 1' in lines
+    assert 'tarot_reading_duration_ms_bucket{le="+Inf"} 2' in lines
+    assert "tarot_reading_duration_ms_sum 40800" in lines
+    assert "tarot_reading_duration_ms_count 2" in lines
+    assert 'tarot_reading_duration_ms_window_bucket{le="+Inf",window="5m"} 2' in lines
+    assert "# TYPE tarot_telemetry_queue_depth gauge" in lines
+    assert "tarot_telemetry_enqueued_total 3" in lines
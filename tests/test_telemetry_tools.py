@@ -0,0 +1,192 @@
+import json
+import random
+import uuid
+
+import numpy as np
+from typer.testing import CliRunner
+
+from backend import telemetry_tools as tools
+
+
+def _write_day(logs_dir, day, events, junk=False):
+    logs_dir.mkdir(exist_ok=True)
+    path = logs_dir / f"telemetry-{day}.jsonl"
+    with open(path, "w", encoding="utf-8") as f:
+        for ev in events:
+            f.write(json.dumps(ev) + "\n")
+        if junk:
+            f.write("{not json\n")
+    return path
+
+
+def _result(mode, reading_type="card_of_day", duration=100, rate=None, session=None):
+    ev = {"event": "reading_result", "mode": mode, "type": reading_type, "durationMs": duration, "sessionId": session}
+    if rate is not None:
+        ev["sampleRate"] = rate
+    return ev
+
+
+def test_counts_modes_and_reweighting(tmp_path):
+    logs = tmp_path / "logs"
+    _write_day(logs, "20250101", [_result("ai"), _result("ai"), _result("rule"), _result("fallback")], junk=True)
+    _write_day(logs, "20250102", [_result("ai"), {"event": "share_click", "sampleRate": 0.25}])
+    (logs / "notes.txt").write_text("ignored")
+
+    report = tools.aggregate(logs, chunk_size=2)
+    assert report["events_read"] == 6
+    day1 = report["days"]["20250101"]
+    assert day1["modes"] == {"ai": 2.0, "fallback": 1.0, "rule": 1.0}
+    assert day1["mode_ratio"]["ai"] == 0.5
+    assert report["days"]["20250102"]["events"]["share_click"] == 4.0
+
+    only = tools.aggregate(logs, day="20250102")
+    assert list(only["days"]) == ["20250102"]
+
+
+def test_duration_percentiles_are_close_with_bounded_buckets(tmp_path):
+    rng = np.random.default_rng(7)
+    durations = rng.lognormal(mean=7, sigma=0.6, size=5000).round()
+    _write_day(tmp_path, "20250101", [_result("ai", "classic_tarot", int(d)) for d in durations])
+
+    stats = tools.aggregate(tmp_path, chunk_size=1000)["duration_ms"]["classic_tarot"]
+    assert stats["count"] == 5000
+    for q in (50, 95, 99):
+        exact = float(np.percentile(durations, q))
+        assert abs(stats[f"p{q}"] - exact) / exact < 0.05
+
+
+def test_funnel_conversion_by_session(tmp_path):
+    events = []
+    for i in range(10):
+        events.append({"event": "paywall_view", "sessionId": f"s{i}"})
+        if i < 4:
+            events.append({"event": "purchase_start", "sessionId": f"s{i}"})
+        if i < 1:
+            events.append({"event": "purchase_success", "sessionId": f"s{i}"})
+    events.append({"event": "purchase_success", "sessionId": "orphan"})
+    _write_day(tmp_path, "20250101", events)
+
+    funnel = tools.aggregate(tmp_path)["funnel"]
+    assert [s["sessions"] for s in funnel] == [10, 4, 1]
+    assert funnel[1]["conversion"] == 0.4
+    assert funnel[2]["conversion"] == 0.25
+    assert funnel[2]["events"] == 2
+
+
+def test_report_cli(tmp_path):
+    _write_day(tmp_path, "20250101", [_result("rule")])
+    result = CliRunner().invoke(tools.app, ["report", str(tmp_path), "--json"])
+    assert result.exit_code == 0, result.output
+    assert json.loads(result.output)["days"]["20250101"]["modes"] == {"rule": 1.0}
+    text = CliRunner().invoke(tools.app, ["report", str(tmp_path)])
+    assert "rule=100.0%" in text.output
+
+
+def _realistic_events(n, seed=3):
+    rng = np.random.default_rng(seed)
+    ids = random.Random(seed)
+    ua = "Mozilla/5.0 (Linux; Android 14; Pixel 8) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/140.0.0.0 Mobile Safari/537.36"
+    kinds = ["reading_begin", "reading_result", "ai_toggle", "paywall_view", "share_click"]
+    events = []
+    for i in range(n):
+        event = kinds[rng.integers(len(kinds))]
+        events.append({
+            "event": event,
+            "ts": f"2025-01-01T{i // 3600 % 24:02d}:{i // 60 % 60:02d}:{i % 60:02d}.{i % 1000:03d}Z",
+            "sessionId": f"session-{rng.integers(n // 20)}",
+            "userIdHash": None,
+            "lang": ["tr", "en"][rng.integers(2)],
+            "type": ["card_of_day", "classic_tarot", "yes_no"][rng.integers(3)],
+            "mode": ["ai", "rule", "fallback"][rng.integers(3)] if event == "reading_result" else None,
+            "aiEnabled": bool(rng.integers(2)),
+            "tone": "gentle",
+            "length": ["short", "medium", "long"][rng.integers(3)],
+            "durationMs": int(rng.integers(50, 5000)) if event == "reading_result" else None,
+            "questionPresent": None,
+            "id": str(uuid.UUID(int=ids.getrandbits(128), version=4)),
+            "client": {"ua": ua},
+            "sampleRate": 1.0 if event in ("reading_result", "paywall_view") else 0.5,
+        })
+    return events
+
+
+def test_compaction_shrinks_and_preserves_aggregates(tmp_path):
+    src = _write_day(tmp_path, "20250101", _realistic_events(20000))
+    before = tools.aggregate(tmp_path)
+
+    stats = tools.compact_day(src, row_group_size=4096)
+    assert stats["rows"] == 20000
+    assert stats["ratio"] >= 15
+    assert tools.verify_compacted(src, tmp_path / "telemetry-20250101.tcol.npz")
+    assert tools.day_files(tmp_path) == [("20250101", tmp_path / "telemetry-20250101.tcol.npz")]
+    assert tools.aggregate(tmp_path) == before
+
+
+def test_compacted_reader_prunes_row_groups(tmp_path):
+    events = _realistic_events(3000)
+    src = _write_day(tmp_path, "20250101", events)
+    tools.compact_day(src, row_group_size=500)
+
+    with tools.CompactedDay(tmp_path / "telemetry-20250101.tcol.npz") as day:
+        groups = day.row_groups(events=["reading_result"])
+        assert groups and all(day.index["row_groups"][g]["event"] == "reading_result" for g in groups)
+        frames = list(day.read(["event", "mode", "ua", "aiEnabled", "id"], events=["reading_result"]))
+        df = frames[0]
+        assert set(df["event"]) == {"reading_result"}
+        assert df["ua"][0].startswith("Mozilla/5.0")
+        assert df["id"][0] == next(e["id"] for e in events if e["event"] == "reading_result")
+        assert sum(len(f) for f in frames) == sum(e["event"] == "reading_result" for e in events)
+
+        start = int(np.datetime64("2025-01-01T00:10:00", "ms").astype(np.int64))
+        end = int(np.datetime64("2025-01-01T00:19:59.999", "ms").astype(np.int64))
+        windowed = list(day.read(["ts"], start_ms=start, end_ms=end))
+        assert sum(len(f) for f in windowed) == 600
+        assert len(day.row_groups(start_ms=start, end_ms=end)) < len(day.index["row_groups"])
+
+
+def test_compaction_keeps_values_the_columns_cannot_hold(tmp_path):
+    odd = [
+        {"event": "reading_result", "ts": "yesterday", "durationMs": 2**40, "id": "not-a-uuid", "mode": "ai"},
+        {"event": "reading_result", "ts": "2025-01-01T10:00:00.123456", "durationMs": 12.5, "sampleRate": 0.1},
+        {"event": "reading_begin", "id": "00000000-0000-0000-0000-000000000000", "aiEnabled": "yes",
+         "client": {"ua": "pytest", "ip": "10.0.0.1"}, "extra": [1, 2]},
+        {"event": "ai_toggle", "id": "c6f1a9e2-1d43-4b8a-9f0e-2a7b3c4d5e00", "type": 7},
+    ]
+    src = _write_day(tmp_path, "20250101", odd + _realistic_events(50))
+    before = tools.aggregate(tmp_path)
+
+    tools.compact_day(src)
+    assert tools.verify_compacted(src, tmp_path / "telemetry-20250101.tcol.npz")
+    assert tools.aggregate(tmp_path) == before
+    with tools.CompactedDay(tmp_path / "telemetry-20250101.tcol.npz") as day:
+        records = {r.get("id"): r for r in day.records()}
+    assert records["not-a-uuid"]["ts"] == "yesterday" and records["not-a-uuid"]["durationMs"] == 2**40
+    assert records["00000000-0000-0000-0000-000000000000"]["client"] == {"ua": "pytest", "ip": "10.0.0.1"}
+    assert records["c6f1a9e2-1d43-4b8a-9f0e-2a7b3c4d5e00"]["type"] == 7
+
+
+def test_compact_cli_keeps_source_unless_round_trip_matches(tmp_path, monkeypatch):
+    _write_day(tmp_path, "20250101", [_result("rule")], junk=True)
+    _write_day(tmp_path, "20250102", [_result("ai")])
+    monkeypatch.setattr(tools, "_canonical", lambda data: json.dumps(data, sort_keys=True, default=str).encode())
+    result = CliRunner().invoke(tools.app, ["compact", str(tmp_path), "--delete-source"])
+    assert result.exit_code == 0, result.output
+    assert result.output.count("source kept") == 2
+    assert len(list(tmp_path.glob("*.jsonl"))) == 2
+
+    monkeypatch.undo()
+    result = CliRunner().invoke(tools.app, ["compact", str(tmp_path), "--delete-source"])
+    assert "20250101: compacted file does not reproduce the source, source kept" in result.output
+    assert sorted(p.name for p in tmp_path.glob("*.jsonl")) == ["telemetry-20250101.jsonl"]
+
+
+def test_compact_cli_skips_open_day(tmp_path):
+    _write_day(tmp_path, "20250101", [_result("rule")])
+    today = tools.datetime.utcnow().strftime("%Y%m%d")
+    _write_day(tmp_path, today, [_result("ai")])
+    result = CliRunner().invoke(tools.app, ["compact", str(tmp_path), "--delete-source"])
+    assert result.exit_code == 0, result.output
+    assert "still open" in result.output
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["telemetry-20250101.tcol.npz", f"telemetry-{today}.jsonl"]
+    again = CliRunner().invoke(tools.app, ["compact", str(tmp_path)])
+    assert "20250101" not in again.output